@@ -3,9 +3,10 @@ CrewAI Agents for CrowdWisdomTrading AI Agent
 Implements the three main agents for the data pipeline
 """
 
+import threading
 from crewai import Agent
 from tools import SCRAPING_TOOLS
-from llm_integration import mistral_integration
+from llm_integration import get_mistral_integration
 from config import Config, logger
 
 class CrowdWisdomAgents:
@@ -13,7 +14,7 @@ class CrowdWisdomAgents:
     Factory class for creating CrewAI agents
     """
     def __init__(self):
-        self.llm = mistral_integration.get_crewai_llm()
+        self.llm = get_mistral_integration().get_crewai_llm()
         logger.info("CrowdWisdom agents initialized with Mistral LLM")
 
     def data_collector_agent(self):
@@ -115,4 +116,17 @@ Always start with the actual CSV data.
             self.data_organizer_agent()
         ]
 
-crowd_wisdom_agents = CrowdWisdomAgents()
+_crowd_wisdom_agents = None
+_agents_lock = threading.Lock()
+
+def get_crowd_wisdom_agents():
+    global _crowd_wisdom_agents
+    with _agents_lock:
+        if _crowd_wisdom_agents is None:
+            _crowd_wisdom_agents = CrowdWisdomAgents()
+        return _crowd_wisdom_agents
+
+def __getattr__(name):
+    if name == "crowd_wisdom_agents":
+        return get_crowd_wisdom_agents()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
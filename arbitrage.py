@@ -0,0 +1,123 @@
+"""
+Spread and arbitrage scanner for CrowdWisdomTrading AI Agent
+Scores every matched group across venues with array arithmetic instead of per-group loops
+"""
+
+import time
+
+import numpy as np
+
+from config import Config, logger
+from matching import product_site
+
+
+def venue_fee(site):
+    return Config.VENUE_FEES.get(site, Config.VENUE_FEES.get("default", 0.0))
+
+
+def price_matrix(groups):
+    """
+    (sites, yes, no) where yes/no are [groups x sites] float arrays of
+    normalized probabilities, NaN where a site does not quote the group.
+    A single pass over the products feeds one fancy-indexed assignment.
+    """
+    column = {}
+    rows, cols, yes_values, no_values = [], [], [], []
+    for i, group in enumerate(groups):
+        for product in group.get("products", ()):
+            yes_price = product.get("yes_price")
+            if yes_price is None:
+                continue
+            site = product_site(product)
+            k = column.get(site)
+            if k is None:
+                k = column[site] = len(column)
+            no_price = product.get("no_price")
+            rows.append(i)
+            cols.append(k)
+            yes_values.append(yes_price)
+            no_values.append(1 - yes_price if no_price is None else no_price)
+
+    sites = sorted(column)
+    remap = np.empty(len(sites), dtype=np.intp)
+    remap[[column[site] for site in sites]] = np.arange(len(sites))
+    yes = np.full((len(groups), len(sites)), np.nan)
+    no = np.full((len(groups), len(sites)), np.nan)
+    if rows:
+        cols = remap[np.asarray(cols, dtype=np.intp)]
+        yes[rows, cols] = yes_values
+        no[rows, cols] = no_values
+    return sites, yes, no
+
+
+def scan_groups(groups, top_k=None):
+    """
+    Computes per group the YES spread across venues and the best
+    cross-venue arbitrage: buy YES on one venue and NO on another, each leg
+    paying its venue fee (VENUE_FEES, a fraction of the stake). The margin
+    is 1 minus that cost, so a positive margin pays out whichever way the
+    market resolves.
+
+    Writes spread / arbitrage_margin onto each cross-site group and returns
+    {"opportunities": top_k by margin with their legs, "summary": {...}}.
+    """
+    started = time.perf_counter()
+    top_k = Config.ARBITRAGE_TOP_K if top_k is None else top_k
+    sites, yes, no = price_matrix(groups)
+    if not groups or not sites:
+        return {"opportunities": [], "summary": {"groups": len(groups), "quoted_groups": 0}}
+
+    fees = np.array([venue_fee(site) for site in sites])
+    quoted = np.sum(~np.isnan(yes), axis=1)
+    multi = quoted > 1
+
+    spread = np.full(len(groups), np.nan)
+    if multi.any():
+        spread[multi] = np.nanmax(yes[multi], axis=1) - np.nanmin(yes[multi], axis=1)
+
+    yes_cost = yes * (1 + fees)
+    no_cost = no * (1 + fees)
+    # cost[g, a, b]: YES bought on venue a plus NO bought on venue b
+    cost = yes_cost[:, :, None] + no_cost[:, None, :]
+    cost[:, np.arange(len(sites)), np.arange(len(sites))] = np.nan
+    flat = cost.reshape(len(groups), -1)
+    filled = np.where(np.isnan(flat), np.inf, flat)
+    best = np.argmin(filled, axis=1)
+    best_cost = filled[np.arange(len(groups)), best]
+    margin = np.where(np.isfinite(best_cost), 1 - best_cost, np.nan)
+    yes_site, no_site = np.divmod(best, len(sites))
+
+    spread_list = np.round(spread, 4).tolist()
+    margin_list = np.round(margin, 4).tolist()
+    for i in np.flatnonzero(multi).tolist():
+        group = groups[i]
+        group["spread"] = spread_list[i]
+        group["arbitrage_margin"] = margin_list[i]
+
+    candidates = np.flatnonzero(np.isfinite(margin))[:None if top_k > 0 else 0]
+    if len(candidates) > top_k:
+        candidates = candidates[np.argpartition(-margin[candidates], top_k - 1)[:top_k]]
+    candidates = candidates[np.argsort(-margin[candidates], kind="stable")]
+    opportunities = []
+    for i in candidates.tolist():
+        a, b = int(yes_site[i]), int(no_site[i])
+        opportunities.append({
+            "unified_title": groups[i].get("unified_title"),
+            "spread": spread_list[i],
+            "arbitrage_margin": margin_list[i],
+            "buy_yes": sites[a], "yes_price": float(yes[i, a]),
+            "buy_no": sites[b], "no_price": float(no[i, b])
+        })
+
+    profitable = int(np.sum(margin > 0))
+    summary = {
+        "groups": len(groups),
+        "quoted_groups": int(np.sum(quoted > 0)),
+        "cross_site_groups": int(multi.sum()),
+        "profitable_opportunities": profitable,
+        "max_spread": round(float(np.nanmax(spread)), 4) if multi.any() else None,
+        "mean_spread": round(float(np.nanmean(spread)), 4) if multi.any() else None,
+        "scan_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+    logger.info(f"Arbitrage scan: {summary}")
+    return {"opportunities": opportunities, "summary": summary}
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+End-to-end flow benchmark for CrowdWisdomTrading AI Agent
+Runs CrowdWisdomTradingFlow offline against local site fixtures and a fake Mistral endpoint
+
+Each repetition is a fresh subprocess with its own OUTPUT_DIR, so caches,
+snapshots and peak RSS start from zero. Every repetition runs --cycles flow
+cycles: the first is a cold run, later ones see unchanged sites (304s and
+the incremental matching path).
+
+Usage: python benchmarks/bench_flow.py [--markets 200] [--llm-latency 0.05] [--matching-mode local|llm]
+                                       [--repeat 3] [--cycles 2] [--save-baseline | --compare]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT))
+
+BASELINE_PATH = BENCH_DIR / "baselines" / "flow.json"
+RESULT_MARKER = "BENCH_RESULT "
+PHASES = ["setup", "data_collection", "product_matching", "arbitrage_scan", "board"]
+# metric -> True when higher is better
+COMPARED = {"wall_seconds": False, "markets_per_second": True, "peak_rss_mb": False, "llm_calls": False}
+
+
+def child(options):
+    """
+    One repetition, inside the subprocess. The servers start before config
+    is imported so MISTRAL_API_BASE can point at the fake endpoint.
+    """
+    import resource
+
+    from fixtures import FakeLLMServer, FixtureServer, build_fixtures, target_sites
+
+    sites = FixtureServer(build_fixtures(options["markets"], options["overlap"])).start()
+    llm = FakeLLMServer(options["llm_latency"]).start()
+    os.environ["MISTRAL_API_BASE"] = f"{llm.base_url}/v1"
+
+    started = time.perf_counter()
+    from config import Config, bootstrap
+    Config.TARGET_SITES = target_sites(sites.base_url)
+    bootstrap()
+    from main_flow import run_crowdwisdom_flow
+    import_seconds = time.perf_counter() - started
+
+    cycles = []
+    for _ in range(options["cycles"]):
+        llm_before, tokens_before = llm.requests, llm.prompt_tokens + llm.completion_tokens
+        requests_before, not_modified_before = sites.requests, sites.not_modified
+        started = time.perf_counter()
+        state = run_crowdwisdom_flow()
+        wall = time.perf_counter() - started
+        cycles.append({
+            "wall_seconds": round(wall, 4),
+            "phases": dict(state.phase_timings),
+            "markets": state.total_products_collected,
+            "groups": state.unique_products_count,
+            "cross_site_groups": sum(1 for g in state.matched_products if len(g.get("sites", [])) > 1),
+            "markets_per_second": round(state.total_products_collected / wall, 1) if wall else 0.0,
+            "llm_calls": llm.requests - llm_before,
+            "llm_tokens": llm.prompt_tokens + llm.completion_tokens - tokens_before,
+            "site_requests": sites.requests - requests_before,
+            "not_modified": sites.not_modified - not_modified_before,
+            "success": state.flow_success
+        })
+    sites.stop()
+    llm.stop()
+    print(RESULT_MARKER + json.dumps({
+        "import_seconds": round(import_seconds, 4),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "cycles": cycles
+    }), flush=True)
+
+
+def run_repetition(args):
+    with tempfile.TemporaryDirectory(prefix="bench-flow-") as output_dir:
+        env = {
+            **os.environ,
+            "OUTPUT_DIR": output_dir,
+            "CSV_OUTPUT_PATH": str(Path(output_dir) / "unified_products.csv"),
+            "MISTRAL_API_KEY": "bench",
+            "MATCHING_MODE": args.matching_mode,
+            "MATCH_LLM_ADJUDICATION": "true",
+            "COLLECTION_MODE": "direct",
+            "MAX_PRODUCTS_PER_SITE": str(args.markets),
+            "LLM_CACHE_ENABLED": "false",
+            "POLITENESS_MIN_DELAY": "0",
+            "POLITENESS_JITTER": "0",
+            "LOG_LEVEL": "WARNING",
+            "CREWAI_TELEMETRY_ENABLED": "false",
+            "CREWAI_DISABLE_TELEMETRY": "true",
+            "OTEL_SDK_DISABLED": "true"
+        }
+        options = {"markets": args.markets, "overlap": args.overlap,
+                   "llm_latency": args.llm_latency, "cycles": args.cycles}
+        completed = subprocess.run(
+            [sys.executable, __file__, "--child", json.dumps(options)],
+            cwd=str(BENCH_DIR), env=env, capture_output=True, text=True, timeout=args.timeout
+        )
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    sys.stderr.write(completed.stderr[-4000:])
+    raise SystemExit(f"benchmark child exited with {completed.returncode} and no result")
+
+
+def median(runs, key):
+    return round(statistics.median(run[key] for run in runs), 4)
+
+
+def summarize(repetitions):
+    """
+    Median over repetitions of every per-cycle metric, plus the worst peak RSS
+    """
+    cycles = []
+    for index in range(len(repetitions[0]["cycles"])):
+        runs = [rep["cycles"][index] for rep in repetitions]
+        cycles.append({
+            "wall_seconds": median(runs, "wall_seconds"),
+            "markets_per_second": median(runs, "markets_per_second"),
+            "llm_calls": median(runs, "llm_calls"),
+            "phases": {
+                phase: round(statistics.median(run["phases"].get(phase, 0.0) for run in runs), 4)
+                for phase in PHASES
+            },
+            **{key: runs[0][key] for key in ("markets", "groups", "cross_site_groups", "site_requests", "not_modified")},
+            "success": all(run["success"] for run in runs)
+        })
+    return {
+        "import_seconds": round(statistics.median(rep["import_seconds"] for rep in repetitions), 4),
+        "peak_rss_mb": max(rep["peak_rss_mb"] for rep in repetitions),
+        "cycles": cycles
+    }
+
+
+def print_report(scenario, summary):
+    print(f"\nscenario {scenario}: import {summary['import_seconds']:.2f}s, peak RSS {summary['peak_rss_mb']:.1f} MB")
+    header = f"{'cycle':<7}{'wall s':>9}{'markets/s':>11}{'markets':>9}{'groups':>8}{'x-site':>8}{'llm':>6}{'304s':>6}"
+    print(header + "".join(f"{phase[:12]:>14}" for phase in PHASES))
+    for index, cycle in enumerate(summary["cycles"]):
+        print(
+            f"{'cold' if index == 0 else f'warm{index}':<7}{cycle['wall_seconds']:>9.3f}{cycle['markets_per_second']:>11.1f}"
+            f"{cycle['markets']:>9}{cycle['groups']:>8}{cycle['cross_site_groups']:>8}{cycle['llm_calls']:>6.0f}"
+            f"{cycle['not_modified']:>6}" + "".join(f"{cycle['phases'][phase]:>14.3f}" for phase in PHASES)
+        )
+
+
+def compare(scenario, summary, baseline, tolerance):
+    """
+    Prints each compared metric against the baseline; returns the metrics
+    that moved the wrong way by more than `tolerance`
+    """
+    regressions = []
+    print(f"\nagainst baseline recorded {baseline.get('recorded', '?')} on {baseline.get('machine', {}).get('node', '?')}:")
+    for index, (now, then) in enumerate(zip(summary["cycles"], baseline["summary"]["cycles"])):
+        for metric, higher_is_better in COMPARED.items():
+            current = summary[metric] if metric == "peak_rss_mb" else now[metric]
+            previous = baseline["summary"][metric] if metric == "peak_rss_mb" else then[metric]
+            if metric == "peak_rss_mb" and index:
+                continue
+            change = (current - previous) / previous if previous else (1.0 if current else 0.0)
+            worse = -change if higher_is_better else change
+            flag = "REGRESSION" if worse > tolerance else ""
+            print(f"  cycle {index} {metric:<20}{previous:>12.3f} -> {current:>12.3f}  ({change:+.1%}) {flag}")
+            if flag:
+                regressions.append(f"cycle {index} {metric}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--markets", type=int, default=200, help="markets listed on the Polymarket fixture")
+    parser.add_argument("--overlap", type=float, default=0.6, help="share of them also listed on the other sites")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds the fake LLM sleeps per call")
+    parser.add_argument("--matching-mode", choices=["local", "llm"], default="local")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--cycles", type=int, default=2, help="flow runs per repetition (the first is cold)")
+    parser.add_argument("--timeout", type=float, default=900, help="seconds before a repetition is abandoned")
+    parser.add_argument("--baseline-file", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="relative change counted as a regression")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--save-baseline", action="store_true", help="record this run as the scenario's baseline")
+    mode.add_argument("--compare", action="store_true", help="exit 1 when a metric regressed past --tolerance")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(json.loads(args.child))
+
+    scenario = f"{args.matching_mode}-{args.markets}m-{int(args.llm_latency * 1000)}ms-{args.cycles}c"
+    repetitions = [run_repetition(args) for _ in range(args.repeat)]
+    summary = summarize(repetitions)
+    print_report(scenario, summary)
+
+    baselines = json.loads(args.baseline_file.read_text()) if args.baseline_file.exists() else {}
+    if args.save_baseline:
+        baselines[scenario] = {
+            "recorded": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "machine": {"node": platform.node(), "python": platform.python_version(),
+                        "cpus": os.cpu_count(), "platform": platform.platform()},
+            "repeat": args.repeat,
+            "summary": summary
+        }
+        args.baseline_file.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline_file.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"\nbaseline for {scenario} saved to {args.baseline_file}")
+    elif scenario in baselines:
+        regressions = compare(scenario, summary, baselines[scenario], args.tolerance)
+        if args.compare and regressions:
+            raise SystemExit(f"regressions: {', '.join(regressions)}")
+    elif args.compare:
+        raise SystemExit(f"no baseline for {scenario} in {args.baseline_file}; run with --save-baseline first")
+
+
+if __name__ == "__main__":
+    main()
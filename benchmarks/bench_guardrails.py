@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Guardrail validation benchmark for CrowdWisdomTrading AI Agent
+Times validate_scraped_data / validate_product_matching on large payloads against the previous json round-trip
+
+Usage: python benchmarks/bench_guardrails.py [--products 100000] [--invalid 0.01]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import logger
+from guardrails import validate_product_matching, validate_scraped_data
+from schemas import parse_json
+
+
+def legacy_scraped(payload):
+    """
+    What the direct path did before: json.dumps in the flow, json.loads in
+    the guardrail, then a comprehension rebuilding every product
+    """
+    parsed = json.loads(json.dumps(payload))
+    return [
+        {
+            **p,
+            "title": str(p.get('title', f'Product {i+1}')),
+            "price": str(p.get('price', 'Unknown')),
+            "category": str(p.get('category', 'General')),
+            "site": str(p.get('site', parsed.get('site', 'unknown'))),
+            "confidence_score": float(p.get('confidence_score', 0.5))
+        } for i, p in enumerate(parsed["products"]) if isinstance(p, dict) and p.get('title')
+    ]
+
+
+def legacy_matching(matching_data):
+    parsed = json.loads(json.dumps(matching_data))
+    valid = []
+    for match in parsed["matched_products"]:
+        products = match['products']
+        avg_conf = sum(p.get('confidence_score', 0.5) for p in products) / len(products) if products else 0.5
+        valid.append({
+            "unified_title": match['unified_title'],
+            "products": products,
+            "match_confidence": float(match.get('match_confidence', avg_conf)),
+            "sites": list(set(p.get('site', 'unknown') for p in products))
+        })
+    return valid
+
+
+def make_payload(count, invalid, seed=21):
+    rng = random.Random(seed)
+    products = []
+    for i in range(count):
+        product = {
+            "title": f"Will market {i} resolve YES by {rng.choice(['June', 'December'])} {rng.randint(2026, 2028)}?",
+            "price": f"{rng.randint(1, 99)}%",
+            "category": rng.choice(["Politics", "Crypto", "Sports", "Economics"]),
+            "volume": f"${rng.randint(1, 900)}k Vol.",
+            "url": f"https://polymarket.com/market/m-{i}",
+            "site": "polymarket",
+            "confidence_score": 0.9
+        }
+        if rng.random() < invalid:
+            rng.choice([
+                lambda p: p.update(title=""),
+                lambda p: p.pop("title"),
+                lambda p: p.update(confidence_score="n/a")
+            ])(product)
+        products.append(product)
+    return {"site": "polymarket", "products": products}
+
+
+def timed(label, count, function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<48}{elapsed:>8.3f}s  ({count / elapsed:>12,.0f} items/s)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--invalid", type=float, default=0.01, help="share of products made invalid")
+    args = parser.parse_args()
+    logger.remove()
+
+    payload = make_payload(args.products, args.invalid)
+    raw = json.dumps(payload)
+    n = args.products
+    print(f"products={n:,} payload={len(raw) / 1e6:.1f} MB invalid~{args.invalid:.0%}\n")
+
+    # The old guardrail raised on the first unconvertible confidence_score, so it gets a clean copy
+    timed("legacy scraped (dumps+loads+rebuild)", n, legacy_scraped, make_payload(n, 0.0))
+    _, result = timed("validate_scraped_data(dict)", n, validate_scraped_data, payload)
+    timed("validate_scraped_data(json str, cold parse)", n, validate_scraped_data, raw)
+    timed("validate_scraped_data(json str, cached parse)", n, validate_scraped_data, raw)
+    print(f"  kept {result['products_count']:,}, rejected {result['rejected_products']:,}: {result['rejections']}")
+    parse_json.cache_clear()
+
+    # Plain dicts, as the matcher produced them before MarketRecords, so the legacy path can json.dumps them
+    products = [dict(p) for p in result["products"]]
+    groups = [
+        {"unified_title": products[i]["title"], "products": products[i:i + 2], "match_confidence": 0.8,
+         "sites": ["polymarket"], "price_analysis": {}}
+        for i in range(0, len(products), 2)
+    ]
+    matching = {"matched_products": groups, "total_unique_products": len(groups)}
+    print()
+    timed("legacy matching (dumps+loads+rebuild)", len(groups), legacy_matching, matching)
+    timed("validate_product_matching(dict)", len(groups), validate_product_matching, matching)
+
+
+if __name__ == "__main__":
+    main()
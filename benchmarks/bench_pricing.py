@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Price normalization benchmark for CrowdWisdomTrading AI Agent
+Times pricing.normalize_prices on a mix of real-world price formats against a per-row regex baseline
+
+Usage: python benchmarks/bench_pricing.py [--rows 1000000] [--distinct 50000] [--baseline-rows 100000]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pricing import normalize_prices
+
+FORMATS = [
+    lambda r: f"{r.randint(1, 99)}¢",
+    lambda r: f"{r.randint(1, 99)}%",
+    lambda r: f"{r.randint(1, 99)}% chance",
+    lambda r: f"${r.randint(1, 99) / 100:.2f}",
+    lambda r: f"Yes {r.randint(1, 99)}¢ / No {r.randint(1, 99)}¢",
+    lambda r: f"No {r.randint(1, 99)}¢",
+    lambda r: f"{r.choice('+-')}{r.randint(100, 900)}",
+    lambda r: f"{r.uniform(1.05, 12):.2f}",
+    lambda r: f"Will event {r.randint(1, 10**6)} happen?\n{r.randint(1, 99)}%\nchance\n${r.randint(1, 900)}k Vol.",
+    lambda r: "Unknown"
+]
+
+_SCALAR = re.compile(r"(\d{1,3}(?:\.\d+)?)\s?(%|¢)|\$\s?(0?\.\d+)")
+
+
+def per_row_baseline(prices):
+    """
+    What the board did before: one regex search per row
+    """
+    out = []
+    for price in prices:
+        match = _SCALAR.search(str(price or ""))
+        if not match:
+            out.append(None)
+        elif match.group(3):
+            out.append(float(match.group(3)))
+        else:
+            out.append(float(match.group(1)) / 100)
+    return out
+
+
+def make_prices(rows, distinct, seed=7):
+    rng = random.Random(seed)
+    pool = [rng.choice(FORMATS)(rng) for _ in range(distinct)]
+    return [pool[rng.randrange(distinct)] for _ in range(rows)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--distinct", type=int, default=50_000, help="distinct price strings in the sample")
+    parser.add_argument("--baseline-rows", type=int, default=100_000, help="rows timed for the per-row baseline")
+    args = parser.parse_args()
+
+    prices = make_prices(args.rows, args.distinct)
+
+    started = time.perf_counter()
+    yes, _ = normalize_prices(prices)
+    vectorized = time.perf_counter() - started
+    parsed = int((yes == yes).sum())
+
+    sample = prices[:args.baseline_rows]
+    started = time.perf_counter()
+    per_row_baseline(sample)
+    baseline = (time.perf_counter() - started) * len(prices) / len(sample)
+
+    print(f"rows={args.rows:,} distinct={args.distinct:,} parsed={parsed:,} ({parsed / args.rows:.1%})")
+    print(f"normalize_prices:  {vectorized:.3f}s  ({args.rows / vectorized:,.0f} rows/s)")
+    print(f"per-row regex:     {baseline:.3f}s  (extrapolated from {len(sample):,} rows, fewer formats)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Market record benchmark for CrowdWisdomTrading AI Agent
+Peak RSS and stage times for large runs with markets held as plain dicts versus MarketRecords
+
+Each representation runs in its own subprocess, so peak RSS is that run's
+alone. Markets arrive per site, as in the flow, and go through validation and
+price normalization; a sample goes through the local matcher and every
+market is written to the board as its own row.
+
+Usage: python benchmarks/bench_records.py [--markets 1000000] [--overlap 0.6] [--match-markets 20000]
+"""
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+RESULT_MARKER = "BENCH_RESULT "
+REPRESENTATIONS = ["dict", "record"]
+
+
+def site_payloads(markets, overlap, seed=22):
+    """
+    Yields one {"site", "products"} payload per site; Polymarket lists
+    every event, Kalshi and the generic site an `overlap` share of them
+    """
+    import random
+
+    from fixtures import GENERIC_TEMPLATES, KALSHI_TEMPLATES, POLYMARKET_TEMPLATES, make_events
+
+    events = make_events(int(markets / (1 + 1.5 * overlap)), seed)
+    rng = random.Random(seed)
+    shared = [e for e in events if rng.random() < overlap]
+    for site, templates, listed, category in (
+        ("polymarket", POLYMARKET_TEMPLATES, events, "Politics"),
+        ("kalshi", KALSHI_TEMPLATES, shared, "Economics"),
+        ("prediction-market", GENERIC_TEMPLATES, shared[::2], "General")
+    ):
+        yield {"site": site, "products": [{
+            "title": templates[e["kind"]].format(**e),
+            "price": f"{max(1, min(99, e['yes'] + rng.randint(-4, 4)))}%",
+            "category": category,
+            "volume": f"${e['volume']:,} Vol.",
+            "url": f"https://{site}.example/market/{e['name'].lower()}-{e['id']}",
+            "site": site,
+            "confidence_score": 0.9
+        } for e in listed]}
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def child(options):
+    from config import logger
+    logger.remove()
+    from board_writer import write_board
+    from matching import MarketMatcher
+    from pricing import annotate_products
+    from schemas import PRODUCT_DEFAULTS, PRODUCTS, validate_batch, validate_products
+
+    def validate_as_dicts(products, site):
+        valid, rejections, rejected = validate_batch(PRODUCTS, products)
+        for product in valid:
+            for field, default in PRODUCT_DEFAULTS:
+                product.setdefault(field, default)
+            product.setdefault("site", site)
+        return valid, rejections, rejected
+
+    validate = validate_as_dicts if options["representation"] == "dict" else validate_products
+    stages = {}
+    baseline = rss_mb()
+
+    stages["validate"] = 0.0
+    all_products = []
+    for payload in site_payloads(options["markets"], options["overlap"]):
+        started = time.perf_counter()
+        products, _, _ = validate(payload["products"], payload["site"])
+        for product in products:
+            product["source_site"] = payload["site"]
+        stages["validate"] += time.perf_counter() - started
+        all_products.extend(products)
+        del payload, products
+    gc.collect()
+    held_mb = rss_mb() - baseline
+
+    started = time.perf_counter()
+    annotate_products(all_products)
+    stages["annotate"] = time.perf_counter() - started
+
+    # Blocking is quadratic in block size, so the matcher gets an evenly spread sample
+    sample = all_products[::max(1, len(all_products) // options["match_markets"])] if options["match_markets"] else []
+    started = time.perf_counter()
+    MarketMatcher().match(sample)
+    stages["match"] = time.perf_counter() - started
+    matched = [MarketMatcher.build_group([p], 0.5) for p in all_products]
+
+    with tempfile.TemporaryDirectory(prefix="bench-records-") as output_dir:
+        started = time.perf_counter()
+        write_board(matched, Path(output_dir) / "unified_products.csv")
+        stages["board"] = time.perf_counter() - started
+
+    print(RESULT_MARKER + json.dumps({
+        "markets": len(all_products),
+        "matched_sample": len(sample),
+        "held_mb": round(held_mb, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "stages": {name: round(seconds, 3) for name, seconds in stages.items()}
+    }), flush=True)
+
+
+def run(representation, args):
+    options = {"representation": representation, "markets": args.markets,
+               "overlap": args.overlap, "match_markets": args.match_markets}
+    completed = subprocess.run(
+        [sys.executable, __file__, "--child", json.dumps(options)],
+        cwd=str(BENCH_DIR), capture_output=True, text=True,
+        env={**os.environ, "LOG_LEVEL": "WARNING", "METRICS_ENABLED": "false"}
+    )
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    sys.stderr.write(completed.stderr[-4000:])
+    raise SystemExit(f"{representation} run exited with {completed.returncode} and no result")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--markets", type=int, default=1_000_000, help="listings across the three sites")
+    parser.add_argument("--overlap", type=float, default=0.6, help="share of events also listed on the other sites")
+    parser.add_argument("--match-markets", type=int, default=20_000, help="size of the sample run through the matcher")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(json.loads(args.child))
+
+    results = {representation: run(representation, args) for representation in REPRESENTATIONS}
+    stages = list(results["dict"]["stages"])
+    first = results["dict"]
+    print(f"markets={first['markets']:,} matcher sample={first['matched_sample']:,}\n")
+    print(f"{'':<10}{'held MB':>10}{'peak RSS MB':>13}" + "".join(f"{name + ' s':>12}" for name in stages))
+    for representation, result in results.items():
+        print(f"{representation:<10}{result['held_mb']:>10.1f}{result['peak_rss_mb']:>13.1f}"
+              + "".join(f"{result['stages'][name]:>12.3f}" for name in stages))
+
+
+if __name__ == "__main__":
+    main()
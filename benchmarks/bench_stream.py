@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Streaming pipeline benchmark for CrowdWisdomTrading AI Agent
+Time to the first board row, wall time and peak RSS for the batch flow versus run.py --stream
+
+Both modes scrape the same local site fixtures, each site answering after
+its own latency, in their own subprocess. The flow writes its board once
+every site is scraped and matched, so its first row is counted from the
+start of its board step; the streaming run counts it when the row is
+written.
+
+Usage: python benchmarks/bench_stream.py [--markets 2000] [--latency polymarket=0.2,kalshi=1.5,generic=3]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+RESULT_MARKER = "BENCH_RESULT "
+MODES = ["flow", "stream"]
+
+
+def child(options):
+    import resource
+
+    from fixtures import FixtureServer, build_fixtures, target_sites
+
+    latency = {f"/{site}": float(seconds) for site, seconds in options["latency"].items()}
+    sites = FixtureServer(build_fixtures(options["markets"], options["overlap"]), latency).start()
+    from config import Config, bootstrap
+    Config.TARGET_SITES = target_sites(sites.base_url)
+    bootstrap()
+
+    if options["mode"] == "flow":
+        from main_flow import run_crowdwisdom_flow
+        started = time.perf_counter()
+        state = run_crowdwisdom_flow()
+        wall = time.perf_counter() - started
+        timings = state.phase_timings
+        result = {
+            "success": state.flow_success,
+            "markets": state.total_products_collected,
+            "rows": state.final_summary.get("csv_rows_generated", 0),
+            "first_row_seconds": round(wall - timings.get("board", 0.0), 3),
+            "wall_seconds": round(wall, 3)
+        }
+    else:
+        from pipeline import run_streaming_pipeline
+        summary = run_streaming_pipeline()
+        result = {
+            "success": summary["success"],
+            "markets": summary.get("total_products_collected", 0),
+            "rows": summary.get("csv_rows_generated", 0),
+            "first_row_seconds": summary.get("time_to_first_row_seconds"),
+            "wall_seconds": summary.get("wall_seconds")
+        }
+    sites.stop()
+    result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    print(RESULT_MARKER + json.dumps(result), flush=True)
+
+
+def run(mode, args):
+    options = {"mode": mode, "markets": args.markets, "overlap": args.overlap, "latency": args.latency}
+    with tempfile.TemporaryDirectory(prefix="bench-stream-") as output_dir:
+        env = {
+            **os.environ,
+            "OUTPUT_DIR": output_dir,
+            "CSV_OUTPUT_PATH": str(Path(output_dir) / "unified_products.csv"),
+            "MISTRAL_API_KEY": "bench",
+            "MATCH_LLM_ADJUDICATION": "false",
+            "COLLECTION_MODE": "direct",
+            "MAX_PRODUCTS_PER_SITE": str(args.markets),
+            "CHECKPOINTS_ENABLED": "false",
+            "HTTP_CACHE_ENABLED": "false",
+            "POLITENESS_MIN_DELAY": "0",
+            "POLITENESS_JITTER": "0",
+            "LOG_LEVEL": "WARNING",
+            "CREWAI_TELEMETRY_ENABLED": "false",
+            "CREWAI_DISABLE_TELEMETRY": "true",
+            "OTEL_SDK_DISABLED": "true"
+        }
+        completed = subprocess.run(
+            [sys.executable, __file__, "--child", json.dumps(options)],
+            cwd=str(BENCH_DIR), env=env, capture_output=True, text=True, timeout=args.timeout
+        )
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    sys.stderr.write(completed.stderr[-4000:])
+    raise SystemExit(f"{mode} run exited with {completed.returncode} and no result")
+
+
+def parse_latency(value):
+    return {site: float(seconds) for site, seconds in (item.split("=") for item in value.split(",") if item)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--markets", type=int, default=2000, help="markets listed on the Polymarket fixture")
+    parser.add_argument("--overlap", type=float, default=0.6, help="share of them also listed on the other sites")
+    parser.add_argument("--latency", type=parse_latency, default="polymarket=0.2,kalshi=1.5,generic=3",
+                        help="seconds each fixture site waits before answering")
+    parser.add_argument("--timeout", type=float, default=900, help="seconds before a run is abandoned")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(json.loads(args.child))
+
+    results = {mode: run(mode, args) for mode in MODES}
+    print(f"markets={args.markets:,} latency={args.latency}\n")
+    print(f"{'':<8}{'markets':>9}{'rows':>8}{'first row s':>13}{'wall s':>9}{'peak RSS MB':>13}")
+    for mode, result in results.items():
+        first_row = result["first_row_seconds"]
+        print(f"{mode:<8}{result['markets']:>9}{result['rows']:>8}"
+              f"{first_row if first_row is not None else float('nan'):>13.3f}"
+              f"{result['wall_seconds']:>9.3f}{result['peak_rss_mb']:>13.1f}"
+              + ("" if result["success"] else "  (failed)"))
+
+
+if __name__ == "__main__":
+    main()
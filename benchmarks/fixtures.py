@@ -0,0 +1,303 @@
+"""
+Benchmark fixtures for CrowdWisdomTrading AI Agent
+Deterministic Polymarket/Kalshi API payloads and a generic markets page, plus the local servers that serve them
+"""
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SYLLABLES = ["ka", "vor", "len", "dri", "mo", "zan", "thi", "rus", "pel", "on", "gar", "bex", "qui", "sol", "tam"]
+
+# Each event is worded differently per venue, like the real sites
+POLYMARKET_TEMPLATES = [
+    "Will {name} win the {year} {office} election?",
+    "{name} above ${amount}k by {month} {year}?",
+    "Will {name} announce a {office} run before {month} {year}?",
+    "Will the {name} index close above {amount} in {month} {year}?"
+]
+KALSHI_TEMPLATES = [
+    "{name} to win {year} {office} race",
+    "Will {name} trade above ${amount}k on {month} {year}",
+    "{name} announces {office} campaign by {month} {year}",
+    "{name} index above {amount} at {month} {year} close"
+]
+GENERIC_TEMPLATES = [
+    "{office} {year}: will {name} win?",
+    "{name} price over ${amount}k ({month} {year})",
+    "{name} {office} announcement before {month} {year}",
+    "{name} index {amount}+ by end of {month} {year}"
+]
+OFFICES = ["Senate", "Governor", "Mayor", "Presidential", "House"]
+MONTHS = ["January", "March", "June", "September", "December"]
+
+
+def entity_name(i):
+    """
+    Unique made-up proper noun per event, so the fake LLM can tell which
+    listings describe the same event
+    """
+    base = len(SYLLABLES)
+    # Bijective base-15 numbering from the first three-syllable name
+    i += base + base * base
+    parts = []
+    while True:
+        i, r = divmod(i, base)
+        parts.append(SYLLABLES[r])
+        if i == 0:
+            break
+        i -= 1
+    return "".join(parts).capitalize()
+
+
+ENTITY_RE = re.compile(r"\b([A-Z][a-z]{5,})\b")
+
+
+def event_of(title):
+    """
+    The fixture entity a title refers to (None for words that are not one)
+    """
+    for word in ENTITY_RE.findall(str(title)):
+        if word.lower()[:2] in SYLLABLES or word.lower()[:3] in SYLLABLES:
+            return word.lower()
+    return None
+
+
+def make_events(count, seed=19):
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        events.append({
+            "id": i,
+            "kind": rng.randrange(len(POLYMARKET_TEMPLATES)),
+            "name": entity_name(i),
+            "year": 2026 + rng.randrange(3),
+            "office": rng.choice(OFFICES),
+            "month": rng.choice(MONTHS),
+            "amount": rng.randint(2, 150),
+            "yes": rng.randint(3, 97),
+            "volume": rng.randint(1_000, 5_000_000)
+        })
+    return events
+
+
+def build_fixtures(markets=200, overlap=0.6, seed=19):
+    """
+    Path -> (content type, body) for the three sites. Polymarket lists every
+    event; Kalshi and the generic site list an `overlap` share of them with
+    their own wording and prices a few points apart.
+    """
+    rng = random.Random(seed + 1)
+    events = make_events(markets, seed)
+    shared = [e for e in events if rng.random() < overlap]
+
+    polymarket = [{
+        "question": POLYMARKET_TEMPLATES[e["kind"]].format(**e),
+        "slug": f"{e['name'].lower()}-{e['id']}",
+        "outcomePrices": json.dumps([f"{e['yes'] / 100:.2f}", f"{1 - e['yes'] / 100:.2f}"]),
+        "volume": str(e["volume"]),
+        "category": "Politics" if e["kind"] in (0, 2) else "Markets"
+    } for e in events]
+
+    kalshi = {"markets": [{
+        "title": KALSHI_TEMPLATES[e["kind"]].format(**e),
+        "event_ticker": f"KX{e['name'].upper()}-{e['id']}",
+        "yes_ask": max(1, min(99, e["yes"] + rng.randint(-4, 4))),
+        "volume": e["volume"] // 7,
+        "category": "Politics" if e["kind"] in (0, 2) else "Economics"
+    } for e in shared], "cursor": ""}
+
+    cards = "\n".join(
+        f'<div class="market"><h3>{GENERIC_TEMPLATES[e["kind"]].format(**e)}</h3>'
+        f'<span class="price">{e["yes"]}%</span></div>'
+        for e in shared[::2]
+    )
+    generic = f"<!doctype html><html><head><title>Markets</title></head><body><h1>Open markets</h1>\n{cards}\n</body></html>"
+
+    return {
+        "/polymarket/api/markets": ("application/json", json.dumps(polymarket).encode("utf-8")),
+        "/kalshi/api/markets": ("application/json", json.dumps(kalshi).encode("utf-8")),
+        "/generic/markets": ("text/html; charset=utf-8", generic.encode("utf-8"))
+    }
+
+
+def target_sites(base_url):
+    """
+    TARGET_SITES entries pointing at a FixtureServer
+    """
+    return [
+        {"name": "polymarket", "base_url": f"{base_url}/polymarket", "markets_endpoint": "/markets",
+         "api_endpoint": f"{base_url}/polymarket/api/markets?limit={{limit}}"},
+        {"name": "kalshi", "base_url": f"{base_url}/kalshi", "markets_endpoint": "/markets",
+         "api_endpoint": f"{base_url}/kalshi/api/markets?limit={{limit}}"},
+        {"name": "prediction-market", "base_url": f"{base_url}/generic", "markets_endpoint": "/markets"}
+    ]
+
+
+class _Server:
+    def __init__(self, handler):
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+        self.httpd.owner = self
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def count(self, **fields):
+        with self._lock:
+            self.requests += 1
+            for name, value in fields.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _FixtureHandler(_QuietHandler):
+    def do_GET(self):
+        server = self.server.owner
+        parsed = urlparse(self.path)
+        fixture = server.fixtures.get(parsed.path)
+        if fixture is None:
+            server.count()
+            return self._send(404, b"not found", "text/plain")
+        content_type, body = fixture
+        delay = next((seconds for prefix, seconds in server.latency.items() if parsed.path.startswith(prefix)), 0)
+        if delay:
+            time.sleep(delay)
+        query = parse_qs(parsed.query)
+        if "limit" in query and content_type == "application/json":
+            start = (query.get("offset") or query.get("cursor") or ["0"])[0]
+            body = server.limited(parsed.path, int(query["limit"][0]), int(start))
+        etag = f'"{zlib.crc32(body):08x}"'
+        if self.headers.get("If-None-Match") == etag:
+            server.count(not_modified=1)
+            return self._send(304, headers={"ETag": etag})
+        server.count(bytes_sent=len(body))
+        self._send(200, body, content_type, {"ETag": etag})
+
+
+class FixtureServer(_Server):
+    """
+    Serves build_fixtures() with ETags (so revalidation answers 304) and
+    pages the APIs by ?limit= and ?offset= (gamma) or ?cursor= (Kalshi) like
+    the real endpoints. `latency` maps a path prefix ("/kalshi") to seconds
+    to wait before answering.
+    """
+    def __init__(self, fixtures, latency=None):
+        self.fixtures = fixtures
+        self.latency = latency or {}
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self._limited = {}
+        super().__init__(_FixtureHandler)
+
+    def limited(self, path, limit, start=0):
+        key = (path, limit, start)
+        if key not in self._limited:
+            payload = json.loads(self.fixtures[path][1])
+            if isinstance(payload, list):
+                payload = payload[start:start + limit]
+            else:
+                markets = payload["markets"]
+                cursor = str(start + limit) if start + limit < len(markets) else ""
+                payload = {**payload, "markets": markets[start:start + limit], "cursor": cursor}
+            self._limited[key] = json.dumps(payload).encode("utf-8")
+        return self._limited[key]
+
+
+def fake_reply(prompt):
+    """
+    What the stand-in model answers: pair adjudication and chunked matching
+    prompts are answered from the fixture entities, anything else gets a
+    short acknowledgement
+    """
+    if '{"same"' in prompt:
+        same = []
+        for line in prompt.splitlines():
+            match = re.match(r"\s*(\d+)\.\s.*\"(.*)\"\s<>\s\[.*?\]\s\"(.*)\"", line)
+            if match and event_of(match.group(2)) and event_of(match.group(2)) == event_of(match.group(3)):
+                same.append(int(match.group(1)))
+        answer = json.dumps({"same": same})
+    elif "matched_products" in prompt:
+        by_event = {}
+        for line in prompt.splitlines():
+            line = line.strip()
+            if not line.startswith('{"id"'):
+                continue
+            item = json.loads(line)
+            event = event_of(item.get("title"))
+            if event:
+                group = by_event.setdefault(event, {})
+                group.setdefault(item["site"], item["id"])
+        groups = [
+            {"product_ids": list(members.values()), "match_confidence": 0.9}
+            for members in by_event.values() if len(members) > 1
+        ]
+        answer = json.dumps({"matched_products": groups})
+    else:
+        answer = "OK"
+    return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+
+class _LLMHandler(_QuietHandler):
+    def do_POST(self):
+        server = self.server.owner
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not self.path.rstrip("/").endswith("chat/completions"):
+            server.count()
+            return self._send(404, b"{}")
+        request = json.loads(body or b"{}")
+        prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+        time.sleep(server.latency)
+        reply = fake_reply(prompt)
+        prompt_tokens = len(prompt) // 4 + 1
+        completion_tokens = len(reply) // 4 + 1
+        server.count(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        self._send(200, json.dumps({
+            "id": f"bench-{server.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "bench"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": reply}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens}
+        }).encode("utf-8"))
+
+
+class FakeLLMServer(_Server):
+    """
+    OpenAI-compatible /chat/completions stand-in for the Mistral endpoint
+    (point MISTRAL_API_BASE at base_url), sleeping `latency` seconds per call
+    """
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        super().__init__(_LLMHandler)
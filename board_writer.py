@@ -0,0 +1,143 @@
+"""
+Board writer for CrowdWisdomTrading AI Agent
+Streams matched product groups straight into the unified CSV board
+"""
+
+import csv
+import os
+import stat
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from config import logger
+from pricing import annotate_products
+from records import MarketColumns
+
+BOARD_COLUMNS = [
+    "unified_title", "category", "polymarket_price", "kalshi_price", "other_site_price",
+    "price_difference", "sites_available", "confidence_level", "volume_info", "last_updated",
+    "arbitrage_margin"
+]
+NAMED_SITES = ("polymarket", "kalshi")
+GENERIC_CATEGORIES = {"", "unknown", "general", "market", "prediction"}
+
+
+def _clean(value):
+    # str.split() breaks on the same Unicode whitespace as \s, without a regex pass
+    text = " ".join(str(value if value is not None else "").split())
+    return text or "N/A"
+
+
+def board_row(group, last_updated, columns=None, start=0):
+    """
+    One board row for a match group. write_board passes a MarketColumns view
+    over every product on the board, with this group's products from
+    `start` on; without one the group's own products are read.
+    """
+    products = group.get("products", [])
+    if columns is None:
+        columns, start = MarketColumns(products), 0
+    stop = start + len(products)
+    prices = {}
+    probabilities = {}
+    volumes = []
+    for site, price, yes_price, volume in zip(
+        columns.sites()[start:stop], columns["price"][start:stop],
+        columns["yes_price"][start:stop], columns["volume"][start:stop]
+    ):
+        prices.setdefault(site, price)
+        if yes_price is not None:
+            probabilities.setdefault(site, yes_price)
+        if volume:
+            volumes.append(f"{site}: {_clean(volume)}")
+
+    categories = [str(c or "") for c in columns["category"][start:stop]]
+    category = next((c for c in categories if c.lower() not in GENERIC_CATEGORIES), categories[0] if categories else "")
+    others = [f"{site}: {_clean(price)}" for site, price in prices.items() if site not in NAMED_SITES]
+    if group.get("spread") is not None:
+        difference = f"{group['spread']:.3f}"
+    else:
+        quoted = list(probabilities.values())
+        difference = f"{max(quoted) - min(quoted):.3f}" if len(quoted) > 1 else "N/A"
+    margin = group.get("arbitrage_margin")
+
+    return [
+        _clean(group.get("unified_title")),
+        _clean(category),
+        _clean(prices.get("polymarket")),
+        _clean(prices.get("kalshi")),
+        "; ".join(others) or "N/A",
+        difference,
+        ",".join(group.get("sites") or sorted(prices)),
+        f"{float(group.get('match_confidence', 0.0)):.3f}",
+        "; ".join(volumes) or "N/A",
+        last_updated,
+        f"{margin:.4f}" if margin is not None else "N/A"
+    ]
+
+
+def _board_mode(output_path):
+    """
+    Permission bits for a new board: the current board's, else what a plain
+    open() would have given it (0666 minus the umask)
+    """
+    try:
+        return stat.S_IMODE(os.stat(output_path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def write_rows(rows, output_path):
+    """
+    Writes the header plus `rows` (any iterable, consumed lazily) to a temp
+    file next to `output_path` and renames it into place, so readers never
+    see a half-written board. Returns the number of data rows written.
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".tmp")
+    count = 0
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(BOARD_COLUMNS)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file 0600, which the rename would carry over to the board
+        os.chmod(temp_path, _board_mode(output_path))
+        os.replace(temp_path, output_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    logger.info(f"Board written to {output_path}: {count} rows")
+    return count
+
+
+def write_board(matched_products, output_path, last_updated=None):
+    last_updated = last_updated or datetime.now().isoformat()
+    products = [p for g in matched_products for p in g.get("products", [])]
+    # Products that skipped the matching stage's normalization get it here, in one batch
+    annotate_products([p for p in products if "yes_price" not in p])
+    columns = MarketColumns(products)
+
+    def rows():
+        start = 0
+        for group in matched_products:
+            yield board_row(group, last_updated, columns, start)
+            start += len(group.get("products", []))
+
+    return write_rows(rows(), output_path)
+
+
+def write_error_board(output_path, message="No data collected - See error log"):
+    row = [message, "Error", "N/A", "N/A", "N/A", "N/A", "None", "0.0", "N/A", datetime.now().isoformat(), "N/A"]
+    return write_rows([row], output_path)
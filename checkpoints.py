@@ -0,0 +1,164 @@
+"""
+Flow checkpoints for CrowdWisdomTrading AI Agent
+Per-phase snapshots of a run's outputs, so a failed run can resume from its last completed phase
+"""
+
+import hashlib
+import json
+import pickle
+import shutil
+import time
+from pathlib import Path
+
+from config import Config, logger
+
+PHASES = ("scraped_data", "matched_products", "board")
+
+
+def input_hash():
+    """
+    Short hash of the settings that decide what a run produces; a run only
+    resumes automatically from checkpoints taken with the same inputs
+    """
+    inputs = {
+        "sites": Config.TARGET_SITES,
+        "collection_mode": Config.COLLECTION_MODE,
+        "max_products_per_site": Config.MAX_PRODUCTS_PER_SITE,
+        "matching_mode": Config.MATCHING_MODE,
+        "match_threshold": Config.MATCH_THRESHOLD,
+        "match_ambiguous_margin": Config.MATCH_AMBIGUOUS_MARGIN,
+        "match_llm_adjudication": Config.MATCH_LLM_ADJUDICATION,
+        "csv_output_path": str(Config.CSV_OUTPUT_PATH)
+    }
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:12]
+
+
+def format_age(seconds):
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f}m"
+    if seconds < 2 * 86400:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 86400:.1f}d"
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class FlowCheckpoint:
+    """
+    One flow run's checkpoints: <root>/<flow id>.<input hash>/<phase>.pkl,
+    one pickle per completed phase. A run with a board checkpoint finished.
+    """
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.flow_id, _, self.input_hash = self.directory.name.rpartition(".")
+
+    def path(self, phase):
+        return self.directory / f"{phase}.pkl"
+
+    def has(self, phase):
+        return self.path(phase).exists()
+
+    @property
+    def phases(self):
+        return [phase for phase in PHASES if self.has(phase)]
+
+    @property
+    def last_phase(self):
+        phases = self.phases
+        return phases[-1] if phases else None
+
+    @property
+    def completed(self):
+        return self.has("board")
+
+    def saved_at(self, phase=None):
+        phase = phase or self.last_phase
+        return self.path(phase).stat().st_mtime if phase else 0.0
+
+    def age(self, phase=None):
+        return time.time() - self.saved_at(phase)
+
+    def size(self, phase=None):
+        phases = [phase] if phase else self.phases
+        return sum(self.path(p).stat().st_size for p in phases)
+
+    def save(self, phase, payload):
+        """
+        Pickles `payload` as this run's `phase` output; written aside and
+        renamed so a crash never leaves a truncated checkpoint
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(phase)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        with open(temp_path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        temp_path.replace(path)
+        logger.info(f"Checkpoint {phase} saved for flow {self.flow_id} ({format_size(path.stat().st_size)})")
+
+    def load(self, phase):
+        # Pickle, so only point CHECKPOINT_DIR at a directory no one else writes to
+        with open(self.path(phase), "rb") as f:
+            return pickle.load(f)
+
+    def describe(self):
+        return {
+            "flow_id": self.flow_id,
+            "input_hash": self.input_hash,
+            "completed": self.completed,
+            "phases": [
+                {"phase": phase, "age_seconds": round(self.age(phase), 1), "bytes": self.size(phase)}
+                for phase in self.phases
+            ]
+        }
+
+
+class CheckpointStore:
+    """
+    All flow checkpoints under CHECKPOINT_DIR, newest first
+    """
+    def __init__(self, root=None):
+        self.root = Path(root or Config.CHECKPOINT_DIR)
+
+    def open(self, flow_id, inputs=None):
+        return FlowCheckpoint(self.root / f"{flow_id}.{inputs or input_hash()}")
+
+    def all(self):
+        if not self.root.exists():
+            return []
+        checkpoints = [FlowCheckpoint(d) for d in self.root.iterdir() if d.is_dir() and not d.name.startswith(".")]
+        checkpoints = [c for c in checkpoints if c.phases]
+        return sorted(checkpoints, key=lambda c: c.saved_at(), reverse=True)
+
+    def find(self, flow_id):
+        return next((c for c in self.all() if c.flow_id == flow_id), None)
+
+    def latest_resumable(self, inputs=None, max_age=None):
+        """
+        The newest run with the same inputs, if it stopped before its board
+        and its last checkpoint is at most `max_age` seconds old
+        """
+        inputs = inputs or input_hash()
+        max_age = Config.CHECKPOINT_MAX_AGE if max_age is None else max_age
+        latest = next((c for c in self.all() if c.input_hash == inputs), None)
+        if latest is None or latest.completed or latest.age() > max_age:
+            return None
+        return latest
+
+    def prune(self, keep=None):
+        """
+        Deletes all but the `keep` newest runs' checkpoints
+        """
+        keep = Config.CHECKPOINT_KEEP if keep is None else keep
+        for checkpoint in self.all()[keep:]:
+            shutil.rmtree(checkpoint.directory, ignore_errors=True)
+
+
+checkpoint_store = CheckpointStore()
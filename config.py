@@ -3,33 +3,112 @@ CrowdWisdomTrading AI Agent
 Main configuration and setup module
 """
 
+import json
 import os
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 from loguru import logger
 import sys
 
+# Taken as early as the imports allow; startup_seconds() counts from here
+PROCESS_START = time.perf_counter()
+
 # Load environment variables
 load_dotenv()
 
 class Config:
     MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
+    MISTRAL_API_BASE = os.getenv("MISTRAL_API_BASE") or None
     DEFAULT_MODEL = "mistral/mistral-large-latest"
     FALLBACK_MODEL = "mistral/mistral-medium-latest"
     TEMPERATURE = 0.1
     MAX_TOKENS = 4000
     HEADLESS_BROWSER = os.getenv("HEADLESS_BROWSER", "true").lower() == "true"
-    REQUEST_TIMEOUT = 30
+    CONNECT_TIMEOUT = float(os.getenv("CONNECT_TIMEOUT", "5"))
+    READ_TIMEOUT = float(os.getenv("READ_TIMEOUT", os.getenv("REQUEST_TIMEOUT", "30")))
+    REQUEST_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
     MAX_RETRIES = 3
+    HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "10"))
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+    HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+    HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "2000"))
+    MIN_MARKETS_PER_SITE = int(os.getenv("MIN_MARKETS_PER_SITE", "5"))
+    MAX_PRODUCTS_PER_SITE = int(os.getenv("MAX_PRODUCTS_PER_SITE", "50"))
+    SITE_TIER_RECHECK_HOURS = float(os.getenv("SITE_TIER_RECHECK_HOURS", "24"))
+    COLLECTION_MODE = os.getenv("COLLECTION_MODE", "direct").lower()
+    CONCURRENT_COLLECTION = os.getenv("CONCURRENT_COLLECTION", "true").lower() == "true"
+    COLLECTION_CONCURRENCY = int(os.getenv("COLLECTION_CONCURRENCY", "3"))
+    SITE_TIMEOUT = int(os.getenv("SITE_TIMEOUT", "300"))
+    STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "100"))
+    STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "8"))
+    STREAM_MAX_BLOCK_SIZE = int(os.getenv("STREAM_MAX_BLOCK_SIZE", "50"))
+    DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+    DRIVER_MAX_PAGES = int(os.getenv("DRIVER_MAX_PAGES", "25"))
+    DRIVER_ACQUIRE_TIMEOUT = int(os.getenv("DRIVER_ACQUIRE_TIMEOUT", "120"))
+    PAGE_SETTLE_SECONDS = float(os.getenv("PAGE_SETTLE_SECONDS", "0.5"))
+    PAGE_POLL_INTERVAL = float(os.getenv("PAGE_POLL_INTERVAL", "0.1"))
+    HARVEST_TIME_BUDGET = float(os.getenv("HARVEST_TIME_BUDGET", "60"))
+    HARVEST_IDLE_STEPS = int(os.getenv("HARVEST_IDLE_STEPS", "3"))
+    HARVEST_STEP_WAIT = float(os.getenv("HARVEST_STEP_WAIT", "2.0"))
+    POLITENESS_MIN_DELAY = float(os.getenv("POLITENESS_MIN_DELAY", "1.0"))
+    POLITENESS_JITTER = float(os.getenv("POLITENESS_JITTER", "2.0"))
+    PARSER_WORKERS = int(os.getenv("PARSER_WORKERS", "2"))
+    PARSER_TIMEOUT = int(os.getenv("PARSER_TIMEOUT", "60"))
+    GENERIC_MIN_SCORE = float(os.getenv("GENERIC_MIN_SCORE", "2.0"))
+    MATCHING_MODE = os.getenv("MATCHING_MODE", "local").lower()
+    MATCH_THRESHOLD = float(os.getenv("MATCH_THRESHOLD", "0.78"))
+    MATCH_AMBIGUOUS_MARGIN = float(os.getenv("MATCH_AMBIGUOUS_MARGIN", "0.1"))
+    MATCH_LLM_ADJUDICATION = os.getenv("MATCH_LLM_ADJUDICATION", "true").lower() == "true"
+    MATCH_MAX_BLOCK_SIZE = int(os.getenv("MATCH_MAX_BLOCK_SIZE", "500"))
+    MATCH_MAX_LLM_PAIRS = int(os.getenv("MATCH_MAX_LLM_PAIRS", "40"))
+    LLM_CONTEXT_TOKENS = int(os.getenv("LLM_CONTEXT_TOKENS", "128000"))
+    LLM_CHUNK_TOKENS = int(os.getenv("LLM_CHUNK_TOKENS", "8000"))
+    LLM_PROMPT_OVERHEAD_TOKENS = 1500
+    LLM_CHARS_PER_TOKEN = 4
+    LLM_REPLY_TOKENS_PER_PRODUCT = 12
+    LLM_PREFILTER_SCORE = float(os.getenv("LLM_PREFILTER_SCORE", "0.45"))
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+    LLM_MATCHING_TIMEOUT = int(os.getenv("LLM_MATCHING_TIMEOUT", "600"))
+    INCREMENTAL_RUNS = os.getenv("INCREMENTAL_RUNS", "true").lower() == "true"
+    INCREMENTAL_MAX_DIRTY_RATIO = float(os.getenv("INCREMENTAL_MAX_DIRTY_RATIO", "0.5"))
+    REFRESH_INTERVAL = float(os.getenv("REFRESH_INTERVAL", "300"))
+    DAEMON_TICK_SECONDS = float(os.getenv("DAEMON_TICK_SECONDS", "1.0"))
+    HISTORY_ENABLED = os.getenv("HISTORY_ENABLED", "true").lower() == "true"
+    CHECKPOINTS_ENABLED = os.getenv("CHECKPOINTS_ENABLED", "true").lower() == "true"
+    CHECKPOINT_AUTO_RESUME = os.getenv("CHECKPOINT_AUTO_RESUME", "true").lower() == "true"
+    CHECKPOINT_MAX_AGE = int(os.getenv("CHECKPOINT_MAX_AGE", "1800"))
+    CHECKPOINT_KEEP = int(os.getenv("CHECKPOINT_KEEP", "5"))
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+    # Fee per venue as a fraction of the stake, applied to each arbitrage leg
+    VENUE_FEES = json.loads(os.getenv("VENUE_FEES", '{"polymarket": 0.0, "kalshi": 0.02, "default": 0.02}'))
+    ARBITRAGE_TOP_K = int(os.getenv("ARBITRAGE_TOP_K", "20"))
+    BOARD_NARRATIVE = os.getenv("BOARD_NARRATIVE", "false").lower() == "true"
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+    LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "200"))
     USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
     TARGET_SITES = [
-        {"name": "polymarket","base_url": "https://polymarket.com","markets_endpoint": "/markets"},
-        {"name": "kalshi", "base_url": "https://kalshi.com","markets_endpoint": "/markets"},
-        {"name": "prediction-market", "base_url": "https://www.prediction-market.com","markets_endpoint": "/markets"}
+        {"name": "polymarket","base_url": "https://polymarket.com","markets_endpoint": "/markets",
+         "api_endpoint": "https://gamma-api.polymarket.com/markets?active=true&closed=false&limit={limit}"},
+        {"name": "kalshi", "base_url": "https://kalshi.com","markets_endpoint": "/markets",
+         "api_endpoint": "https://api.elections.kalshi.com/trade-api/v2/markets?status=open&limit={limit}"},
+        {"name": "prediction-market", "base_url": "https://www.prediction-market.com","markets_endpoint": "/markets",
+         "refresh_interval": 900}
     ]
     OUTPUT_DIR = Path(os.getenv("OUTPUT_DIR", "./output"))
     CSV_OUTPUT_PATH = Path(os.getenv("CSV_OUTPUT_PATH", "./output/unified_products.csv"))
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LLM_CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", str(OUTPUT_DIR / "llm_cache.sqlite")))
+    HTTP_CACHE_PATH = Path(os.getenv("HTTP_CACHE_PATH", str(OUTPUT_DIR / "http_cache.sqlite")))
+    SNAPSHOT_PATH = Path(os.getenv("SNAPSHOT_PATH", str(OUTPUT_DIR / "snapshots.sqlite")))
+    HISTORY_DIR = Path(os.getenv("HISTORY_DIR", str(OUTPUT_DIR / "history")))
+    CHECKPOINT_DIR = Path(os.getenv("CHECKPOINT_DIR", str(OUTPUT_DIR / "checkpoints")))
+    SITE_TIERS_PATH = Path(os.getenv("SITE_TIERS_PATH", str(OUTPUT_DIR / "site_tiers.json")))
+    METRICS_JSONL_PATH = Path(os.getenv("METRICS_JSONL_PATH", str(OUTPUT_DIR / "metrics.jsonl")))
+    METRICS_PROM_PATH = Path(os.getenv("METRICS_PROM_PATH", str(OUTPUT_DIR / "metrics.prom")))
 
     @classmethod
     def validate(cls):
@@ -60,6 +139,22 @@ def setup_logging():
     )
     return logger
 
-setup_logging()
-Config.validate()
-logger.info("CrowdWisdomTrading AI Agent - Configuration loaded successfully")
+def startup_seconds():
+    return time.perf_counter() - PROCESS_START
+
+_bootstrapped = False
+
+def bootstrap():
+    """
+    Configures logging and validates settings. Entry points call this
+    explicitly so importing a module has no side effects; repeat calls are
+    no-ops.
+    """
+    global _bootstrapped
+    if _bootstrapped:
+        return logger
+    setup_logging()
+    Config.validate()
+    _bootstrapped = True
+    logger.info("CrowdWisdomTrading AI Agent - Configuration loaded successfully")
+    return logger
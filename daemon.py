@@ -0,0 +1,195 @@
+"""
+Refresh daemon for CrowdWisdomTrading AI Agent
+Keeps one warm process running and refreshes every site on its own interval
+"""
+
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config, logger
+from main_flow import CrowdWisdomTradingFlow
+from metrics import metrics
+
+
+class SiteSchedule:
+    """
+    Refresh slot bookkeeping for one TARGET_SITES entry
+    """
+    def __init__(self, site_config, start_at):
+        self.name = site_config["name"]
+        self.url = f"{site_config['base_url']}{site_config['markets_endpoint']}"
+        self.interval = float(site_config.get("refresh_interval", Config.REFRESH_INTERVAL))
+        self.next_due = start_at
+        self.running = False
+        # Set while politeness spacing on the host keeps a due refresh waiting
+        self.held = False
+        self.runs = 0
+        self.skipped = 0
+        self.last_result = None
+
+    def advance(self, now, busy=False):
+        """
+        Moves next_due to the first slot after `now` on the site's grid.
+        Slots that passed unserved, including the current one when the site
+        is still `busy`, are counted as skipped rather than queued.
+        """
+        missed = int((now - self.next_due) // self.interval)
+        self.next_due += (missed + 1) * self.interval
+        missed += 1 if busy else 0
+        if busy:
+            cause = "while a refresh was running"
+        elif self.held:
+            cause = "while politeness spacing held it back"
+        else:
+            cause = "because the scheduler ticked late"
+        self.held = False
+        if missed > 0:
+            self.skipped += missed
+            logger.info(f"{self.name}: skipped {missed} refresh slot(s) {cause}")
+
+
+class RefreshDaemon:
+    """
+    Scheduler loop over SiteSchedules.
+
+    A due site is scraped on the worker pool unless its previous refresh is
+    still running, so refreshes never overlap per site. Each finished
+    refresh requests a board publish: matching plus the atomic board write
+    over the latest good result of every site. Publishes run one at a time
+    and requests arriving during one are coalesced into a single follow-up.
+    The driver pool, HTTP sessions, LLM and agents stay warm between cycles.
+    """
+    def __init__(self, sites=None, max_workers=None, tick=None):
+        now = time.monotonic()
+        self.schedules = [SiteSchedule(site, now) for site in (sites or Config.TARGET_SITES)]
+        self.tick = tick or Config.DAEMON_TICK_SECONDS
+        self._scraper = CrowdWisdomTradingFlow()
+        self._workers = ThreadPoolExecutor(
+            max_workers=max_workers or max(1, Config.COLLECTION_CONCURRENCY),
+            thread_name_prefix="site-refresh"
+        )
+        self._publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="board-publish")
+        self._lock = threading.Lock()
+        self._publishing = False
+        self._publish_pending = False
+        self._stop = threading.Event()
+        self._metrics_mark = metrics.mark()
+        self.publishes = 0
+
+    def _refresh(self, schedule):
+        started = time.monotonic()
+        try:
+            result = self._scraper._scrape_site({"site": schedule.name, "task": None, "url": schedule.url})
+        except Exception as e:
+            logger.error(f"Refresh of {schedule.name} failed: {str(e)}")
+            result = None
+        with self._lock:
+            schedule.running = False
+            schedule.runs += 1
+            if result and result["success"]:
+                schedule.last_result = result
+            elif schedule.last_result:
+                logger.warning(f"{schedule.name}: refresh returned no data, keeping the previous result")
+        logger.info(f"{schedule.name}: refresh finished in {time.monotonic() - started:.2f}s")
+        if result and result["success"]:
+            self.request_publish()
+
+    def request_publish(self):
+        with self._lock:
+            if self._publishing:
+                self._publish_pending = True
+                return
+            self._publishing = True
+        self._publisher.submit(self._publish_loop)
+
+    def _publish_loop(self):
+        while True:
+            try:
+                self.publish()
+            except Exception as e:
+                logger.error(f"Board publish failed: {str(e)}")
+            with self._lock:
+                if not self._publish_pending:
+                    self._publishing = False
+                    return
+                self._publish_pending = False
+
+    def publish(self):
+        """
+        Runs matching and writes the board from each site's latest result
+        """
+        with self._lock:
+            scraped = [s.last_result for s in self.schedules if s.last_result]
+        if not scraped:
+            return
+        flow = CrowdWisdomTradingFlow()
+        # Each publish reports everything since the previous one, refreshes included
+        flow._metrics_mark = self._metrics_mark
+        flow.state.scraped_data = scraped
+        flow.state.total_products_collected = sum(r["products_count"] for r in scraped)
+        flow.generate_final_csv(flow.scan_arbitrage(flow.execute_product_matching()))
+        self._metrics_mark = metrics.mark()
+        self.publishes += 1
+        logger.info(
+            f"Board publish #{self.publishes}: {flow.state.unique_products_count} groups "
+            f"from {len(scraped)} sites, changes {flow.state.market_changes}"
+        )
+
+    def run_pending(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            due = [s for s in self.schedules if s.next_due <= now]
+            for schedule in due:
+                if schedule.running:
+                    # Drop this slot instead of stacking a second refresh behind the running one
+                    schedule.advance(now, busy=True)
+                    continue
+                if self._scraper._polite_delay({"site": schedule.name, "task": None, "url": schedule.url}) > 0:
+                    # Still due on the next tick, once the host's politeness spacing has passed
+                    schedule.held = True
+                    continue
+                schedule.running = True
+                schedule.advance(now)
+                self._workers.submit(self._refresh, schedule)
+
+    def run(self, duration=None):
+        """
+        Schedules refreshes until stop() is called, SIGINT/SIGTERM arrives or
+        `duration` seconds pass
+        """
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, lambda *_: self.stop())
+        if Config.METRICS_PORT:
+            metrics.serve(Config.METRICS_PORT)
+        logger.info(
+            "Daemon started: " + ", ".join(f"{s.name} every {s.interval:.0f}s" for s in self.schedules)
+        )
+        deadline = time.monotonic() + duration if duration else None
+        while not self._stop.is_set():
+            self.run_pending()
+            if deadline and time.monotonic() >= deadline:
+                break
+            self._stop.wait(self.tick)
+        logger.info("Daemon stopping after the running refreshes")
+        self.shutdown()
+
+    def stop(self):
+        # Also the signal handler, so it only sets the event
+        self._stop.set()
+
+    def shutdown(self):
+        self._stop.set()
+        self._workers.shutdown(wait=True, cancel_futures=True)
+        self._publisher.shutdown(wait=True)
+        metrics.stop_serving()
+        logger.info(f"Daemon stopped: {self.stats()}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "publishes": self.publishes,
+                "sites": {s.name: {"runs": s.runs, "skipped_slots": s.skipped} for s in self.schedules}
+            }
@@ -0,0 +1,234 @@
+"""
+Chrome WebDriver pool for CrowdWisdomTrading AI Agent
+Keeps warm browsers around and hands out a clean tab per scrape
+"""
+
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from queue import Queue, Empty
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from config import Config, logger
+from metrics import metrics
+
+
+class PooledDriver:
+    """
+    A warm browser owned by the pool, plus the bookkeeping used to recycle it
+    """
+    def __init__(self, driver, launch_seconds):
+        self.driver = driver
+        self.base_handle = driver.current_window_handle
+        self.launch_seconds = launch_seconds
+        self.pages_served = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """
+    Bounded pool of Chrome sessions.
+
+    The chromedriver binary is resolved once per process. Browsers are launched
+    lazily up to `size`, health-checked on checkout and recycled after
+    `max_pages` scrapes or as soon as they stop responding.
+    """
+    def __init__(self, size=None, max_pages=None):
+        self.size = size or Config.DRIVER_POOL_SIZE
+        self.max_pages = max_pages or Config.DRIVER_MAX_PAGES
+        self._idle = Queue()
+        self._lock = threading.Lock()
+        self._driver_path = None
+        self._live = 0
+        self._closed = False
+        self._stats = {
+            "launched": 0,
+            "recycled": 0,
+            "crashed": 0,
+            "acquisitions": 0,
+            "pages_served": 0,
+            "wait_seconds": 0.0,
+            "launch_seconds": 0.0
+        }
+
+    def _resolve_driver_path(self):
+        with self._lock:
+            if self._driver_path is None:
+                self._driver_path = ChromeDriverManager().install()
+                logger.info(f"Resolved chromedriver at {self._driver_path}")
+            return self._driver_path
+
+    def _chrome_options(self):
+        chrome_options = Options()
+        if Config.HEADLESS_BROWSER:
+            chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument(f"--user-agent={Config.USER_AGENT}")
+        return chrome_options
+
+    def _launch(self):
+        started = time.perf_counter()
+        try:
+            service = Service(self._resolve_driver_path())
+            driver = webdriver.Chrome(service=service, options=self._chrome_options())
+        except Exception:
+            with self._lock:
+                self._live -= 1
+            raise
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats["launched"] += 1
+            self._stats["launch_seconds"] += elapsed
+        metrics.observe("crowdwisdom_browser_launch_seconds", elapsed)
+        logger.info(f"Launched pooled Chrome session in {elapsed:.2f}s")
+        return PooledDriver(driver, elapsed)
+
+    def _discard(self, pooled, reason):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.debug(f"Error quitting pooled Chrome session: {str(e)}")
+        with self._lock:
+            self._live -= 1
+            self._stats["recycled"] += 1
+            if reason == "crashed":
+                self._stats["crashed"] += 1
+        metrics.inc("crowdwisdom_browser_recycled_total", reason=reason)
+        logger.info(f"Recycled pooled Chrome session ({reason}, {pooled.pages_served} pages served)")
+
+    @staticmethod
+    def _is_healthy(pooled):
+        try:
+            return pooled.base_handle in pooled.driver.window_handles
+        except Exception:
+            return False
+
+    def _checkout(self, timeout):
+        waited_from = time.perf_counter()
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except Empty:
+                pooled = None
+                with self._lock:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is shut down")
+                    can_launch = self._live < self.size
+                    if can_launch:
+                        self._live += 1
+                if can_launch:
+                    pooled = self._launch()
+                else:
+                    remaining = timeout - (time.perf_counter() - waited_from)
+                    if remaining <= 0:
+                        raise TimeoutError(f"No Chrome session became free within {timeout}s")
+                    # Poll so a slot freed by a recycled browser is noticed promptly
+                    try:
+                        pooled = self._idle.get(timeout=min(remaining, 0.25))
+                    except Empty:
+                        continue
+
+            if self._is_healthy(pooled):
+                waited = time.perf_counter() - waited_from
+                with self._lock:
+                    self._stats["acquisitions"] += 1
+                    self._stats["wait_seconds"] += waited
+                metrics.observe("crowdwisdom_browser_checkout_seconds", waited)
+                return pooled
+            self._discard(pooled, "crashed")
+
+    def _checkin(self, pooled, tab_handle):
+        healthy = self._is_healthy(pooled)
+        if healthy:
+            try:
+                if tab_handle in pooled.driver.window_handles:
+                    pooled.driver.switch_to.window(tab_handle)
+                    pooled.driver.close()
+                pooled.driver.switch_to.window(pooled.base_handle)
+                pooled.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            except WebDriverException as e:
+                logger.debug(f"Failed to reset pooled Chrome session: {str(e)}")
+                healthy = False
+
+        pooled.pages_served += 1
+        with self._lock:
+            self._stats["pages_served"] += 1
+            closed = self._closed
+
+        if not healthy:
+            self._discard(pooled, "crashed")
+        elif pooled.pages_served >= self.max_pages:
+            self._discard(pooled, "page limit")
+        elif closed:
+            self._discard(pooled, "shutdown")
+        else:
+            self._idle.put(pooled)
+
+    @contextmanager
+    def session(self, timeout=None):
+        """
+        Yields a driver focused on a fresh tab; the tab is closed and cookies
+        cleared when the block exits, and the browser goes back to the pool
+        """
+        pooled = self._checkout(timeout or Config.DRIVER_ACQUIRE_TIMEOUT)
+        tab_handle = None
+        try:
+            pooled.driver.switch_to.new_window("tab")
+            tab_handle = pooled.driver.current_window_handle
+            yield pooled.driver
+        finally:
+            self._checkin(pooled, tab_handle)
+
+    def warm(self, count=None):
+        """
+        Launches browsers up front so the first scrapes don't pay for startup
+        """
+        count = min(count or self.size, self.size)
+        launched = []
+        for _ in range(count):
+            with self._lock:
+                if self._live >= self.size:
+                    break
+                self._live += 1
+            launched.append(self._launch())
+        for pooled in launched:
+            self._idle.put(pooled)
+        return len(launched)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            live = self._live
+        idle = self._idle.qsize()
+        launched = stats["launched"]
+        stats.update({
+            "size": self.size,
+            "max_pages_per_browser": self.max_pages,
+            "live": live,
+            "idle": idle,
+            "in_use": live - idle,
+            "avg_launch_seconds": round(stats["launch_seconds"] / launched, 3) if launched else 0.0,
+            "avg_wait_seconds": round(stats["wait_seconds"] / stats["acquisitions"], 3) if stats["acquisitions"] else 0.0
+        })
+        return stats
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(pooled, "shutdown")
+
+
+driver_pool = DriverPool()
+atexit.register(driver_pool.shutdown)
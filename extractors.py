@@ -0,0 +1,204 @@
+"""
+In-page market card extraction for CrowdWisdomTrading AI Agent
+Harvests market cards step by step through infinite scroll and pagination, one execute_script round trip per step
+"""
+
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from config import Config, logger
+from metrics import metrics
+
+# Per-site card and field selectors; the first selector that matches wins
+SITE_EXTRACTORS = {
+    "polymarket": {
+        "cards": ["[data-testid*='market']", ".market-card", "div[role='button']", "a[href*='market']"],
+        "fields": {
+            "title": ["[data-testid*='title']", "h2", "h3", "p[class*='title']"],
+            "price": ["[data-testid*='price']", "[class*='price']", "[class*='outcome']", "[class*='percent']"],
+            "volume": ["[data-testid*='volume']", "[class*='volume']"],
+            "category": ["[data-testid*='category']", "[class*='category']", "[class*='tag']"]
+        },
+        "link": "a[href*='/event/'], a[href*='market'], a[href]",
+        "more": ["button[class*='load-more']"],
+        "default_category": "Unknown"
+    },
+    "kalshi": {
+        "cards": [".market-item", ".event-card", "div[class*='card']"],
+        "fields": {
+            "title": ["[class*='title']", "h2", "h3", "h4"],
+            "price": ["[class*='price']", "[class*='chance']", "[class*='yes']"],
+            "volume": ["[class*='volume']", "[class*='vol']"],
+            "category": ["[class*='category']", "[class*='series']", "[class*='tag']"]
+        },
+        "link": "a[href*='/markets/'], a[href*='/events/'], a[href]",
+        "more": ["a[rel='next']", "button[aria-label*='next' i]", "button[class*='load-more']"],
+        "default_category": "Prediction"
+    }
+}
+# Buttons that load more cards or open the next page, when no "more" selector matches
+MORE_BUTTON_TEXT = r"^\s*((load|show|view|see) more|next( page)?\s*[>›»]?)\s*$"
+
+_CARD_HELPERS_JS = """
+const config = arguments[0];
+let cards = [];
+for (const selector of config.cards) {
+    cards = document.querySelectorAll(selector);
+    if (cards.length) break;
+}
+const pick = (card, selectors) => {
+    for (const selector of selectors) {
+        const el = card.querySelector(selector);
+        const text = el && el.innerText ? el.innerText.trim() : "";
+        if (text) return text;
+    }
+    return "";
+};
+const linkOf = card => card.matches("a[href]") ? card : card.querySelector(config.link);
+const volumePattern = /\\$?[\\d.,]+\\s*[kmb]?\\s*vol/i;
+const read = (card, text, link) => {
+    const volumeMatch = text.match(volumePattern);
+    return {
+        title: pick(card, config.fields.title) || text.split("\\n")[0].trim(),
+        price: pick(card, config.fields.price) || text,
+        volume: pick(card, config.fields.volume) || (volumeMatch ? volumeMatch[0] : ""),
+        url: link ? link.href : "",
+        category: pick(card, config.fields.category)
+    };
+};
+"""
+
+# One harvest step: read the cards not read before, then scroll or page for more. A read card is
+# tagged with its link in data-cw-seen, so a virtualized list that recycles the node for another
+# market is read again; only untagged or retagged cards have their text read.
+HARVEST_STEP_JS = _CARD_HELPERS_JS + """
+const maxCards = arguments[1];
+const moreText = new RegExp(arguments[2], "i");
+const out = [];
+let last = null;
+for (const card of cards) {
+    last = card;
+    if (out.length >= maxCards) continue;
+    const link = linkOf(card);
+    if (link && card.dataset.cwSeen === link.href) continue;
+    const text = (card.innerText || "").trim();
+    const key = link ? link.href : text;
+    if (!text || card.dataset.cwSeen === key) continue;
+    card.dataset.cwSeen = key;
+    out.push(read(card, text, link));
+}
+const usable = el => el.offsetParent !== null && !el.disabled && el.getAttribute("aria-disabled") !== "true";
+let more = null;
+for (const selector of config.more || []) {
+    more = Array.from(document.querySelectorAll(selector)).find(usable);
+    if (more) break;
+}
+if (!more) {
+    more = Array.from(document.querySelectorAll("button, a[role='button'], a[rel='next']"))
+        .find(el => usable(el) && moreText.test(el.innerText || ""));
+}
+if (more) {
+    more.click();
+    return [out, "clicked"];
+}
+const height = document.documentElement.scrollHeight;
+const top = last ? last.getBoundingClientRect().top : window.scrollY;
+if (last) last.scrollIntoView({block: "end"});
+window.scrollBy(0, window.innerHeight);
+const moved = (last ? last.getBoundingClientRect().top : window.scrollY) !== top;
+return [out, moved || document.documentElement.scrollHeight !== height ? "scrolled" : "end"];
+"""
+
+_HAS_NEW_CARDS_JS = _CARD_HELPERS_JS + """
+return Array.from(cards).some(card => {
+    const link = linkOf(card);
+    return !card.dataset.cwSeen || (link && link.href !== card.dataset.cwSeen);
+});
+"""
+
+
+def _wait_for_new_cards(driver, site_config, timeout):
+    """
+    Waits up to `timeout` seconds for cards that were not read yet, as
+    lazy loading or a clicked "more" button adds them
+    """
+    def has_new_cards(driver):
+        try:
+            return driver.execute_script(_HAS_NEW_CARDS_JS, site_config)
+        except WebDriverException:
+            # A "next" click can navigate mid-poll
+            return False
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=Config.PAGE_POLL_INTERVAL).until(has_new_cards)
+    except TimeoutException:
+        pass
+
+
+def harvest_cards(driver, site_name, target, time_budget=None, idle_steps=None, on_batch=None):
+    """
+    Scrolls or pages through a site's listing, reading only the cards added
+    since the previous step and deduping them by market URL (else title).
+    Stops at `target` cards, after `time_budget` seconds (HARVEST_TIME_BUDGET)
+    or after `idle_steps` steps in a row without a new card
+    (HARVEST_IDLE_STEPS), when the page can neither scroll nor page any
+    further, or when a step fails in the browser. Returns
+    [{title, price, volume, url, category}, ...], or an empty list for
+    sites without an extractor. `on_batch`, if given, is called with each
+    step's new cards as soon as they are read; returning False stops the
+    harvest.
+    """
+    site_config = SITE_EXTRACTORS.get(site_name.lower())
+    if not site_config:
+        return []
+    time_budget = Config.HARVEST_TIME_BUDGET if time_budget is None else time_budget
+    idle_steps = idle_steps or Config.HARVEST_IDLE_STEPS
+    started = time.monotonic()
+    seen = set()
+    cards = []
+    steps = idle = 0
+    while True:
+        try:
+            batch, advanced = driver.execute_script(HARVEST_STEP_JS, site_config, target - len(cards), MORE_BUTTON_TEXT)
+        except WebDriverException as e:
+            # Keep what was read before the page broke
+            logger.warning(f"{site_name} harvest step {steps + 1} failed, keeping {len(cards)} cards: {str(e)}")
+            reason = "error"
+            break
+        steps += 1
+        new = 0
+        for card in batch:
+            key = card.get("url") or card.get("title")
+            if key in seen:
+                continue
+            seen.add(key)
+            card["category"] = card.get("category") or site_config["default_category"]
+            cards.append(card)
+            new += 1
+        idle = 0 if new else idle + 1
+        if new and on_batch is not None and on_batch(cards[-new:]) is False:
+            reason = "stopped"
+            break
+        remaining = time_budget - (time.monotonic() - started)
+        if len(cards) >= target:
+            reason = "target"
+        elif remaining <= 0:
+            reason = "time_budget"
+        elif advanced == "end" and not new:
+            reason = "end"
+        elif idle >= idle_steps:
+            reason = "no_new_cards"
+        else:
+            logger.debug(f"{site_name} harvest step {steps}: {new} new cards, {advanced}")
+            _wait_for_new_cards(driver, site_config, min(Config.HARVEST_STEP_WAIT, remaining))
+            continue
+        break
+
+    metrics.inc("crowdwisdom_harvest_steps_total", steps, site=site_name)
+    metrics.inc("crowdwisdom_harvest_stops_total", site=site_name, reason=reason)
+    logger.info(
+        f"Harvested {len(cards)} {site_name} cards in {steps} steps "
+        f"({time.monotonic() - started:.1f}s, stopped on {reason.replace('_', ' ')})"
+    )
+    return cards
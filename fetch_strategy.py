@@ -0,0 +1,158 @@
+"""
+Tiered fetch strategy for CrowdWisdomTrading AI Agent
+Tries the cheapest way to read a site first and only escalates to Chrome when it comes back short
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from config import Config, logger
+from metrics import metrics
+from scrapers import api_scraper, http_scraper, browser_scraper
+
+TIERS = ("api", "http", "browser")
+
+
+class SiteTierMemory:
+    """
+    Last tier that returned enough markets per site, kept in a small JSON
+    file so the next run starts there
+    """
+    def __init__(self, path=None):
+        self.path = path or Config.SITE_TIERS_PATH
+        self._lock = threading.Lock()
+        self._tiers = None
+
+    def _load(self):
+        if self._tiers is None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._tiers = json.load(f)
+            except (OSError, ValueError):
+                self._tiers = {}
+        return self._tiers
+
+    def get(self, site_name):
+        with self._lock:
+            entry = self._load().get(site_name)
+        if not entry or entry.get("tier") not in TIERS:
+            return None
+        # Re-probe the cheaper tiers now and then; a site may have become fetchable without a browser
+        if time.time() - entry.get("updated_at", 0) > Config.SITE_TIER_RECHECK_HOURS * 3600:
+            return None
+        return entry["tier"]
+
+    def set(self, site_name, tier):
+        with self._lock:
+            tiers = self._load()
+            tiers[site_name] = {"tier": tier, "updated_at": time.time()}
+            self._save(tiers)
+
+    def _save(self, tiers):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(tiers, f, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save site tiers: {str(e)}")
+
+
+class TieredMarketFetcher:
+    """
+    Fetches a TARGET_SITES entry through api -> http -> browser.
+
+    A tier is accepted when it returns at least MIN_MARKETS_PER_SITE
+    products without an error; otherwise the next tier is tried. The first
+    tier tried is the one that worked last time (see SiteTierMemory), so a
+    site that needs Chrome goes straight to it, while sites served by the
+    API never launch a browser.
+    """
+    def __init__(self, memory=None, min_markets=None):
+        self.memory = memory or SiteTierMemory()
+        self.min_markets = Config.MIN_MARKETS_PER_SITE if min_markets is None else min_markets
+
+    @staticmethod
+    def site_config(site_name):
+        for site in Config.TARGET_SITES:
+            if site["name"].lower() == site_name.lower():
+                return site
+        return {"name": site_name}
+
+    def tiers_for(self, site_name):
+        site = self.site_config(site_name)
+        tiers = [t for t in TIERS if t != "api" or (site.get("api_endpoint") and api_scraper.supports(site_name))]
+        remembered = self.memory.get(site_name)
+        if remembered in tiers:
+            tiers = tiers[tiers.index(remembered):]
+        return tiers
+
+    def first_url(self, site_name, url=None, max_products=50):
+        """
+        The URL fetch() will request first, for schedulers that wait on
+        that host's politeness slot before handing the site to a worker
+        """
+        site = self.site_config(site_name)
+        url = url or f"{site.get('base_url', '')}{site.get('markets_endpoint', '')}"
+        if self.tiers_for(site_name)[0] == "api":
+            return site["api_endpoint"].format(limit=max_products)
+        return url
+
+    def _run_tier(self, tier, site_name, url, max_products, on_batch=None):
+        if tier == "api":
+            api_url = self.site_config(site_name)["api_endpoint"].format(limit=max_products)
+            return api_scraper.scrape(api_url, site_name, max_products)
+        if tier == "http":
+            return http_scraper.scrape(url, site_name, max_products)
+        return browser_scraper.scrape(url, site_name, max_products, on_batch)
+
+    def fetch(self, site_name, url=None, max_products=50, on_batch=None):
+        """
+        Returns the scraper payload as a dict with a "tier" field naming the
+        tier that produced it. If no tier was enough, the fullest error-free
+        result wins, else the last one tried.
+
+        `on_batch` is handed to the browser tier, which calls it with its
+        products step by step while it harvests; the other tiers read a
+        whole page at once. Once the browser tier has handed markets over,
+        its payload is the result.
+        """
+        site = self.site_config(site_name)
+        url = url or f"{site.get('base_url', '')}{site.get('markets_endpoint', '')}"
+        streamed = []
+
+        def forward(products):
+            streamed.append(len(products))
+            return on_batch(products)
+
+        best = None
+        for tier in self.tiers_for(site_name):
+            started = time.monotonic()
+            with metrics.timer("crowdwisdom_fetch_tier_seconds", site=site_name, tier=tier):
+                data = json.loads(self._run_tier(tier, site_name, url, max_products, forward if on_batch else None))
+            data["tier"] = tier
+            count = data.get("products_count", 0)
+            enough = not data.get("error") and count >= self.min_markets
+            metrics.inc("crowdwisdom_fetch_tier_total", site=site_name, tier=tier,
+                        outcome="ok" if enough else "error" if data.get("error") else "too_few")
+            if enough:
+                logger.info(f"{site_name}: {count} markets via {tier} tier in {time.monotonic() - started:.2f}s")
+                self.memory.set(site_name, tier)
+                return data
+            if streamed:
+                # Its markets have already gone downstream
+                return data
+            logger.info(f"{site_name}: {tier} tier returned {count} markets, escalating")
+            if best is None or best.get("error") or (not data.get("error") and count > best.get("products_count", 0)):
+                best = data
+        return best
+
+    def scrape(self, url, site_name, max_products=50):
+        return json.dumps(self.fetch(site_name, url, max_products), indent=2)
+
+
+tiered_fetcher = TieredMarketFetcher()
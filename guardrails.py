@@ -2,20 +2,37 @@
 Guardrails for CrowdWisdomTrading AI Agent
 Validation and safety checks for agent outputs
 """
-import json
 from datetime import datetime
 from config import Config, logger
+from metrics import metrics
+from schemas import MATCH_GROUPS, parse_json, validate_batch, validate_products
+
+def _payload(result):
+    """
+    The parsed output behind a guardrail input: a TaskOutput's raw text, a
+    JSON string, or an already-parsed dict from the direct path
+    """
+    data = result.raw if hasattr(result, 'raw') else result
+    if isinstance(data, (str, bytes)):
+        return parse_json(data)
+    return data
+
+def _report_rejections(schema, rejections, rejected, total):
+    if not rejected:
+        return
+    for field, count in rejections.items():
+        metrics.inc("crowdwisdom_validation_rejections_total", count, schema=schema, field=field)
+    logger.warning(f"{schema} validation rejected {rejected}/{total} items: {dict(rejections)}")
 
 def validate_scraped_data(result):
     try:
         logger.info("Running scraped data validation guardrail")
-        data = getattr(result, 'raw', str(result))
         try:
-            parsed = json.loads(data) if isinstance(data, str) else data
-        except json.JSONDecodeError:
+            parsed = _payload(result)
+        except ValueError:
             return False, {
                 "error": "Invalid JSON format in scraped data", "code": "JSON_PARSE_ERROR",
-                "raw_data": str(data)[:500]
+                "raw_data": str(getattr(result, 'raw', result))[:500]
             }
         if not isinstance(parsed, dict):
             return False, {"error": "Scraped data must be a dictionary"}
@@ -25,21 +42,16 @@ def validate_scraped_data(result):
         products = parsed.get('products', [])
         if not isinstance(products, list) or len(products) == 0:
             return False, {"error": "No products found", "site": parsed.get('site', 'unknown')}
-        valid_products = [
-            {
-                "title": str(p.get('title', f'Product {i+1}')),
-                "price": str(p.get('price', 'Unknown')),
-                "category": str(p.get('category', 'General')),
-                "site": str(p.get('site', parsed.get('site', 'unknown'))),
-                "confidence_score": float(p.get('confidence_score', 0.5))
-            } for i, p in enumerate(products) if isinstance(p, dict) and p.get('title')
-        ]
+        valid_products, rejections, rejected = validate_products(products, parsed.get('site'))
+        _report_rejections("product", rejections, rejected, len(products))
         if not valid_products:
             return False, {"error": "No valid products after validation"}
         return True, {
             "site": parsed.get('site'),
             "products": valid_products,
             "products_count": len(valid_products),
+            "rejected_products": rejected,
+            "rejections": dict(rejections),
             "validation_passed": True,
             "timestamp": datetime.now().isoformat()
         }
@@ -50,10 +62,9 @@ def validate_scraped_data(result):
 def validate_product_matching(result):
     try:
         logger.info("Product matching validation guardrail")
-        data = getattr(result, 'raw', str(result))
         try:
-            parsed = json.loads(data) if isinstance(data, str) else data
-        except json.JSONDecodeError:
+            parsed = _payload(result)
+        except ValueError:
             return False, {"error": "Product matching result is not valid JSON"}
         if not isinstance(parsed, dict):
             return False, {"error": "Must be dictionary"}
@@ -63,22 +74,23 @@ def validate_product_matching(result):
         matched_products = parsed.get('matched_products', [])
         if not isinstance(matched_products, list):
             return False, {"error": "matched_products must be a list"}
-        valid = []
-        for match in matched_products:
-            if isinstance(match, dict) and 'unified_title' in match and 'products' in match:
-                products = match['products']
-                avg_conf = sum(p.get('confidence_score', 0.5) for p in products) / len(products) if products else 0.5
-                valid.append({
-                    "unified_title": match['unified_title'],
-                    "products": products,
-                    "match_confidence": float(match.get('match_confidence', avg_conf)),
-                    "sites": list(set(p.get('site', 'unknown') for p in products))
-                })
+        valid, rejections, rejected = validate_batch(MATCH_GROUPS, matched_products)
+        _report_rejections("match_group", rejections, rejected, len(matched_products))
+        for match in valid:
+            products = match['products']
+            # Only groups that arrive without a confidence or site list need them derived
+            if 'match_confidence' not in match:
+                match['match_confidence'] = sum(
+                    float(p.get('confidence_score', 0.5)) for p in products
+                ) / len(products) if products else 0.5
+            if 'sites' not in match:
+                match['sites'] = list(set(p.get('site', 'unknown') for p in products))
         if not valid:
             return False, {"error": "No valid product matches found"}
         return True, {
             "matched_products": valid,
             "total_unique_products": len(valid),
+            "rejected_groups": rejected,
             "validation_passed": True,
             "timestamp": datetime.now().isoformat()
         }
@@ -0,0 +1,176 @@
+"""
+Market history store for CrowdWisdomTrading AI Agent
+Append-only Parquet dataset of every cycle's quotes, partitioned by site and date
+"""
+
+import hashlib
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from config import Config, logger
+from matching import product_site
+
+HISTORY_SCHEMA = pa.schema([
+    ("ts", pa.timestamp("ms", tz="UTC")),
+    ("run_id", pa.string()),
+    ("market_key", pa.string()),
+    ("group_key", pa.string()),
+    ("title", pa.string()),
+    ("unified_title", pa.string()),
+    ("price", pa.string()),
+    ("probability", pa.float64()),
+    ("no_probability", pa.float64()),
+    ("volume", pa.string()),
+    ("url", pa.string())
+])
+PARTITIONING = ds.partitioning(pa.schema([("site", pa.string()), ("date", pa.string())]), flavor="hive")
+
+
+def group_key(member_keys):
+    """
+    Short stable id for a match group from its members' (site, key) pairs
+    """
+    joined = "\n".join(f"{site}\t{key}" for site, key in sorted(member_keys))
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()[:16]
+
+
+class HistoryStore:
+    """
+    Each append writes one zstd-compressed Parquet file per site under
+    site=<site>/date=<YYYY-MM-DD>/, so files are never rewritten and
+    queries on a site or date range only open those partitions.
+    """
+    def __init__(self, root=None):
+        self.root = Path(root or Config.HISTORY_DIR)
+
+    def append(self, matched_products, keys_by_product, run_id, ts=None):
+        """
+        Appends one row per listed product of every match group, with the
+        yes/no probabilities set by pricing.annotate_products.
+        `keys_by_product` maps id(product) to its (site, market key).
+        Returns the number of rows written.
+        """
+        ts = ts or datetime.now(timezone.utc)
+        rows_by_site = {}
+        for group in matched_products:
+            members = [keys_by_product[id(p)] for p in group.get("products", []) if id(p) in keys_by_product]
+            gkey = group_key(members)
+            for product in group.get("products", []):
+                site, key = keys_by_product.get(id(product), (product_site(product), ""))
+                rows = rows_by_site.setdefault(site, {name: [] for name in HISTORY_SCHEMA.names})
+                rows["ts"].append(ts)
+                rows["run_id"].append(run_id)
+                rows["market_key"].append(key)
+                rows["group_key"].append(gkey)
+                rows["title"].append(str(product.get("title", "")))
+                rows["unified_title"].append(str(group.get("unified_title", "")))
+                rows["price"].append(str(product.get("price", "")))
+                rows["probability"].append(product.get("yes_price"))
+                rows["no_probability"].append(product.get("no_price"))
+                rows["volume"].append(str(product.get("volume", "")))
+                rows["url"].append(str(product.get("url", "")))
+
+        date = ts.strftime("%Y-%m-%d")
+        written = 0
+        for site, rows in rows_by_site.items():
+            partition = self.root / f"site={site}" / f"date={date}"
+            partition.mkdir(parents=True, exist_ok=True)
+            table = pa.Table.from_pydict(rows, schema=HISTORY_SCHEMA)
+            name = f"part-{ts.strftime('%H%M%S%f')}-{uuid.uuid4().hex[:8]}.parquet"
+            temp_path = partition / f".{name}.tmp"
+            pq.write_table(table, temp_path, compression="zstd")
+            # Readers skip dot-files, so a half-written part is never visible
+            temp_path.replace(partition / name)
+            written += table.num_rows
+        logger.info(f"History: appended {written} quotes for {len(rows_by_site)} sites to {self.root}")
+        return written
+
+    def dataset(self):
+        return ds.dataset(
+            str(self.root), format="parquet", partitioning=PARTITIONING,
+            schema=HISTORY_SCHEMA.append(pa.field("site", pa.string())).append(pa.field("date", pa.string())),
+            exclude_invalid_files=True, ignore_prefixes=[".", "_"]
+        )
+
+    @staticmethod
+    def _filter(site=None, start=None, end=None, **equals):
+        expression = None
+        terms = []
+        if site:
+            terms.append(ds.field("site") == site)
+        # Partition pruning on the date directory, then an exact bound on ts
+        if start:
+            terms.append(ds.field("date") >= start.strftime("%Y-%m-%d"))
+            terms.append(ds.field("ts") >= pa.scalar(start, pa.timestamp("ms", tz="UTC")))
+        if end:
+            terms.append(ds.field("date") <= end.strftime("%Y-%m-%d"))
+            terms.append(ds.field("ts") <= pa.scalar(end, pa.timestamp("ms", tz="UTC")))
+        for name, value in equals.items():
+            if value is not None:
+                terms.append(ds.field(name) == value)
+        for term in terms:
+            expression = term if expression is None else expression & term
+        return expression
+
+    def price_series(self, market_key=None, site=None, group=None, start=None, end=None):
+        """
+        Quotes for one market (or one group) over time as a pandas DataFrame
+        sorted by ts; only the filtered rows and needed columns are read
+        """
+        if not self.root.exists():
+            return pa.table({}).to_pandas()
+        table = self.dataset().to_table(
+            columns=["ts", "site", "market_key", "group_key", "title", "price", "probability", "no_probability", "volume"],
+            filter=self._filter(site=site, start=start, end=end, market_key=market_key, group_key=group)
+        )
+        return table.sort_by("ts").to_pandas()
+
+    @staticmethod
+    def _fold(table, aggregations):
+        keys = ["group_key", "ts", "unified_title"]
+        grouped = table.group_by(keys).aggregate(aggregations)
+        names = [f"{column}_{function}" for column, function in aggregations]
+        return pa.table({
+            **{key: grouped[key] for key in keys},
+            "high": grouped[names[0]], "low": grouped[names[1]], "sites": grouped[names[2]]
+        })
+
+    def spread_history(self, group=None, start=None, end=None, min_sites=2):
+        """
+        Cross-site spread per group and cycle: max minus min probability
+        over the sites quoting it. Folded batch by batch, so memory grows
+        with the number of (group, cycle) pairs, not quotes.
+        """
+        if not self.root.exists():
+            return pa.table({}).to_pandas()
+        keys = ["group_key", "ts", "unified_title"]
+        scanner = self.dataset().scanner(
+            columns=keys + ["probability"],
+            filter=self._filter(start=start, end=end, group_key=group)
+        )
+        running = None
+        for batch in scanner.to_batches():
+            table = pa.Table.from_batches([batch]).filter(pc.is_valid(batch.column("probability")))
+            if not table.num_rows:
+                continue
+            # A group holds at most one market per site, so the quote count is the site count
+            partial = self._fold(table, [("probability", "max"), ("probability", "min"), ("probability", "count")])
+            if running is not None:
+                partial = self._fold(
+                    pa.concat_tables([running, partial]), [("high", "max"), ("low", "min"), ("sites", "sum")]
+                )
+            running = partial
+        if running is None:
+            return pa.table({}).to_pandas()
+        spreads = running.filter(pc.greater_equal(running["sites"], min_sites))
+        spreads = spreads.append_column("spread", pc.subtract(spreads["high"], spreads["low"]))
+        return spreads.sort_by([("group_key", "ascending"), ("ts", "ascending")]).to_pandas()
+
+
+history_store = HistoryStore()
@@ -0,0 +1,285 @@
+"""
+Pooled HTTP client for CrowdWisdomTrading AI Agent
+Keep-alive sessions per host, compressed transfers and conditional GETs backed by a validator cache
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from config import Config, logger
+from metrics import metrics, SIZE_BUCKETS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL,
+    parser TEXT,
+    parsed TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages(accessed_at);
+"""
+
+
+class ValidatorCache:
+    """
+    Last body, ETag / Last-Modified and parsed result per URL.
+
+    Only responses that carry a validator are stored, since nothing else
+    can be revalidated. The parsed result is tagged with the parser that
+    produced it so a 304 can skip parsing too. Least recently used pages
+    are dropped beyond `max_entries`.
+    """
+    def __init__(self, path=None, max_entries=None, enabled=None):
+        self.path = Path(path or Config.HTTP_CACHE_PATH)
+        self.max_entries = max_entries or Config.HTTP_CACHE_MAX_ENTRIES
+        self.enabled = Config.HTTP_CACHE_ENABLED if enabled is None else enabled
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, url):
+        if not self.enabled:
+            return None
+        try:
+            row = self._connection().execute(
+                "SELECT etag, last_modified, body, parser, parsed FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"HTTP cache read failed: {str(e)}")
+            return None
+        if row is None:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "body": row[2], "parser": row[3], "parsed": row[4]}
+
+    def store(self, url, etag, last_modified, body):
+        if not self.enabled:
+            return
+        try:
+            conn = self._connection()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO pages(url, etag, last_modified, body, parser, parsed, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, NULL, NULL, ?, ?)",
+                (url, etag, last_modified, body, now, now)
+            )
+            self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"HTTP cache write failed: {str(e)}")
+
+    def store_parsed(self, url, parser, parsed):
+        if not self.enabled:
+            return
+        try:
+            self._connection().execute(
+                "UPDATE pages SET parser = ?, parsed = ? WHERE url = ?",
+                (parser, json.dumps(parsed, ensure_ascii=False), url)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"HTTP cache write failed: {str(e)}")
+
+    def touch(self, url):
+        try:
+            self._connection().execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        except sqlite3.Error as e:
+            logger.warning(f"HTTP cache write failed: {str(e)}")
+
+    def _evict(self, conn):
+        (entries,) = conn.execute("SELECT COUNT(*) FROM pages").fetchone()
+        if entries > self.max_entries:
+            conn.execute(
+                "DELETE FROM pages WHERE url IN (SELECT url FROM pages ORDER BY accessed_at LIMIT ?)",
+                (entries - self.max_entries,)
+            )
+
+
+class FetchResult:
+    """
+    Outcome of HttpSessionPool.get. `not_modified` means the server
+    answered 304 and `content` came from the cache; `parsed` then holds the
+    cached parse if it was made by the same parser.
+    """
+    def __init__(self, url, status_code, content, headers, not_modified=False, parsed=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.not_modified = not_modified
+        self.parsed = parsed
+
+
+class HttpSessionPool:
+    """
+    One keep-alive requests.Session per host, each with its own connection
+    pool of `pool_maxsize`. At most `max_hosts` sessions stay open; the
+    least recently used host is dropped first and its session closed once
+    no request is still using it. GETs are retried on
+    connection errors and 429/5xx with backoff, and revalidated against the
+    validator cache when a previous copy exists.
+    """
+    def __init__(self, max_hosts=None, pool_maxsize=None, timeout=None, cache=None):
+        self.max_hosts = max_hosts or Config.HTTP_POOL_HOSTS
+        self.pool_maxsize = pool_maxsize or Config.HTTP_POOL_MAXSIZE
+        self.timeout = timeout or Config.REQUEST_TIMEOUT
+        self.cache = cache or ValidatorCache()
+        self._sessions = OrderedDict()
+        # Requests in flight per session, and evicted sessions waiting for theirs to finish
+        self._leases = {}
+        self._retired = set()
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "not_modified": 0, "bytes_downloaded": 0, "sessions_opened": 0}
+
+    def _new_session(self):
+        session = requests.Session()
+        retry = Retry(
+            total=Config.MAX_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            "User-Agent": Config.USER_AGENT,
+            # gzip/deflate always; br only when a brotli decoder is installed
+            "Accept-Encoding": ACCEPT_ENCODING
+        })
+        return session
+
+    @contextmanager
+    def _lease(self, url):
+        """
+        The host's session for one request. Evicting a host while one of its
+        requests is in flight leaves the close to that request's return.
+        """
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._new_session()
+                self._sessions[host] = session
+                self._stats["sessions_opened"] += 1
+                while len(self._sessions) > self.max_hosts:
+                    _, stale = self._sessions.popitem(last=False)
+                    if stale in self._leases:
+                        self._retired.add(stale)
+                    else:
+                        stale.close()
+            else:
+                self._sessions.move_to_end(host)
+            self._leases[session] = self._leases.get(session, 0) + 1
+        try:
+            yield session
+        finally:
+            with self._lock:
+                self._leases[session] -= 1
+                idle = not self._leases[session]
+                if idle:
+                    del self._leases[session]
+                retired = idle and session in self._retired
+                self._retired.discard(session)
+            if retired:
+                session.close()
+
+    def _request(self, url, headers, timeout, host):
+        with metrics.timer("crowdwisdom_http_request_seconds", host=host), self._lease(url) as session:
+            response = session.get(url, headers=headers, timeout=timeout or self.timeout)
+        with self._lock:
+            self._stats["requests"] += 1
+        metrics.inc("crowdwisdom_http_requests_total", host=host, status=response.status_code)
+        retries = getattr(getattr(response.raw, "retries", None), "history", ())
+        if retries:
+            metrics.inc("crowdwisdom_http_retries_total", len(retries), host=host)
+        return response
+
+    def get(self, url, headers=None, parser=None, timeout=None):
+        """
+        GETs `url`, sending If-None-Match / If-Modified-Since when the cache
+        holds a copy. A 304 with no cached copy to stand in for the body is
+        asked again unconditionally. Raises requests.HTTPError on error
+        statuses.
+        """
+        entry = self.cache.get(url)
+        request_headers = dict(headers or {})
+        if entry:
+            if entry["etag"]:
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        host = urlsplit(url).netloc.lower()
+        response = self._request(url, request_headers, timeout, host)
+
+        if response.status_code == 304 and entry:
+            self.cache.touch(url)
+            with self._lock:
+                self._stats["not_modified"] += 1
+            parsed = json.loads(entry["parsed"]) if parser and entry["parser"] == parser and entry["parsed"] else None
+            return FetchResult(url, 304, entry["body"], response.headers, not_modified=True, parsed=parsed)
+
+        if response.status_code == 304:
+            logger.warning(f"{url} answered 304 with nothing cached, fetching it again unconditionally")
+            request_headers = {
+                name: value for name, value in request_headers.items()
+                if name.lower() not in ("if-none-match", "if-modified-since")
+            }
+            request_headers["Cache-Control"] = "no-cache"
+            response = self._request(url, request_headers, timeout, host)
+            if response.status_code == 304:
+                raise requests.HTTPError(f"304 Not Modified with nothing cached for {url}", response=response)
+
+        response.raise_for_status()
+        content = response.content
+        with self._lock:
+            self._stats["bytes_downloaded"] += len(content)
+        metrics.observe("crowdwisdom_http_response_bytes", len(content), buckets=SIZE_BUCKETS, host=host)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self.cache.store(url, etag, last_modified, content)
+        return FetchResult(url, response.status_code, content, response.headers)
+
+    def remember_parsed(self, url, parser, parsed):
+        """
+        Stores a parse of the cached body so a later 304 can return it as is
+        """
+        self.cache.store_parsed(url, parser, parsed)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, open_sessions=len(self._sessions))
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+http_pool = HttpSessionPool()
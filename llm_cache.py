@@ -0,0 +1,166 @@
+"""
+Persistent LLM response cache for CrowdWisdomTrading AI Agent
+Content-addressed SQLite store shared by every process using the same output directory
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from config import Config, logger
+from metrics import metrics
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class LLMResponseCache:
+    """
+    Maps hash(model, temperature, messages) to a completion's text.
+
+    Entries expire after `ttl` seconds and the least recently used entries
+    are evicted once the store holds more than `max_entries` rows or
+    `max_bytes` of responses. SQLite in WAL mode lets several processes
+    share one cache file.
+    """
+    def __init__(self, path=None, ttl=None, max_entries=None, max_bytes=None, enabled=None):
+        self.path = Path(path or Config.LLM_CACHE_PATH)
+        self.ttl = Config.LLM_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max_entries or Config.LLM_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or Config.LLM_CACHE_MAX_MB * 1024 * 1024
+        self.enabled = Config.LLM_CACHE_ENABLED if enabled is None else enabled
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._counter_lock = threading.Lock()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(model, temperature, messages, **params):
+        """
+        Hash of everything that shapes the reply: model, temperature,
+        messages and any other request parameter (max_tokens, stop, ...);
+        parameters left as None are omitted
+        """
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        params = {name: value for name, value in params.items() if value is not None}
+        payload = json.dumps(
+            {"model": model, "temperature": temperature, "messages": messages, "params": params},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, name):
+        metrics.inc("crowdwisdom_llm_cache_total", outcome=name)
+        with self._counter_lock:
+            if name == "hits":
+                self.hits += 1
+            else:
+                self.misses += 1
+        self._connection().execute(
+            "INSERT INTO counters(name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,)
+        )
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        try:
+            conn = self._connection()
+            now = time.time()
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and self.ttl and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self._count("misses")
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._count("hits")
+            return row[0]
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache read failed: {str(e)}")
+            return None
+
+    def set(self, key, model, response):
+        if not self.enabled or not isinstance(response, str) or not response:
+            return
+        try:
+            conn = self._connection()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses(key, model, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, len(response.encode("utf-8")), now, now)
+            )
+            self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {str(e)}")
+
+    def _evict(self, conn):
+        if self.ttl:
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+        entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if entries <= self.max_entries and total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if entries <= self.max_entries and total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            entries -= 1
+            total -= size
+            evicted += 1
+        logger.debug(f"LLM cache evicted {evicted} least recently used entries")
+
+    def stats(self):
+        stats = {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / (self.hits + self.misses), 3) if self.hits + self.misses else 0.0
+        }
+        try:
+            conn = self._connection()
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            lifetime = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            stats.update({
+                "entries": entries,
+                "bytes": total,
+                "lifetime_hits": lifetime.get("hits", 0),
+                "lifetime_misses": lifetime.get("misses", 0)
+            })
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache stats failed: {str(e)}")
+        return stats
+
+
+llm_cache = LLMResponseCache()
@@ -4,26 +4,90 @@ Handles Mistral API integration through litellm
 """
 
 import os
+import threading
 from crewai import LLM
 import litellm
 from config import Config, logger
+from llm_cache import llm_cache
+from metrics import metrics, TOKEN_BUCKETS
+
+
+def _record_llm_success(kwargs, response, start_time, end_time):
+    """
+    litellm success callback: latency and token usage of every completion,
+    whether it came from get_completion or a CrewAI agent
+    """
+    model = kwargs.get("model") or "unknown"
+    metrics.inc("crowdwisdom_llm_calls_total", model=model, outcome="ok")
+    metrics.observe("crowdwisdom_llm_seconds", (end_time - start_time).total_seconds(), model=model)
+    usage = getattr(response, "usage", None)
+    if usage:
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        metrics.inc("crowdwisdom_llm_tokens_total", prompt_tokens, model=model, direction="in")
+        metrics.inc("crowdwisdom_llm_tokens_total", completion_tokens, model=model, direction="out")
+        metrics.observe("crowdwisdom_llm_prompt_tokens", prompt_tokens, buckets=TOKEN_BUCKETS, model=model)
+
+
+def _record_llm_failure(kwargs, response, start_time, end_time):
+    model = kwargs.get("model") or "unknown"
+    metrics.inc("crowdwisdom_llm_calls_total", model=model, outcome="error")
+    metrics.observe("crowdwisdom_llm_seconds", (end_time - start_time).total_seconds(), model=model)
+
+
+class CachedLLM(LLM):
+    """
+    CrewAI LLM that answers repeated prompts from the shared response cache.
+    Tool-calling requests always go to the model.
+    """
+    def call(self, messages, tools=None, *args, **kwargs):
+        if tools or not llm_cache.enabled:
+            return super().call(messages, tools, *args, **kwargs)
+        # call()'s other arguments (callbacks, task/agent) do not change the request sent
+        key = llm_cache.make_key(self.model, self.temperature, messages, **self._request_params())
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+        response = super().call(messages, tools, *args, **kwargs)
+        if isinstance(response, str):
+            llm_cache.set(key, self.model, response)
+        return response
+
+    def _request_params(self):
+        return {
+            "max_tokens": self.max_tokens,
+            "max_completion_tokens": self.max_completion_tokens,
+            "top_p": self.top_p,
+            "stop": self.stop or None,
+            "seed": self.seed,
+            "response_format": self.response_format,
+            **(self.additional_params or {})
+        }
+
 
 class MistralLLMIntegration:
     def __init__(self):
         self.setup_litellm()
 
     def setup_litellm(self):
-        os.environ["MISTRAL_API_KEY"] = Config.MISTRAL_API_KEY
+        if Config.MISTRAL_API_KEY:
+            os.environ["MISTRAL_API_KEY"] = Config.MISTRAL_API_KEY
         litellm.set_verbose = False
+        # litellm runs these on its logging thread pool right after each call
+        if _record_llm_success not in litellm.success_callback:
+            litellm.success_callback.append(_record_llm_success)
+        if _record_llm_failure not in litellm.failure_callback:
+            litellm.failure_callback.append(_record_llm_failure)
         self.model_name = Config.DEFAULT_MODEL
         logger.info(f"LiteLLM configured with model: {self.model_name}")
 
     def get_crewai_llm(self, temperature=None):
-        return LLM(
+        return CachedLLM(
             model=self.model_name,
             temperature=temperature or Config.TEMPERATURE,
             max_tokens=Config.MAX_TOKENS,
-            api_key=Config.MISTRAL_API_KEY
+            api_key=Config.MISTRAL_API_KEY,
+            api_base=Config.MISTRAL_API_BASE
         )
 
     def test_connection(self):
@@ -31,7 +95,8 @@ class MistralLLMIntegration:
             response = litellm.completion(
                 model=self.model_name,
                 messages=[{"role": "user", "content": "Hello, this is a connection test."}],
-                max_tokens=10
+                max_tokens=10,
+                api_base=Config.MISTRAL_API_BASE
             )
             if response and response.choices:
                 logger.info("Mistral API connection test successful")
@@ -43,23 +108,56 @@ class MistralLLMIntegration:
 
     def get_completion(self, messages, **kwargs):
         try:
+            temperature = kwargs.pop('temperature', Config.TEMPERATURE)
+            max_tokens = kwargs.pop('max_tokens', Config.MAX_TOKENS)
+            key = llm_cache.make_key(self.model_name, temperature, messages, max_tokens=max_tokens, **kwargs)
+            cached = llm_cache.get(key)
+            if cached is not None:
+                return cached
             response = litellm.completion(
                 model=self.model_name,
                 messages=messages,
-                temperature=kwargs.get('temperature', Config.TEMPERATURE),
-                max_tokens=kwargs.get('max_tokens', Config.MAX_TOKENS),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                api_base=Config.MISTRAL_API_BASE,
                 **kwargs
             )
-            return response.choices[0].message.content
+            content = response.choices[0].message.content
+            llm_cache.set(key, self.model_name, content)
+            return content
         except Exception as e:
             logger.error(f"Error getting completion from Mistral: {str(e)}")
             raise e
 
-mistral_integration = MistralLLMIntegration()
-if Config.MISTRAL_API_KEY:
-    try:
-        mistral_integration.test_connection()
-    except Exception as e:
-        logger.warning(f"Initial Mistral connection test failed: {str(e)}")
-else:
-    logger.warning("MISTRAL_API_KEY not found. Please set it in your environment.")
+_mistral_integration = None
+_integration_lock = threading.Lock()
+
+def get_mistral_integration():
+    """
+    Lazily creates the shared integration; nothing talks to Mistral until
+    a caller asks for a completion or runs warm_up()
+    """
+    global _mistral_integration
+    with _integration_lock:
+        if _mistral_integration is None:
+            if not Config.MISTRAL_API_KEY:
+                logger.warning("MISTRAL_API_KEY not found. Please set it in your environment.")
+            _mistral_integration = MistralLLMIntegration()
+        return _mistral_integration
+
+def warm_up():
+    """
+    Creates the integration and checks the Mistral connection up front
+    """
+    integration = get_mistral_integration()
+    if Config.MISTRAL_API_KEY:
+        try:
+            integration.test_connection()
+        except Exception as e:
+            logger.warning(f"Initial Mistral connection test failed: {str(e)}")
+    return integration
+
+def __getattr__(name):
+    if name == "mistral_integration":
+        return get_mistral_integration()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
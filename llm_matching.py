@@ -0,0 +1,200 @@
+"""
+Chunked LLM product matching for CrowdWisdomTrading AI Agent
+Pre-groups likely candidates locally and sends token-budgeted batches to the matcher agent
+"""
+
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from crewai import Crew, Task, Process
+
+from config import Config, logger
+from metrics import metrics
+from matching import market_matcher, product_site, UnionFind
+
+
+def estimate_tokens(text):
+    return len(text) // Config.LLM_CHARS_PER_TOKEN + 1
+
+
+def chunk_token_budget():
+    """
+    Prompt tokens available to a chunk's product list: the model context
+    minus the completion allowance and the fixed instructions, capped by
+    LLM_CHUNK_TOKENS
+    """
+    available = Config.LLM_CONTEXT_TOKENS - Config.MAX_TOKENS - Config.LLM_PROMPT_OVERHEAD_TOKENS
+    return max(500, min(Config.LLM_CHUNK_TOKENS, available))
+
+
+def _compact_line(product_id, product):
+    return json.dumps({
+        "id": product_id,
+        "site": product_site(product),
+        "title": str(product.get("title", ""))[:200],
+        "price": str(product.get("price", ""))[:40]
+    }, ensure_ascii=False)
+
+
+class ChunkedLLMMatcher:
+    """
+    Runs product_matcher_agent over bounded chunks instead of one prompt.
+
+    Markets with no plausible cross-site partner (no blocked candidate pair
+    above LLM_PREFILTER_SCORE) never reach the LLM. The rest are clustered
+    by candidate pairs, packed into chunks under the token budget and
+    matched concurrently; a chunk that fails or misses the deadline falls
+    back to the local matcher.
+    """
+    def __init__(self, agents, matcher=None):
+        self.agents = agents
+        self.matcher = matcher or market_matcher
+
+    def candidate_clusters(self, products):
+        _, scored = self.matcher.score_candidates(products, floor=Config.LLM_PREFILTER_SCORE)
+        clusters = UnionFind(len(products))
+        for _, i, j in scored:
+            clusters.union(i, j)
+        members = {}
+        for i in range(len(products)):
+            members.setdefault(clusters.find(i), []).append(i)
+        return [m for m in members.values() if len(m) > 1], [m[0] for m in members.values() if len(m) == 1]
+
+    def pack_chunks(self, products, clusters):
+        """
+        Greedily packs whole clusters into chunks that fit both the prompt
+        budget and the number of groups a MAX_TOKENS reply can hold
+        """
+        budget = chunk_token_budget()
+        max_items = max(2, Config.MAX_TOKENS // Config.LLM_REPLY_TOKENS_PER_PRODUCT)
+        chunks, current, current_tokens = [], [], 0
+        for cluster in sorted(clusters, key=len, reverse=True):
+            lines = [(i, _compact_line(i, products[i])) for i in cluster]
+            tokens = sum(estimate_tokens(line) for _, line in lines)
+            if current and (current_tokens + tokens > budget or len(current) + len(lines) > max_items):
+                chunks.append(current)
+                current, current_tokens = [], 0
+            # A single cluster bigger than a chunk is split; pairs across the split are lost
+            for i, line in lines:
+                line_tokens = estimate_tokens(line)
+                if current and (current_tokens + line_tokens > budget or len(current) >= max_items):
+                    chunks.append(current)
+                    current, current_tokens = [], 0
+                current.append((i, line))
+                current_tokens += line_tokens
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _run_chunk(self, chunk):
+        listing = "\n".join(line for _, line in chunk)
+        task = Task(
+            description=f"""
+            Group prediction markets from different sites that refer to the same underlying event and outcome.
+
+            Markets (one JSON object per line):
+            {listing}
+
+            Rules:
+            1. Only group markets from different sites
+            2. Be conservative - only group markets you are confident match
+            3. Leave unmatched markets out of the reply
+
+            Reply with JSON only:
+            {{"matched_products": [{{"product_ids": [id, id], "match_confidence": 0.0-1.0}}]}}
+            """,
+            agent=self.agents.product_matcher_agent(),
+            expected_output="JSON object with matched_products listing product_ids and match_confidence"
+        )
+        crew = Crew(
+            agents=[task.agent],
+            tasks=[task],
+            process=Process.sequential,
+            verbose=False
+        )
+        with metrics.timer("crowdwisdom_crew_kickoff_seconds", crew="product_matching"):
+            result = crew.kickoff()
+        raw = result.raw if hasattr(result, "raw") else str(result)
+        match = re.search(r"\{.*\}", raw or "", re.S)
+        if not match:
+            raise ValueError("Matcher reply contained no JSON object")
+        allowed = {i for i, _ in chunk}
+        groups = []
+        for group in json.loads(match.group(0)).get("matched_products", []):
+            ids = [int(i) for i in group.get("product_ids", []) if str(i).isdigit() and int(i) in allowed]
+            if len(ids) > 1:
+                groups.append((float(group.get("match_confidence", 0.5)), ids))
+        return groups
+
+    def _local_groups(self, products, chunk):
+        indexes = [i for i, _ in chunk]
+        position = {id(products[i]): i for i in indexes}
+        local = self.matcher.match([products[i] for i in indexes])
+        return [
+            (group["match_confidence"], [position[id(p)] for p in group["products"]])
+            for group in local["matched_products"] if len(group["products"]) > 1
+        ]
+
+    def match(self, products):
+        clusters, unmatched = self.candidate_clusters(products)
+        chunks = self.pack_chunks(products, clusters)
+        logger.info(
+            f"LLM matching: {len(products)} products, {len(unmatched)} without candidates, "
+            f"{len(chunks)} chunks under a {chunk_token_budget()}-token budget"
+        )
+
+        proposals = []
+        deadline = time.monotonic() + Config.LLM_MATCHING_TIMEOUT
+        executor = ThreadPoolExecutor(max_workers=Config.LLM_MAX_CONCURRENCY, thread_name_prefix="llm-matcher")
+        try:
+            futures = {executor.submit(self._run_chunk, chunk): chunk for chunk in chunks}
+            done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+            for future in futures:
+                chunk = futures[future]
+                try:
+                    if future not in done:
+                        raise TimeoutError(f"chunk not finished within {Config.LLM_MATCHING_TIMEOUT}s")
+                    proposals.extend(future.result())
+                except Exception as e:
+                    logger.warning(f"LLM chunk of {len(chunk)} products failed, using local matches: {str(e)}")
+                    proposals.extend(self._local_groups(products, chunk))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return self.merge(products, proposals)
+
+    def merge(self, products, proposals):
+        """
+        Resolves overlapping proposals: highest confidence first, each
+        product joins at most one group and a group holds at most one
+        product per site. Everything left over becomes a single-site group.
+        """
+        assigned = set()
+        matched = []
+        for confidence, ids in sorted(proposals, key=lambda p: -p[0]):
+            members, sites = [], set()
+            for i in ids:
+                site = product_site(products[i])
+                if i in assigned or site in sites:
+                    continue
+                members.append(i)
+                sites.add(site)
+            if len(members) > 1:
+                assigned.update(members)
+                matched.append(self.matcher.build_group([products[i] for i in members], confidence))
+
+        for i, product in enumerate(products):
+            if i not in assigned:
+                matched.append(self.matcher.build_group([product], float(product.get("confidence_score", 0.5))))
+
+        cross_site = sum(1 for g in matched if len(g["sites"]) > 1)
+        return {
+            "matched_products": matched,
+            "total_unique_products": len(matched),
+            "analysis_summary": (
+                f"{len(matched)} unique markets from {len(products)} listings; "
+                f"{cross_site} listed on more than one site"
+            )
+        }
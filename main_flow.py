@@ -1,14 +1,45 @@
+import functools
 import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from pathlib import Path
 
 from crewai.flow.flow import Flow, listen, start, router
-from crewai import Crew, Task, Process
 from pydantic import BaseModel
 
-from config import Config, logger
-from agents import crowd_wisdom_agents
+from config import Config, logger, bootstrap
 from guardrails import GUARDRAILS
+from matching import market_matcher, llm_adjudicate
+from board_writer import write_board, write_error_board
+from pricing import annotate_products
+from arbitrage import scan_groups
+from fetch_strategy import tiered_fetcher
+from politeness import politeness_gate
+from snapshot_store import board_fingerprint, snapshot_store, market_keys
+from metrics import metrics
+from checkpoints import checkpoint_store, format_age, format_size
+
+def timed_phase(name, final=False):
+    """
+    Records a flow step's wall time in state.phase_timings and the
+    crowdwisdom_flow_step_seconds histogram. A `final` step also closes the
+    run's metrics (final_summary["metrics"] and the export).
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                with metrics.timer("crowdwisdom_flow_step_seconds", step=name):
+                    return method(self, *args, **kwargs)
+            finally:
+                self.state.phase_timings[name] = round(time.perf_counter() - started, 4)
+                if final:
+                    self._finish_metrics()
+        return wrapper
+    return decorator
 
 class CrowdWisdomState(BaseModel):
     scraped_data: list = []
@@ -16,6 +47,10 @@ class CrowdWisdomState(BaseModel):
     total_products_collected: int = 0
     matched_products: list = []
     matching_confidence: float = 0.0
+    market_changes: dict = {}
+    arbitrage_opportunities: list = []
+    spread_summary: dict = {}
+    phase_timings: dict = {}
     unique_products_count: int = 0
     csv_content: str = ""
     csv_file_path: str = ""
@@ -26,22 +61,50 @@ class CrowdWisdomState(BaseModel):
 
 class CrowdWisdomTradingFlow(Flow[CrowdWisdomState]):
 
-    def __init__(self):
+    def __init__(self, resume=None):
+        """
+        `resume` is a FlowCheckpoint of an earlier run with the same id; its
+        completed phases are loaded instead of being run again
+        """
         super().__init__()
-        self.agents = crowd_wisdom_agents
+        self._metrics_mark = metrics.mark()
+        self._checkpoints = checkpoint_store if Config.CHECKPOINTS_ENABLED else None
+        self._resume = resume
+        # Where this run's own phases are saved: the resumed run's checkpoint, or a new one at setup
+        self._checkpoint = resume if self._checkpoints is not None else None
         logger.info("CrowdWisdomTradingFlow initialized")
 
+    @property
+    def _agents(self):
+        # Built on first use so runs that never reach an agent never create the LLM
+        from agents import get_crowd_wisdom_agents
+        return get_crowd_wisdom_agents()
+
     @start()
+    @timed_phase("setup")
     def initiate_data_collection(self) -> dict:
         logger.info("🚀 Starting CrowdWisdom Trading AI Agent Flow")
         logger.info(f"Flow ID: {self.state.id}")
         self.state.current_phase = "data_collection"
+        if self._checkpoint is None and self._checkpoints is not None:
+            self._checkpoint = self._checkpoints.open(self.state.id)
+        if self._resume is not None:
+            logger.info(
+                f"♻️ Resuming flow {self._resume.flow_id} after its {self._resume.last_phase} phase "
+                f"(checkpoint {format_age(self._resume.age())} old)"
+            )
 
         scraping_tasks = []
+        if self._resume is not None and self._resume.has("scraped_data"):
+            return {"scraping_tasks": scraping_tasks, "total_sites": len(Config.TARGET_SITES), "phase": "resumed"}
 
         for site_config in Config.TARGET_SITES:
             site_url = f"{site_config['base_url']}{site_config['markets_endpoint']}"
 
+            if Config.COLLECTION_MODE == "direct":
+                scraping_tasks.append({"site": site_config['name'], "task": None, "url": site_url})
+                continue
+
             task_description = f"""
             Scrape prediction market data from {site_config['name']}.
 
@@ -55,12 +118,14 @@ class CrowdWisdomTradingFlow(Flow[CrowdWisdomState]):
             4. If the site is inaccessible or returns errors, document the error but continue
             5. Aim to collect at least 10-20 markets if available
 
-            Use the appropriate scraping tool based on the site's requirements.
+            Use the TieredMarketScraper tool; it picks the cheapest working fetch method on its own.
+            Fall back to the other scraping tools only if it returns an error.
             """
 
+            from crewai import Task
             scraping_task = Task(
                 description=task_description,
-                agent=self.agents.data_collector_agent(),
+                agent=self._agents.data_collector_agent(),
                 expected_output="JSON formatted prediction market data with products array",
                 guardrail=GUARDRAILS["validate_scraped_data"]
             )
@@ -77,61 +142,213 @@ class CrowdWisdomTradingFlow(Flow[CrowdWisdomState]):
             "phase": "data_collection_initiated"
         }
 
-    @listen(initiate_data_collection)
-    def execute_data_collection(self, collection_config: dict) -> dict:
-        logger.info("📊 Executing data collection from prediction market sites")
+    def _scrape_site_directly(self, task_info: dict):
+        """
+        Runs the tiered scraper for a site without an agent and validates the
+        payload with the same guardrail the agent task uses
+        """
+        site_name = task_info["site"]
+        logger.info(f"Scraping data from {site_name} (direct)")
+        payload = tiered_fetcher.fetch(site_name, task_info["url"], Config.MAX_PRODUCTS_PER_SITE)
+        valid, result_data = GUARDRAILS["validate_scraped_data"](payload)
+        if not valid:
+            logger.warning(f"Scraped data from {site_name} failed validation: {result_data.get('error')}")
+            return {
+                "site": site_name,
+                "data": {"products": [], "error": result_data.get("error"), "tier": payload.get("tier")},
+                "success": False,
+                "products_count": 0
+            }
+        result_data["tier"] = payload.get("tier")
+        return {
+            "site": site_name,
+            "data": result_data,
+            "success": True,
+            "products_count": result_data["products_count"]
+        }
+
+    def _scrape_site(self, task_info: dict):
+        """
+        Scrapes one site, directly or through its crew, and returns its
+        scraped_data entry
+        """
+        site_name = task_info["site"]
+        with metrics.timer("crowdwisdom_site_scrape_seconds", site=site_name):
+            if task_info["task"] is None:
+                result = self._scrape_site_directly(task_info)
+            else:
+                result = self._scrape_site_with_crew(task_info)
+        if result:
+            metrics.inc("crowdwisdom_site_markets_total", result["products_count"], site=site_name)
+            if not result["success"]:
+                metrics.inc("crowdwisdom_site_scrape_failures_total", site=site_name)
+        return result
+
+    def _polite_delay(self, task_info: dict):
+        """
+        Claims the politeness slot of the host a direct scrape requests
+        first: 0 when the site can go to a worker now, else the seconds to
+        hold it back. Crew-driven scrapes pass the gate in their tools.
+        """
+        if task_info["task"] is not None:
+            return 0.0
+        url = tiered_fetcher.first_url(task_info["site"], task_info["url"], Config.MAX_PRODUCTS_PER_SITE)
+        return politeness_gate.claim(url)
+
+    def _scrape_site_with_crew(self, task_info: dict):
+        """
+        Runs a single site's scraping crew and returns its scraped_data entry
+        """
+        site_name = task_info["site"]
+        task = task_info["task"]
+
+        from crewai import Crew, Process
+        logger.info(f"Scraping data from {site_name}")
+        site_crew = Crew(
+            agents=[self._agents.data_collector_agent()],
+            tasks=[task],
+            process=Process.sequential,
+            verbose=True
+        )
+        with metrics.timer("crowdwisdom_crew_kickoff_seconds", crew="data_collection"):
+            result = site_crew.kickoff()
+
+        if not result:
+            return None
+        # The task guardrail already parsed result.raw; parse_json's cache makes this a lookup
+        valid, result_data = GUARDRAILS["validate_scraped_data"](result)
+        if not valid:
+            logger.warning(f"Failed to parse result from {site_name}: {result_data.get('error')}")
+            return {
+                "site": site_name,
+                "data": {"products": [], "error": result_data.get("error")},
+                "success": False,
+                "products_count": 0
+            }
+        return {
+            "site": site_name,
+            "data": result_data,
+            "success": True,
+            "products_count": result_data["products_count"]
+        }
 
+    def _collect_sequentially(self, scraping_tasks: list):
         scraped_results = []
         errors = []
 
-        for task_info in collection_config["scraping_tasks"]:
-            site_name = task_info["site"]
-            task = task_info["task"]
-
+        for task_info in scraping_tasks:
             try:
-                logger.info(f"Scraping data from {site_name}")
-                site_crew = Crew(
-                    agents=[self.agents.data_collector_agent()],
-                    tasks=[task],
-                    process=Process.sequential,
-                    verbose=True
-                )
-                result = site_crew.kickoff()
-
-                if result:
-                    try:
-                        if hasattr(result, 'raw'):
-                            result_data = json.loads(result.raw) if isinstance(result.raw, str) else result.raw
-                        else:
-                            result_data = json.loads(str(result)) if isinstance(result, str) else result
-
-                        scraped_results.append({
-                            "site": site_name,
-                            "data": result_data,
-                            "success": True,
-                            "products_count": len(result_data.get('products', [])) if isinstance(result_data, dict) else 0
-                        })
-
-                    except (json.JSONDecodeError, AttributeError) as e:
-                        logger.warning(f"Failed to parse result from {site_name}: {str(e)}")
-                        scraped_results.append({
-                            "site": site_name,
-                            "data": {"products": [], "error": f"Parse error: {str(e)}"},
-                            "success": False,
-                            "products_count": 0
-                        })
-
+                site_result = self._scrape_site(task_info)
+                if site_result:
+                    scraped_results.append(site_result)
             except Exception as e:
-                logger.error(f"Error scraping {site_name}: {str(e)}")
+                logger.error(f"Error scraping {task_info['site']}: {str(e)}")
                 errors.append({
-                    "site": site_name,
+                    "site": task_info["site"],
                     "error": str(e),
                     "phase": "data_collection"
                 })
 
+        return scraped_results, errors
+
+    def _collect_concurrently(self, scraping_tasks: list):
+        """
+        Scrapes sites on a bounded worker pool. Each site gets Config.SITE_TIMEOUT
+        seconds from the moment a worker picks it up; a site that overruns is
+        recorded as an error and abandoned so the rest of the run can finish.
+        A site whose host is still inside its politeness spacing is held back
+        here rather than handed to a worker that would sleep through it.
+        """
+        max_workers = max(1, min(Config.COLLECTION_CONCURRENCY, len(scraping_tasks)))
+        logger.info(f"Scraping {len(scraping_tasks)} sites with up to {max_workers} parallel workers")
+
+        site_results = [None] * len(scraping_tasks)
+        errors = []
+        started_at = {}
+        # Sites still queued when this passes can never get a worker (every slot is held by a hung site)
+        deadline = time.monotonic() + Config.SITE_TIMEOUT * math.ceil(len(scraping_tasks) / max_workers)
+
+        def run_site(index, task_info):
+            started_at[index] = time.monotonic()
+            return self._scrape_site(task_info)
+
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="site-scraper")
+        try:
+            held = list(enumerate(scraping_tasks))
+            futures = {}
+            pending = set()
+
+            while pending or held:
+                next_ready = 1.0
+                for index, task_info in list(held):
+                    delay = self._polite_delay(task_info)
+                    if delay > 0:
+                        next_ready = min(next_ready, delay)
+                        continue
+                    held.remove((index, task_info))
+                    future = executor.submit(run_site, index, task_info)
+                    futures[future] = index
+                    pending.add(future)
+                timeout = next_ready if held else 1.0
+                if not pending:
+                    time.sleep(timeout)
+                    continue
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    index = futures[future]
+                    site_name = scraping_tasks[index]["site"]
+                    try:
+                        site_results[index] = future.result()
+                    except Exception as e:
+                        logger.error(f"Error scraping {site_name}: {str(e)}")
+                        errors.append({
+                            "site": site_name,
+                            "error": str(e),
+                            "phase": "data_collection"
+                        })
+
+                now = time.monotonic()
+                for future in list(pending):
+                    index = futures[future]
+                    site_name = scraping_tasks[index]["site"]
+                    if index in started_at and now - started_at[index] > Config.SITE_TIMEOUT:
+                        error = f"Timed out after {Config.SITE_TIMEOUT}s"
+                    elif index not in started_at and now > deadline:
+                        error = "No free worker before the collection deadline"
+                    else:
+                        continue
+                    logger.error(f"Error scraping {site_name}: {error}")
+                    future.cancel()
+                    pending.discard(future)
+                    errors.append({
+                        "site": site_name,
+                        "error": error,
+                        "phase": "data_collection"
+                    })
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return [r for r in site_results if r], errors
+
+    @listen(initiate_data_collection)
+    @timed_phase("data_collection")
+    def execute_data_collection(self, collection_config: dict) -> dict:
+        logger.info("📊 Executing data collection from prediction market sites")
+
+        resumed = self._resumed("scraped_data")
+        if resumed is not None:
+            scraped_results, errors = resumed["scraped_data"], resumed["scraping_errors"]
+        elif Config.CONCURRENT_COLLECTION:
+            scraped_results, errors = self._collect_concurrently(collection_config["scraping_tasks"])
+        else:
+            scraped_results, errors = self._collect_sequentially(collection_config["scraping_tasks"])
+
         self.state.scraped_data = scraped_results
         self.state.scraping_errors = errors
         self.state.total_products_collected = sum(r["products_count"] for r in scraped_results)
+        if resumed is None and self.state.total_products_collected:
+            self._save_checkpoint("scraped_data", {"scraped_data": scraped_results, "scraping_errors": errors})
 
         logger.info(f"Data collection completed: {self.state.total_products_collected} total products collected")
 
@@ -143,19 +360,28 @@ class CrowdWisdomTradingFlow(Flow[CrowdWisdomState]):
         }
 
     @router(execute_data_collection)
+    @timed_phase("route")
     def route_to_matching(self, collection_results: dict) -> str:
         if collection_results["total_products"] > 0:
             logger.info("✅ Data collection successful, proceeding to product matching")
             return "product_matching"
         else:
             logger.warning("❌ No products collected, proceeding to error handling")
-            return "handle_collection_failure"
+            return "collection_failed"
 
     @listen("product_matching")
+    @timed_phase("product_matching")
     def execute_product_matching(self) -> dict:
         logger.info("🔍 Executing product matching analysis")
         self.state.current_phase = "product_matching"
 
+        resumed = self._resumed("matched_products")
+        if resumed is not None:
+            self._all_products = resumed["all_products"]
+            self._delta = resumed["delta"]
+            self.state.market_changes = resumed["market_changes"]
+            return self._apply_matching(resumed["matching_data"])
+
         all_products = []
         for result in self.state.scraped_data:
             if result["success"] and "data" in result:
@@ -168,60 +394,23 @@ class CrowdWisdomTradingFlow(Flow[CrowdWisdomState]):
             logger.warning("No products available for matching")
             return {"error": "No products to match", "matched_products": []}
 
-        matching_task = Task(
-            description=f"""
-            Analyze the collected prediction market data to identify and group similar markets across different platforms.
-
-            You have {len(all_products)} total products from {len(self.state.scraped_data)} different sites.
-
-            Data to analyze:
-            {json.dumps(all_products, indent=2)}
-
-            Your task:
-            1. Compare products across different sites to find markets that refer to the same underlying event
-            2. Group similar/identical markets together
-            3. Calculate confidence scores for your matches (0.0 to 1.0)
-            4. Analyze price differences across sites for the same markets
-            5. Create unified titles for matched product groups
-
-            Focus on finding markets that are clearly about the same event, outcome, or prediction.
-            Be conservative with matches - only group together if you're confident they match.
-            """,
-            agent=self.agents.product_matcher_agent(),
-            expected_output="JSON with matched product groups, confidence scores, and analysis summary",
-            guardrail=GUARDRAILS["validate_product_matching"]
-        )
+        parsed = annotate_products(all_products)
+        logger.info(f"Normalized prices for {parsed}/{len(all_products)} products")
 
         try:
-            matching_crew = Crew(
-                agents=[self.agents.product_matcher_agent()],
-                tasks=[matching_task],
-                process=Process.sequential,
-                verbose=True
-            )
-            result = matching_crew.kickoff()
-
-            if result:
-                if hasattr(result, "raw"):
-                    matching_data = json.loads(result.raw) if isinstance(result.raw, str) else result.raw
-                else:
-                    matching_data = json.loads(str(result)) if isinstance(result, str) else result
-
-                self.state.matched_products = matching_data.get("matched_products", [])
-                self.state.unique_products_count = matching_data.get("total_unique_products", 0)
-                self.state.matching_confidence = sum(
-                    p.get("match_confidence", 0.5) for p in self.state.matched_products
-                ) / len(self.state.matched_products) if self.state.matched_products else 0.0
-
-                logger.info(f"Product matching completed: {self.state.unique_products_count} unique product groups identified")
-
-                return {
-                    "matched_products": self.state.matched_products,
-                    "unique_count": self.state.unique_products_count,
-                    "average_confidence": self.state.matching_confidence,
-                    "success": True
-                }
-
+            matching_data = self._match_incrementally(all_products)
+            valid, validation = GUARDRAILS["validate_product_matching"](matching_data)
+            if not valid:
+                raise ValueError(validation.get("error", "Product matching validation failed"))
+            result = self._apply_matching(matching_data)
+            # Groups reference the same product objects as all_products, which pickle keeps
+            self._save_checkpoint("matched_products", {
+                "all_products": self._all_products,
+                "delta": self._delta,
+                "market_changes": self.state.market_changes,
+                "matching_data": matching_data
+            })
+            return result
         except Exception as e:
             logger.error(f"Error in product matching: {str(e)}")
             self.state.errors_encountered.append({
@@ -231,7 +420,109 @@ class CrowdWisdomTradingFlow(Flow[CrowdWisdomState]):
 
         return {"error": "Product matching failed", "matched_products": []}
 
+    def _match_incrementally(self, all_products: list) -> dict:
+        """
+        Diffs the listings against the last run's snapshot and only re-matches
+        markets the delta can affect; last run's other groups are reused
+        """
+        self._all_products = all_products
+        self._delta = None
+        if not Config.INCREMENTAL_RUNS:
+            return self._match(all_products)
+
+        self._delta = delta = snapshot_store.diff(all_products)
+        self.state.market_changes = delta.summary()
+        dirty = delta.new | delta.retitled
+        previous_groups = snapshot_store.load_groups() if delta.previous_count else []
+        if not previous_groups or len(dirty) > Config.INCREMENTAL_MAX_DIRTY_RATIO * len(all_products):
+            return self._match(all_products)
+
+        kept, rematch = market_matcher.plan_incremental(all_products, delta.keys, previous_groups, dirty)
+        logger.info(f"Incremental matching: {len(kept)} groups reused, {len(rematch)} products re-matched")
+        subset = [all_products[i] for i in rematch]
+        matching_data = self._match(subset) if subset else {"matched_products": []}
+        return market_matcher.combine(all_products, kept, matching_data)
+
+    def _match(self, products: list) -> dict:
+        if Config.MATCHING_MODE == "local":
+            adjudicator = llm_adjudicate if Config.MATCH_LLM_ADJUDICATION and Config.MISTRAL_API_KEY else None
+            return market_matcher.match(products, adjudicator=adjudicator)
+        from llm_matching import ChunkedLLMMatcher
+        return ChunkedLLMMatcher(self._agents).match(products)
+
+    def _apply_matching(self, matching_data: dict) -> dict:
+        self.state.matched_products = matching_data.get("matched_products", [])
+        self.state.unique_products_count = matching_data.get("total_unique_products", 0)
+        self.state.matching_confidence = sum(
+            p.get("match_confidence", 0.5) for p in self.state.matched_products
+        ) / len(self.state.matched_products) if self.state.matched_products else 0.0
+
+        logger.info(f"Product matching completed: {self.state.unique_products_count} unique product groups identified")
+
+        return {
+            "matched_products": self.state.matched_products,
+            "unique_count": self.state.unique_products_count,
+            "average_confidence": self.state.matching_confidence,
+            "success": True
+        }
+
+    def _keys_by_product(self) -> dict:
+        delta = getattr(self, "_delta", None)
+        keys = delta.keys if delta is not None else market_keys(self._all_products)
+        return {id(p): key for p, key in zip(self._all_products, keys)}
+
+    def _record_history(self):
+        """
+        Appends this cycle's quotes to the Parquet history; a failure here
+        never fails the run
+        """
+        if not Config.HISTORY_ENABLED:
+            return
+        try:
+            from history_store import history_store
+            history_store.append(self.state.matched_products, self._keys_by_product(), run_id=str(self.state.id))
+        except Exception as e:
+            logger.warning(f"Could not append market history: {str(e)}")
+
+    def _commit_snapshot(self):
+        """
+        Saves this run's markets and groups as the baseline for the next run;
+        only called once the board is in place
+        """
+        delta = getattr(self, "_delta", None)
+        if delta is None:
+            return
+        key_of = self._keys_by_product()
+        groups = [
+            ([key_of[id(p)] for p in group["products"] if id(p) in key_of], group.get("match_confidence", 0.5))
+            for group in self.state.matched_products
+        ]
+        snapshot_store.commit(
+            self._all_products, delta, [g for g in groups if g[0]], board_fingerprint(Config.CSV_OUTPUT_PATH)
+        )
+
     @listen(execute_product_matching)
+    @timed_phase("arbitrage_scan")
+    def scan_arbitrage(self, matching_results: dict) -> dict:
+        """
+        Numeric spread and cross-venue arbitrage pass over the matched groups
+        """
+        if not matching_results.get("success") or not self.state.matched_products:
+            return matching_results
+        try:
+            scan = scan_groups(self.state.matched_products)
+            self.state.arbitrage_opportunities = scan["opportunities"]
+            self.state.spread_summary = scan["summary"]
+        except Exception as e:
+            logger.error(f"Error in arbitrage scan: {str(e)}")
+            self.state.errors_encountered.append({
+                "phase": "arbitrage_scan",
+                "error": str(e)
+            })
+        return matching_results
+
+    @listen(scan_arbitrage)
+    @timed_phase("board", final=True)
     def generate_final_csv(self, matching_results: dict) -> dict:
         logger.info("📊 Generating final CSV output")
         self.state.current_phase = "csv_generation"
@@ -240,99 +531,157 @@ class CrowdWisdomTradingFlow(Flow[CrowdWisdomState]):
             logger.warning("No matched products available for CSV generation")
             return {"error": "No data available for CSV generation"}
 
-        csv_task = Task(
-            description=f"""
-            Create a comprehensive CSV file from the matched prediction market data.
-
-            Matched Products Data:
-            {json.dumps(self.state.matched_products, indent=2)}
-
-            Requirements:
-            1. Create a CSV with columns:
-               - unified_title, category, polymarket_price, kalshi_price,
-                 other_site_price, price_difference, sites_available,
-                 confidence_level, volume_info, last_updated
-            2. Include headers
-            3. Handle missing data with "N/A"
-            4. Proper CSV escaping
-            5. Provide summary of data process
-
-            Start response with CSV content.
-            """,
-            agent=self.agents.data_organizer_agent(),
-            expected_output="Complete CSV content with headers and rows, plus summary",
-            guardrail=GUARDRAILS["validate_csv_output"]
-        )
+        csv_file_path = Config.CSV_OUTPUT_PATH
+        delta = getattr(self, "_delta", None)
         try:
-            csv_crew = Crew(
-                agents=[self.agents.data_organizer_agent()],
-                tasks=[csv_task],
-                process=Process.sequential,
-                verbose=True
-            )
-            result = csv_crew.kickoff()
-
-            if result:
-                csv_content = result.raw if hasattr(result, "raw") else str(result)
-                csv_file_path = Config.CSV_OUTPUT_PATH
-                try:
-                    with open(csv_file_path, "w", encoding="utf-8") as f:
-                        f.write(csv_content)
-
-                    logger.info(f"CSV file saved to: {csv_file_path}")
-
-                    self.state.csv_content = csv_content
-                    self.state.csv_file_path = str(csv_file_path)
-                    self.state.flow_success = True
-
-                    summary = {
-                        "total_sites_scraped": len(Config.TARGET_SITES),
-                        "successful_scrapes": len([r for r in self.state.scraped_data if r["success"]]),
-                        "total_products_collected": self.state.total_products_collected,
-                        "unique_products_identified": self.state.unique_products_count,
-                        "average_matching_confidence": round(self.state.matching_confidence, 3),
-                        "csv_file_path": str(csv_file_path),
-                        "csv_rows_generated": len(csv_content.split("\n")) - 1,
-                        "timestamp": datetime.now().isoformat(),
-                        "errors": self.state.errors_encountered
-                    }
-                    self.state.final_summary = summary
-
-                    return {
-                        "csv_generated": True,
-                        "file_path": str(csv_file_path),
-                        "summary": summary,
-                        "success": True
-                    }
-
-                except IOError as e:
-                    logger.error(f"Failed to save CSV file: {str(e)}")
-                    return {"error": f"Failed to save CSV: {str(e)}"}
-
+            # Only when nothing else (the error board, a --stream run) has written the file since
+            if delta is not None and delta.is_empty and snapshot_store.board_current(csv_file_path):
+                logger.info("No market changed since the last run, keeping the existing board")
+                rows_written = len(self.state.matched_products)
+            else:
+                rows_written = write_board(self.state.matched_products, csv_file_path)
+            self._commit_snapshot()
+            self._record_history()
         except Exception as e:
-            logger.error(f"Error generating CSV: {str(e)}")
+            logger.error(f"Failed to save CSV file: {str(e)}")
             self.state.errors_encountered.append({
                 "phase": "csv_generation",
                 "error": str(e)
             })
+            return {"error": f"Failed to save CSV: {str(e)}"}
+
+        logger.info(f"CSV file saved to: {csv_file_path}")
+
+        self.state.csv_content = Path(csv_file_path).read_text(encoding="utf-8")
+        self.state.csv_file_path = str(csv_file_path)
+        self.state.flow_success = True
+
+        summary = {
+            "total_sites_scraped": len(Config.TARGET_SITES),
+            "successful_scrapes": len([r for r in self.state.scraped_data if r["success"]]),
+            "total_products_collected": self.state.total_products_collected,
+            "unique_products_identified": self.state.unique_products_count,
+            "average_matching_confidence": round(self.state.matching_confidence, 3),
+            "csv_file_path": str(csv_file_path),
+            "csv_rows_generated": rows_written,
+            "market_changes": self.state.market_changes,
+            "spread_summary": self.state.spread_summary,
+            "top_arbitrage_opportunities": self.state.arbitrage_opportunities,
+            "phase_timings": self.state.phase_timings,
+            "timestamp": datetime.now().isoformat(),
+            "errors": self.state.errors_encountered
+        }
+        if Config.BOARD_NARRATIVE:
+            summary["narrative"] = self._board_narrative(summary)
+        self.state.final_summary = summary
+        if self._checkpoint is not None:
+            self._save_checkpoint("board", {"csv_file_path": str(csv_file_path), "summary": summary})
+            self._checkpoints.prune()
+
+        return {
+            "csv_generated": True,
+            "file_path": str(csv_file_path),
+            "summary": summary,
+            "success": True
+        }
+
+    def _resumed(self, phase: str):
+        """
+        The checkpointed output of `phase` when this run resumes one that
+        completed it; None means the phase has to run
+        """
+        if self._resume is None or not self._resume.has(phase):
+            return None
+        try:
+            payload = self._resume.load(phase)
+        except Exception as e:
+            logger.warning(f"Could not load the {phase} checkpoint, running the phase again: {str(e)}")
+            return None
+        metrics.inc("crowdwisdom_checkpoint_resumed_total", phase=phase)
+        logger.info(
+            f"♻️ Loaded {phase} from checkpoint ({format_age(self._resume.age(phase))} old, "
+            f"{format_size(self._resume.size(phase))})"
+        )
+        return payload
+
+    def _save_checkpoint(self, phase: str, payload: dict):
+        """
+        Persists a completed phase's output; a failure here never fails the run
+        """
+        if self._checkpoint is None:
+            return
+        try:
+            with metrics.timer("crowdwisdom_checkpoint_save_seconds", phase=phase):
+                self._checkpoint.save(phase, payload)
+        except Exception as e:
+            logger.warning(f"Could not save the {phase} checkpoint: {str(e)}")
+
+    def _board_narrative(self, summary: dict) -> str:
+        """
+        Optional data_organizer_agent write-up of the board; the CSV itself
+        is always written locally
+        """
+        from crewai import Crew, Process, Task
+        cross_site = [g for g in self.state.matched_products if len(g.get("sites", [])) > 1][:20]
+        narrative_task = Task(
+            description=f"""
+            Write a short summary of today's unified prediction market board for a trading desk.
 
-        return {"error": "CSV generation failed"}
+            Run statistics:
+            {json.dumps({k: v for k, v in summary.items() if k != "errors"}, indent=2)}
 
-    @listen("handle_collection_failure")
+            Markets listed on more than one site (up to 20):
+            {json.dumps([{"title": g["unified_title"], "sites": g["sites"], "prices": g.get("price_analysis", {})} for g in cross_site], indent=2)}
+
+            Highlight notable cross-site price differences and any gaps in coverage.
+            Do not produce CSV.
+            """,
+            agent=self._agents.data_organizer_agent(),
+            expected_output="A few paragraphs summarising the board"
+        )
+        try:
+            narrative_crew = Crew(
+                agents=[self._agents.data_organizer_agent()],
+                tasks=[narrative_task],
+                process=Process.sequential,
+                verbose=True
+            )
+            with metrics.timer("crowdwisdom_crew_kickoff_seconds", crew="board_narrative"):
+                result = narrative_crew.kickoff()
+            return result.raw if hasattr(result, "raw") else str(result)
+        except Exception as e:
+            logger.warning(f"Board narrative failed: {str(e)}")
+            return ""
+
+    def _finish_metrics(self):
+        """
+        Attaches this run's metrics to final_summary and exports them as a
+        JSON line plus the Prometheus textfile
+        """
+        run_metrics = metrics.since(self._metrics_mark)
+        self.state.final_summary["metrics"] = run_metrics
+        metrics.export({
+            "flow_id": self.state.id,
+            "success": self.state.flow_success,
+            "products_collected": self.state.total_products_collected,
+            "unique_products": self.state.unique_products_count,
+            "phase_timings": self.state.phase_timings,
+            "metrics": run_metrics
+        })
+
+    # A listener named after the label it listens to would be re-triggered by its own completion
+    @listen("collection_failed")
+    @timed_phase("error_board", final=True)
     def handle_collection_failure(self) -> dict:
         logger.warning("🚨 Handling data collection failure")
 
-        error_csv = """unified_title,category,polymarket_price,kalshi_price,other_site_price,price_difference,sites_available,confidence_level,volume_info,last_updated
-\"No data collected - See error log\",\"Error\",\"N/A\",\"N/A\",\"N/A\",\"N/A\",\"None\",\"0.0\",\"N/A\",\"{}\"""".format(datetime.now().isoformat())
-
         try:
-            with open(Config.CSV_OUTPUT_PATH, "w", encoding="utf-8") as f:
-                f.write(error_csv)
+            write_error_board(Config.CSV_OUTPUT_PATH)
             logger.info(f"Error CSV saved to: {Config.CSV_OUTPUT_PATH}")
+            self.state.csv_content = Path(Config.CSV_OUTPUT_PATH).read_text(encoding="utf-8")
         except IOError as e:
             logger.error(f"Failed to save error CSV: {str(e)}")
 
-        self.state.csv_content = error_csv
         self.state.csv_file_path = str(Config.CSV_OUTPUT_PATH)
         self.state.flow_success = False
 
@@ -344,12 +693,20 @@ class CrowdWisdomTradingFlow(Flow[CrowdWisdomState]):
         }
 
 
-def run_crowdwisdom_flow():
+def run_crowdwisdom_flow(resume=None):
+    """
+    Runs the flow once. `resume` is the FlowCheckpoint of a failed run to
+    continue; without one, the newest resumable run with the same inputs is
+    picked up when CHECKPOINT_AUTO_RESUME is on.
+    """
     logger.info("🎯 Initializing CrowdWisdom Trading AI Agent")
-    flow = CrowdWisdomTradingFlow()
+    if resume is None and Config.CHECKPOINTS_ENABLED and Config.CHECKPOINT_AUTO_RESUME:
+        resume = checkpoint_store.latest_resumable()
+    flow = CrowdWisdomTradingFlow(resume=resume)
     try:
         logger.info("▶️ Starting flow execution")
-        final_result = flow.kickoff()
+        # The same id keeps the resumed run's checkpoints, logs and metrics together
+        final_result = flow.kickoff(inputs={"id": resume.flow_id} if resume else None)
         logger.info("✅ Flow execution completed")
         logger.info(f"Final Summary: {flow.state.final_summary}")
         if flow.state.flow_success:
@@ -363,5 +720,6 @@ def run_crowdwisdom_flow():
 
 
 if __name__ == "__main__":
+    bootstrap()
     final_state = run_crowdwisdom_flow()
     print(f"\n🏁 Flow completed. Final state: {final_state.flow_success}")
@@ -0,0 +1,509 @@
+"""
+Local product matching for CrowdWisdomTrading AI Agent
+Deterministic title normalization, blocking index and fuzzy pair scoring
+"""
+
+import json
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from config import Config, logger
+from records import MarketColumns
+
+MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3,
+    "apr": 4, "april": 4, "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7,
+    "aug": 8, "august": 8, "sep": 9, "sept": 9, "september": 9, "oct": 10, "october": 10,
+    "nov": 11, "november": 11, "dec": 12, "december": 12
+}
+ENTITY_ALIASES = {
+    "btc": "bitcoin", "xbt": "bitcoin", "eth": "ethereum", "sol": "solana", "doge": "dogecoin",
+    "gop": "republican", "republicans": "republican",
+    "dem": "democrat", "dems": "democrat", "democrats": "democrat", "democratic": "democrat",
+    "us": "usa", "america": "usa", "united states": "usa", "potus": "president",
+    "fomc": "fed", "federal reserve": "fed", "sp500": "s&p", "spx": "s&p"
+}
+STOPWORDS = {
+    "will", "the", "a", "an", "be", "is", "are", "of", "to", "in", "on", "at", "by", "for",
+    "and", "or", "this", "that", "what", "who", "which", "market", "price", "happen", "get"
+}
+NUMBER_SUFFIXES = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+
+_MONTH_NAMES = "|".join(sorted(MONTHS, key=len, reverse=True))
+_DATE_MDY = re.compile(rf"\b({_MONTH_NAMES})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b")
+_DATE_DMY = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+({_MONTH_NAMES})\.?,?\s+(\d{{4}})\b")
+_DATE_MY = re.compile(rf"\b({_MONTH_NAMES})\.?,?\s+(\d{{4}})\b")
+_DATE_ISO = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_DATE_SLASH = re.compile(r"\b(\d{1,2})/(\d{1,2})/(\d{4})\b")
+_TICKER = re.compile(r"\$([a-z]{2,5})\b")
+_NUMBER = re.compile(r"(?<![\w.-])\$?(\d(?:[\d,]*\d)?(?:\.\d+)?)(?:\s?([kmb])\b)?(?![\w-])")
+_MULTIWORD_ALIASES = [(re.compile(rf"\b{re.escape(k)}\b"), v) for k, v in ENTITY_ALIASES.items() if " " in k]
+_TOKEN = re.compile(r"[a-z0-9&]+(?:-\d{2}(?:-\d{2})?)?")
+_DATE_TOKEN = re.compile(r"^\d{4}-\d{2}(-\d{2})?$")
+
+
+def _iso(year, month, day=None):
+    if day is None:
+        return f"{int(year):04d}-{int(month):02d}"
+    return f"{int(year):04d}-{int(month):02d}-{int(day):02d}"
+
+
+def _number_token(match):
+    value = float(match.group(1).replace(",", ""))
+    if match.group(2):
+        value *= NUMBER_SUFFIXES[match.group(2)]
+    return str(int(value)) if value.is_integer() else f"{value:.4f}".rstrip("0")
+
+
+def normalize_title(title):
+    """
+    Lowercases and canonicalizes a market title: dates become ISO tokens,
+    tickers and common entity spellings collapse to one form, and numbers
+    like "$100k" become "100000"
+    """
+    text = unicodedata.normalize("NFKD", str(title or "")).encode("ascii", "ignore").decode().lower()
+    text = text.replace("u.s.", "us")
+    text = _DATE_MDY.sub(lambda m: _iso(m.group(3), MONTHS[m.group(1)], m.group(2)), text)
+    text = _DATE_DMY.sub(lambda m: _iso(m.group(3), MONTHS[m.group(2)], m.group(1)), text)
+    text = _DATE_ISO.sub(lambda m: _iso(m.group(1), m.group(2), m.group(3)), text)
+    text = _DATE_SLASH.sub(lambda m: _iso(m.group(3), m.group(1), m.group(2)), text)
+    text = _DATE_MY.sub(lambda m: _iso(m.group(2), MONTHS[m.group(1)]), text)
+    text = _TICKER.sub(lambda m: ENTITY_ALIASES.get(m.group(1), m.group(1)), text)
+    for pattern, replacement in _MULTIWORD_ALIASES:
+        text = pattern.sub(replacement, text)
+    text = _NUMBER.sub(_number_token, text)
+    tokens = []
+    for token in _TOKEN.findall(text):
+        token = ENTITY_ALIASES.get(token, token)
+        # Light plural folding so "wins"/"win" and "rates"/"rate" compare equal
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss") and token.isalpha():
+            token = token[:-1]
+        if token not in STOPWORDS:
+            tokens.append(token)
+    return " ".join(tokens)
+
+
+def product_site(product):
+    return product.get("source_site") or product.get("site") or "unknown"
+
+
+class UnionFind:
+    """
+    Disjoint sets over market indexes. When `sites` is given, merges that
+    would put two markets from the same site in one group are refused.
+    """
+    def __init__(self, size, sites=None):
+        self.parent = list(range(size))
+        self.sites = [{site} for site in sites] if sites is not None else None
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return True
+        if self.sites is not None:
+            if self.sites[ra] & self.sites[rb]:
+                return False
+            self.sites[ra] |= self.sites[rb]
+        self.parent[rb] = ra
+        return True
+
+
+class MarketMatcher:
+    """
+    Groups equivalent markets across sites without an LLM.
+
+    Titles are normalized, indexed by token and only pairs that share a
+    selective token (a "block") from different sites are scored. Pairs at or
+    above `threshold` are merged; pairs within `ambiguous_margin` below it
+    can be passed to an adjudicator (the LLM) for a yes/no decision.
+    """
+    def __init__(self, threshold=None, ambiguous_margin=None, max_block_size=None, blocking_keys=3):
+        self.threshold = Config.MATCH_THRESHOLD if threshold is None else threshold
+        self.ambiguous_margin = Config.MATCH_AMBIGUOUS_MARGIN if ambiguous_margin is None else ambiguous_margin
+        self.max_block_size = max_block_size or Config.MATCH_MAX_BLOCK_SIZE
+        self.blocking_keys = blocking_keys
+
+    def _build_index(self, token_sets):
+        index = defaultdict(list)
+        for i, tokens in enumerate(token_sets):
+            for token in tokens:
+                index[token].append(i)
+        return index
+
+    def candidate_pairs(self, token_sets, sites):
+        """
+        Yields (i, j) cross-site pairs that share one of each market's
+        rarest tokens; tokens present in more than max_block_size markets
+        are too common to block on
+        """
+        index = self._build_index(token_sets)
+        seen = set()
+        for i, tokens in enumerate(token_sets):
+            keys = sorted(
+                (t for t in tokens if len(index[t]) <= self.max_block_size),
+                key=lambda t: (len(index[t]), t)
+            )[:self.blocking_keys]
+            for key in keys:
+                for j in index[key]:
+                    if j <= i or sites[i] == sites[j] or (i, j) in seen:
+                        continue
+                    seen.add((i, j))
+                    yield i, j
+
+    @staticmethod
+    def score_pair(norm_a, norm_b, tokens_a, tokens_b, floor=0.0):
+        """
+        Pair score in [0, 1]. A pair that cannot reach `floor` even with
+        identical strings returns early with some score below it, skipping
+        the SequenceMatcher.
+        """
+        if not tokens_a or not tokens_b:
+            return 0.0
+        jaccard = len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+        score = 0.5 * jaccard
+        # Markets on different dates or strike levels are different markets
+        dates_a = {t for t in tokens_a if _DATE_TOKEN.match(t)}
+        dates_b = {t for t in tokens_b if _DATE_TOKEN.match(t)}
+        if dates_a and dates_b and not any(a.startswith(b) or b.startswith(a) for a in dates_a for b in dates_b):
+            score -= 0.3
+        numbers_a = {t for t in tokens_a - dates_a if t[0].isdigit()}
+        numbers_b = {t for t in tokens_b - dates_b if t[0].isdigit()}
+        if numbers_a and numbers_b and not numbers_a & numbers_b:
+            score -= 0.2
+        if score + 0.5 < floor:
+            return max(score, 0.0)
+        matcher = SequenceMatcher(None, norm_a, norm_b, autojunk=False)
+        return max(score + 0.5 * matcher.ratio(), 0.0)
+
+    def score_candidates(self, products, floor=None):
+        """
+        Returns (normalized titles, scored pairs) where scored pairs are
+        (score, i, j) for every blocked candidate pair scoring at least
+        `floor` (default: the bottom of the ambiguous band)
+        """
+        columns = MarketColumns(products)
+        normalized = [normalize_title(title) for title in columns["title"]]
+        token_sets = [set(n.split()) for n in normalized]
+        sites = columns.sites()
+        scored = []
+        floor = self.threshold - self.ambiguous_margin if floor is None else floor
+        for i, j in self.candidate_pairs(token_sets, sites):
+            score = self.score_pair(normalized[i], normalized[j], token_sets[i], token_sets[j], floor)
+            if score >= floor:
+                scored.append((score, i, j))
+        scored.sort(key=lambda s: (-s[0], s[1], s[2]))
+        return normalized, scored
+
+    def match(self, products, adjudicator=None):
+        """
+        Groups products and returns the matched_products payload expected by
+        validate_product_matching. `adjudicator`, if given, receives a list of
+        (product_a, product_b, score) for ambiguous pairs and returns the
+        indexes of the pairs that are the same market.
+        """
+        normalized, scored = self.score_candidates(products)
+        sites = MarketColumns(products).sites()
+        groups = UnionFind(len(products), sites)
+        pair_scores = defaultdict(list)
+
+        confident = [s for s in scored if s[0] >= self.threshold]
+        ambiguous = [s for s in scored if s[0] < self.threshold]
+        if ambiguous and adjudicator:
+            ambiguous = ambiguous[:Config.MATCH_MAX_LLM_PAIRS]
+            try:
+                confirmed = set(adjudicator([(products[i], products[j], score) for score, i, j in ambiguous]))
+                confident.extend(s for k, s in enumerate(ambiguous) if k in confirmed)
+            except Exception as e:
+                logger.warning(f"Ambiguous pair adjudication failed, treating them as non-matches: {str(e)}")
+
+        for score, i, j in confident:
+            if groups.union(i, j):
+                pair_scores[groups.find(i)].append(score)
+
+        members = defaultdict(list)
+        for i in range(len(products)):
+            members[groups.find(i)].append(i)
+        scores_by_root = defaultdict(list)
+        for root, scores in pair_scores.items():
+            scores_by_root[groups.find(root)].extend(scores)
+
+        matched = []
+        for root, indexes in members.items():
+            group_products = [products[i] for i in indexes]
+            if len(indexes) > 1:
+                confidence = sum(scores_by_root[root]) / len(scores_by_root[root])
+            else:
+                confidence = float(group_products[0].get("confidence_score", 0.5))
+            matched.append(self.build_group(group_products, confidence))
+
+        matched.sort(key=lambda g: (-len(g["sites"]), -g["match_confidence"]))
+        cross_site = sum(1 for g in matched if len(g["sites"]) > 1)
+        logger.info(
+            f"Local matcher: {len(products)} products, {len(scored)} scored pairs, "
+            f"{cross_site} cross-site groups"
+        )
+        return {
+            "matched_products": matched,
+            "total_unique_products": len(matched),
+            "analysis_summary": (
+                f"{len(matched)} unique markets from {len(products)} listings; "
+                f"{cross_site} listed on more than one site"
+            )
+        }
+
+    def plan_incremental(self, products, keys, previous_groups, dirty):
+        """
+        Splits a run into last run's groups that still hold and the products
+        that need matching again. `keys` gives each product's (site, key),
+        `previous_groups` is [(set of keys, confidence)] and `dirty` the keys
+        that are new or retitled. A previous group is reused only if all of
+        its members are present, none is dirty and no dirty product is a
+        candidate match for any of them. Returns (kept, rematch): kept as
+        [(product indexes, confidence)], rematch as product indexes.
+        """
+        position = {key: i for i, key in enumerate(keys)}
+        columns = MarketColumns(products)
+        normalized = [normalize_title(title) for title in columns["title"]]
+        token_sets = [set(n.split()) for n in normalized]
+        sites = columns.sites()
+        dirty_indexes = {position[key] for key in dirty if key in position}
+
+        group_of = {}
+        candidates = []
+        for members, confidence in previous_groups:
+            if not all(key in position for key in members):
+                continue
+            indexes = [position[key] for key in members]
+            if any(i in dirty_indexes for i in indexes):
+                continue
+            candidates.append((indexes, confidence))
+            for i in indexes:
+                group_of[i] = len(candidates) - 1
+
+        # A changed market may now belong with a group that was settled last run
+        broken = set()
+        floor = self.threshold - self.ambiguous_margin
+        for i, j in self.candidate_pairs(token_sets, sites):
+            if (i in dirty_indexes) == (j in dirty_indexes):
+                continue
+            settled = j if i in dirty_indexes else i
+            if settled in group_of and group_of[settled] not in broken:
+                if self.score_pair(normalized[i], normalized[j], token_sets[i], token_sets[j], floor) >= floor:
+                    broken.add(group_of[settled])
+
+        kept = [group for k, group in enumerate(candidates) if k not in broken]
+        settled = {i for indexes, _ in kept for i in indexes}
+        rematch = [i for i in range(len(products)) if i not in settled]
+        return kept, rematch
+
+    def combine(self, products, kept, matching_data):
+        """
+        Adds the reused groups from plan_incremental to a matcher payload
+        covering the re-matched products
+        """
+        matched = [self.build_group([products[i] for i in indexes], confidence) for indexes, confidence in kept]
+        matched.extend(matching_data.get("matched_products", []))
+        matched.sort(key=lambda g: (-len(g["sites"]), -g["match_confidence"]))
+        cross_site = sum(1 for g in matched if len(g["sites"]) > 1)
+        return {
+            "matched_products": matched,
+            "total_unique_products": len(matched),
+            "analysis_summary": (
+                f"{len(matched)} unique markets from {len(products)} listings; "
+                f"{cross_site} listed on more than one site ({len(kept)} groups reused from the last run)"
+            )
+        }
+
+    @staticmethod
+    def build_group(group_products, confidence):
+        lead = max(group_products, key=lambda p: (float(p.get("confidence_score", 0.5)), len(str(p.get("title", "")))))
+        sites = sorted({product_site(p) for p in group_products})
+        price_analysis = {f"{product_site(p)}_price": p.get("price", "N/A") for p in group_products}
+        quoted = [p["yes_price"] for p in group_products if p.get("yes_price") is not None]
+        price_analysis["price_difference"] = round(max(quoted) - min(quoted), 4) if len(quoted) > 1 else "N/A"
+        return {
+            "unified_title": str(lead.get("title", "")).split("\n")[0].strip(),
+            "products": group_products,
+            "match_confidence": round(confidence, 3),
+            "sites": sites,
+            "price_analysis": price_analysis
+        }
+
+
+class IncrementalMatcher:
+    """
+    Streaming counterpart of MarketMatcher.match: markets arrive in batches
+    and each one is scored against everything still held, through a token
+    index that grows with the stream, using the same blocking keys and
+    pair score. Each market joins the best-scoring groups it clears the
+    threshold with, as they stand when it arrives; ambiguous pairs count
+    as non-matches, since no adjudicator can wait on a stream.
+
+    A group is stable once every site it lacks has finished streaming: no
+    later market can join it. Stable groups are handed out and dropped
+    from the index, so only the still-open groups stay in memory.
+
+    Blocks are counted over the markets held when one arrives, a fraction
+    of the run early on, so the size cap is STREAM_MAX_BLOCK_SIZE rather
+    than the batch MATCH_MAX_BLOCK_SIZE; with the batch cap, tokens the
+    batch matcher would skip as too common get blocked on.
+    """
+    def __init__(self, sites, matcher=None, max_block_size=None):
+        self.matcher = matcher or market_matcher
+        self.max_block_size = max_block_size or Config.STREAM_MAX_BLOCK_SIZE
+        self.sites = set(sites)
+        self.finished = set()
+        self.index = defaultdict(set)
+        self.products = {}
+        self.normalized = {}
+        self.tokens = {}
+        self.site_of = {}
+        self.parent = {}
+        self.members = {}
+        self.group_sites = {}
+        self.scores = {}
+        self.received = 0
+        self.peak_held = 0
+
+    @property
+    def held(self):
+        return len(self.products)
+
+    def _find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def _union(self, a, b, score):
+        ra, rb = self._find(a), self._find(b)
+        if ra == rb:
+            return
+        if self.group_sites[ra] & self.group_sites[rb]:
+            return
+        if len(self.members[ra]) < len(self.members[rb]):
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.members[ra].extend(self.members.pop(rb))
+        self.group_sites[ra] |= self.group_sites.pop(rb)
+        self.scores[ra].extend(self.scores.pop(rb))
+        self.scores[ra].append(score)
+
+    def _stable(self, root):
+        return self.sites - self.group_sites[root] <= self.finished
+
+    def add(self, products):
+        """
+        Matches a batch against the markets held so far and returns the
+        groups it completed (listed on every site still streaming)
+        """
+        columns = MarketColumns(products)
+        max_block_size, threshold = self.max_block_size, self.matcher.threshold
+        touched = set()
+        for product, title, site in zip(products, columns["title"], columns.sites()):
+            norm = normalize_title(title)
+            tokens = set(norm.split())
+            keys = sorted(
+                (t for t in tokens if len(self.index.get(t, ())) < max_block_size),
+                key=lambda t: (len(self.index.get(t, ())), t)
+            )[:self.matcher.blocking_keys]
+            scored, seen = [], set()
+            for key in keys:
+                for j in self.index.get(key, ()):
+                    if j in seen or self.site_of[j] == site:
+                        continue
+                    seen.add(j)
+                    score = MarketMatcher.score_pair(norm, self.normalized[j], tokens, self.tokens[j], threshold)
+                    if score >= threshold:
+                        scored.append((score, j))
+
+            i = self.received
+            self.received += 1
+            self.products[i] = product
+            self.normalized[i] = norm
+            self.tokens[i] = tokens
+            self.site_of[i] = site
+            self.parent[i] = i
+            self.members[i] = [i]
+            self.group_sites[i] = {site}
+            self.scores[i] = []
+            for token in tokens:
+                self.index[token].add(i)
+            for score, j in sorted(scored, key=lambda s: (-s[0], s[1])):
+                self._union(i, j, score)
+            touched.add(i)
+
+        self.peak_held = max(self.peak_held, self.held)
+        roots = {self._find(i) for i in touched}
+        return self._release([root for root in roots if self._stable(root)])
+
+    def finish_site(self, site):
+        """
+        Marks `site` as done streaming and returns the groups that became
+        stable with it
+        """
+        self.finished.add(site)
+        return self._release([root for root in self.members if self._stable(root)])
+
+    def flush(self):
+        """
+        Every group still held, as when all sites are done
+        """
+        self.finished |= self.sites
+        return self._release(list(self.members))
+
+    def _release(self, roots):
+        groups = []
+        for root in roots:
+            indexes = sorted(self.members.pop(root))
+            scores = self.scores.pop(root)
+            del self.group_sites[root]
+            group_products = [self.products.pop(i) for i in indexes]
+            for i in indexes:
+                for token in self.tokens.pop(i):
+                    block = self.index[token]
+                    block.discard(i)
+                    if not block:
+                        del self.index[token]
+                del self.normalized[i], self.site_of[i], self.parent[i]
+            if len(indexes) > 1:
+                confidence = sum(scores) / len(scores)
+            else:
+                confidence = float(group_products[0].get("confidence_score", 0.5))
+            groups.append(MarketMatcher.build_group(group_products, confidence))
+        return groups
+
+
+def llm_adjudicate(pairs):
+    """
+    Asks the LLM which ambiguous pairs describe the same market; returns the
+    indexes of the pairs it confirms
+    """
+    from llm_integration import get_mistral_integration
+
+    lines = [
+        f'{k}. [{product_site(a)}] "{a.get("title")}" <> [{product_site(b)}] "{b.get("title")}"'
+        for k, (a, b, _) in enumerate(pairs)
+    ]
+    prompt = (
+        "For each numbered pair of prediction markets, decide whether both refer to the same "
+        "event and outcome. Be conservative.\n\n" + "\n".join(lines) +
+        '\n\nReply with JSON only: {"same": [pair numbers that match]}'
+    )
+    content = get_mistral_integration().get_completion([{"role": "user", "content": prompt}])
+    match = re.search(r"\{.*\}", content or "", re.S)
+    if not match:
+        return []
+    same = json.loads(match.group(0)).get("same", [])
+    return [int(k) for k in same if str(k).isdigit() and int(k) < len(pairs)]
+
+
+market_matcher = MarketMatcher()
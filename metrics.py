@@ -0,0 +1,256 @@
+"""
+Metrics for CrowdWisdomTrading AI Agent
+Latency histograms and counters for flow steps, tools, crews, LLM calls and fetches, exported as JSON lines and Prometheus text
+"""
+
+import bisect
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from config import Config, logger
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 2048, 4096, 8192, 16384, 32768)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram: counts[i] holds observations in
+    (buckets[i-1], buckets[i]], the last slot everything above (+Inf)
+    """
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def copy(self):
+        clone = Histogram(self.buckets)
+        clone.counts = list(self.counts)
+        clone.count = self.count
+        clone.sum = self.sum
+        return clone
+
+    def minus(self, earlier):
+        delta = self.copy()
+        if earlier is not None:
+            delta.counts = [a - b for a, b in zip(self.counts, earlier.counts)]
+            delta.count -= earlier.count
+            delta.sum -= earlier.sum
+        return delta
+
+    def quantile(self, q):
+        """
+        Upper bound of the bucket holding the q-th observation
+        """
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound if bound != float("inf") else self.buckets[-1]
+        return self.buckets[-1]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "mean": round(self.sum / self.count, 4) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95)
+        }
+
+
+def _series(name, labels):
+    return (name, tuple(sorted((key, str(value)) for key, value in labels.items())))
+
+
+def _label_value(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _series_name(series):
+    name, labels = series
+    if not labels:
+        return name
+    pairs = ",".join('%s="%s"' % (key, _label_value(value)) for key, value in labels)
+    return f"{name}{{{pairs}}}"
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters and histograms keyed by name and labels.
+
+    Everything is cumulative, which is what Prometheus scrapes; a flow run
+    takes a mark() at its start and reports since(mark) as its own share.
+    """
+    def __init__(self, enabled=None):
+        self.enabled = Config.METRICS_ENABLED if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._server = None
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        series = _series(name, labels)
+        with self._lock:
+            self._counters[series] = self._counters.get(series, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        if not self.enabled:
+            return
+        series = _series(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(series)
+            if histogram is None:
+                histogram = self._histograms[series] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        Observes the block's wall time in seconds; a block that raises is
+        also counted in <name without _seconds>_errors_total
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc(f"{name[:-len('_seconds')] if name.endswith('_seconds') else name}_errors_total", **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name, **labels):
+        """
+        Decorator form of timer()
+        """
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def mark(self):
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "histograms": {series: h.copy() for series, h in self._histograms.items()}
+            }
+
+    def since(self, mark=None):
+        """
+        {"counters": {series: value}, "histograms": {series: summary}} for
+        what was recorded after `mark` (everything when mark is None)
+        """
+        mark = mark or {"counters": {}, "histograms": {}}
+        with self._lock:
+            counters = {
+                _series_name(series): round(value - mark["counters"].get(series, 0), 6)
+                for series, value in sorted(self._counters.items())
+                if value != mark["counters"].get(series, 0)
+            }
+            histograms = {}
+            for series, histogram in sorted(self._histograms.items()):
+                delta = histogram.minus(mark["histograms"].get(series))
+                if delta.count:
+                    histograms[_series_name(series)] = delta.summary()
+        return {"counters": counters, "histograms": histograms}
+
+    def prometheus_text(self):
+        """
+        Everything recorded so far in the Prometheus text exposition format
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((series, h.copy()) for series, h in self._histograms.items())
+        lines, typed = [], set()
+        for series, value in counters:
+            if series[0] not in typed:
+                typed.add(series[0])
+                lines.append(f"# TYPE {series[0]} counter")
+            lines.append(f"{_series_name(series)} {value}")
+        for (name, labels), histogram in histograms:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                cumulative += count
+                lines.append(f"{_series_name((f'{name}_bucket', labels + (('le', str(bound)),)))} {cumulative}")
+            lines.append(f"{_series_name((f'{name}_sum', labels))} {histogram.sum}")
+            lines.append(f"{_series_name((f'{name}_count', labels))} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, record, jsonl_path=None, prom_path=None):
+        """
+        Appends `record` (one run's metrics) as a JSON line and rewrites the
+        Prometheus textfile with the cumulative totals
+        """
+        if not self.enabled:
+            return
+        jsonl_path = Path(jsonl_path or Config.METRICS_JSONL_PATH)
+        prom_path = Path(prom_path or Config.METRICS_PROM_PATH)
+        try:
+            jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(jsonl_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"timestamp": datetime.now().isoformat(), **record}, default=str) + "\n")
+            # Written aside and renamed so a textfile collector never reads half a file
+            temp_path = prom_path.with_name(f".{prom_path.name}.tmp")
+            temp_path.write_text(self.prometheus_text(), encoding="utf-8")
+            temp_path.replace(prom_path)
+        except OSError as e:
+            logger.error(f"Metrics export failed: {str(e)}")
+
+    def serve(self, port=None, host="0.0.0.0"):
+        """
+        Serves prometheus_text() on http://host:port/metrics from a daemon thread
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port or Config.METRICS_PORT), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info(f"Serving Prometheus metrics on http://{host}:{self._server.server_address[1]}/metrics")
+        return self._server.server_address[1]
+
+    def stop_serving(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+metrics = MetricsRegistry()
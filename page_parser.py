@@ -0,0 +1,164 @@
+"""
+Generic market page parser for CrowdWisdomTrading AI Agent
+Parses a page's HTML once with lxml and scores candidate market blocks
+"""
+
+import atexit
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from lxml import etree, html as lxml_html
+
+from config import Config, logger
+
+CANDIDATE_TAGS = {"h1", "h2", "h3", "h4", "a", "p", "li", "span", "div", "td", "article", "section"}
+SKIPPED_TAGS = ("script", "style", "noscript", "svg", "template")
+BOILERPLATE_TAGS = {"nav", "footer", "header", "aside", "form"}
+TAG_SCORES = {"h1": 1.5, "h2": 2.0, "h3": 2.0, "h4": 1.5, "a": 1.0, "li": 0.5, "p": 0.5, "td": 0.5}
+MARKET_CLASS_PATTERN = re.compile(r"market|card|event|outcome|contract|question", re.I)
+QUESTION_PATTERN = re.compile(r"\?\s*$|^(will|who|which|what|when|how many)\b", re.I)
+PRICE_PATTERN = re.compile(r"\d+(\.\d+)?\s*(%|¢)|\$\s?\d")
+BOILERPLATE_PATTERN = re.compile(r"cookie|privacy|terms of|sign up|log in|subscribe|all rights reserved", re.I)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _direct_text(element):
+    """
+    Text that belongs to the element itself rather than to its children,
+    so each text run is only scored once
+    """
+    parts = [element.text or ""]
+    parts.extend(child.tail or "" for child in element)
+    return WHITESPACE_PATTERN.sub(" ", "".join(parts)).strip()
+
+
+def _sibling_repetition(card, signature_counts):
+    parent = card.getparent()
+    if parent is None:
+        return 0
+    counts = signature_counts.get(parent)
+    if counts is None:
+        counts = {}
+        for child in parent:
+            if isinstance(child.tag, str):
+                key = (child.tag, child.get("class", ""))
+                counts[key] = counts.get(key, 0) + 1
+        signature_counts[parent] = counts
+    return counts.get((card.tag, card.get("class", "")), 0)
+
+
+def _score(element, text, signature_counts):
+    score = TAG_SCORES.get(element.tag, 0.0)
+    if QUESTION_PATTERN.search(text):
+        score += 1.5
+    if PRICE_PATTERN.search(text):
+        score += 0.5
+    if BOILERPLATE_PATTERN.search(text):
+        score -= 3.0
+
+    # Market listings render as runs of identically-classed cards
+    card = element
+    for _ in range(3):
+        if MARKET_CLASS_PATTERN.search(card.get("class", "") + " " + card.get("data-testid", "")):
+            score += 1.5
+            break
+        parent = card.getparent()
+        if parent is None:
+            break
+        card = parent
+    if _sibling_repetition(card, signature_counts) >= 3:
+        score += 1.0
+    return score
+
+
+def _link_for(element):
+    for node in element.iterancestors():
+        if node.tag == "a" and node.get("href"):
+            return node.get("href")
+    if element.tag == "a" and element.get("href"):
+        return element.get("href")
+    link = element.find(".//a[@href]")
+    return link.get("href") if link is not None else ""
+
+
+def parse_generic_markets(page_html, max_products, base_url=None, min_score=None):
+    """
+    Walks the document once and returns up to `max_products` candidate
+    markets as [{"title", "url", "score"}] in document order, deduplicated
+    by normalized title
+    """
+    min_score = Config.GENERIC_MIN_SCORE if min_score is None else min_score
+    if not page_html:
+        return []
+    root = lxml_html.fromstring(page_html)
+    etree.strip_elements(root, *SKIPPED_TAGS, with_tail=False)
+    if base_url:
+        root.make_links_absolute(base_url, resolve_base_href=True, handle_failures="discard")
+
+    results = []
+    seen = set()
+    signature_counts = {}
+    boilerplate_roots = set()
+    for element in root.iter():
+        if not isinstance(element.tag, str):
+            continue
+        if element.tag in BOILERPLATE_TAGS:
+            boilerplate_roots.add(element)
+            continue
+        if element.tag not in CANDIDATE_TAGS:
+            continue
+        text = _direct_text(element)
+        if not 10 < len(text) < 200:
+            continue
+        if any(ancestor in boilerplate_roots for ancestor in element.iterancestors()):
+            continue
+        key = text.lower()
+        if key in seen:
+            continue
+        score = _score(element, text, signature_counts)
+        if score < min_score:
+            continue
+        seen.add(key)
+        results.append({"title": text, "url": _link_for(element), "score": round(score, 2)})
+        if len(results) >= max_products:
+            break
+    return results
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=Config.PARSER_WORKERS)
+        return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def parse_in_worker(page_html, max_products, base_url=None, timeout=None):
+    """
+    Runs parse_generic_markets in the parser process pool so large pages
+    don't hold the GIL for the scraper threads; falls back to parsing
+    in-process if the pool is unavailable
+    """
+    try:
+        future = _get_executor().submit(parse_generic_markets, page_html, max_products, base_url)
+        return future.result(timeout=timeout or Config.PARSER_TIMEOUT)
+    except BrokenProcessPool as e:
+        logger.warning(f"Parser worker pool failed, parsing in-process: {str(e)}")
+        _reset_executor()
+        return parse_generic_markets(page_html, max_products, base_url)
+
+
+atexit.register(_reset_executor)
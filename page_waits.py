@@ -0,0 +1,86 @@
+"""
+Page readiness waits for CrowdWisdomTrading AI Agent
+Returns as soon as a site's market cards are rendered and the DOM has settled
+"""
+
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from config import Config, logger
+
+# Per-site readiness: the page is usable once any of `selectors` matches at least `min_cards` elements
+SITE_READINESS = {
+    "polymarket": {
+        "selectors": ["[data-testid*='market']", ".market-card", "a[href*='market']"],
+        "min_cards": 1,
+        "timeout": 20
+    },
+    "kalshi": {
+        "selectors": [".market-item", ".event-card", "div[class*='card']"],
+        "min_cards": 1,
+        "timeout": 15
+    }
+}
+DEFAULT_READINESS = {"selectors": [], "min_cards": 0, "timeout": 10}
+
+_SNAPSHOT_JS = """
+const selectors = arguments[0];
+let cards = 0;
+for (const selector of selectors) {
+    cards = document.querySelectorAll(selector).length;
+    if (cards) break;
+}
+return [document.readyState, cards, document.getElementsByTagName('*').length];
+"""
+
+
+class DomSettled:
+    """
+    WebDriverWait condition: enough market cards are present and neither the
+    card count nor the DOM node count has changed for `quiet_period` seconds
+    """
+    def __init__(self, selectors, min_cards=1, quiet_period=None):
+        self.selectors = selectors
+        self.min_cards = min_cards
+        self.quiet_period = Config.PAGE_SETTLE_SECONDS if quiet_period is None else quiet_period
+        self._last_snapshot = None
+        self._stable_since = None
+
+    def __call__(self, driver):
+        ready_state, cards, nodes = driver.execute_script(_SNAPSHOT_JS, self.selectors)
+        now = time.monotonic()
+        if ready_state != "complete" or cards < self.min_cards:
+            self._last_snapshot = None
+            return False
+        snapshot = (cards, nodes)
+        if snapshot != self._last_snapshot:
+            self._last_snapshot = snapshot
+            self._stable_since = now
+            return False
+        return now - self._stable_since >= self.quiet_period
+
+
+def readiness_for(site_name):
+    return SITE_READINESS.get(site_name.lower(), DEFAULT_READINESS)
+
+
+def wait_for_markets(driver, site_name, timeout=None):
+    """
+    Blocks until the site's readiness condition holds or the timeout passes.
+    Returns True when the page settled, False on timeout (the caller still
+    extracts whatever is rendered).
+    """
+    readiness = readiness_for(site_name)
+    timeout = timeout or readiness["timeout"]
+    started = time.perf_counter()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=Config.PAGE_POLL_INTERVAL).until(
+            DomSettled(readiness["selectors"], readiness["min_cards"])
+        )
+        logger.debug(f"{site_name} page ready after {time.perf_counter() - started:.2f}s")
+        return True
+    except TimeoutException:
+        logger.warning(f"{site_name} page did not settle within {timeout}s, extracting what is rendered")
+        return False
@@ -0,0 +1,309 @@
+"""
+Streaming pipeline for CrowdWisdomTrading AI Agent
+Scrapers, matcher and board writer joined by bounded queues, so board rows are written while sites are still scraping
+"""
+
+import math
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from config import Config, logger
+from guardrails import GUARDRAILS
+from matching import IncrementalMatcher
+from pricing import annotate_products
+from arbitrage import scan_groups
+from board_writer import board_row, write_error_board, write_rows
+from fetch_strategy import tiered_fetcher
+from politeness import politeness_gate
+from metrics import metrics
+
+_DONE = object()
+
+
+class PipelineStopped(Exception):
+    pass
+
+
+class StreamingPipeline:
+    """
+    Three stages, each on its own thread(s):
+
+    - scrapers: one worker per site (up to COLLECTION_CONCURRENCY) fetches
+      and validates the site, normalizes prices and puts its markets on the
+      batch queue STREAM_BATCH_SIZE at a time, while a browser harvest is
+      still scrolling;
+    - matcher: matches each batch against the open groups and puts the
+      groups that became stable on the group queue;
+    - board writer: scans those groups for arbitrage and writes their rows.
+
+    Both queues hold at most STREAM_QUEUE_SIZE items, so a slow stage makes
+    the ones before it wait instead of piling markets up in memory. Rows
+    stream into a temp file that replaces the board when the run ends.
+    Sites still streaming after SITE_TIMEOUT per round of scrapers are
+    given up on, as in the flow.
+    """
+    def __init__(self, sites=None, batch_size=None, queue_size=None, output_path=None):
+        self.sites = sites or Config.TARGET_SITES
+        self.batch_size = batch_size or Config.STREAM_BATCH_SIZE
+        self.queue_size = queue_size or Config.STREAM_QUEUE_SIZE
+        self.output_path = output_path or Config.CSV_OUTPUT_PATH
+        self.workers = max(1, min(Config.COLLECTION_CONCURRENCY, len(self.sites)))
+        self._stop = threading.Event()
+        self._started = None
+        self._first_row = None
+        self.site_results = {}
+        self.errors = []
+        self.scans = []
+
+    def _put(self, stage_queue, item, stage):
+        """
+        Blocking put that gives up once the run is stopped, so a dead or
+        finished consumer never leaves its producers waiting on a full queue
+        """
+        started = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                stage_queue.put(item, timeout=0.2)
+                metrics.observe("crowdwisdom_stream_backpressure_seconds", time.perf_counter() - started, stage=stage)
+                return
+            except queue.Full:
+                continue
+        raise PipelineStopped(f"{stage} stage stopped")
+
+    def _get(self, stage_queue, stage, deadline=None):
+        started = time.perf_counter()
+        while not self._stop.is_set():
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"No {stage} input before the deadline")
+            try:
+                item = stage_queue.get(timeout=0.2)
+                metrics.observe("crowdwisdom_stream_queue_wait_seconds", time.perf_counter() - started, stage=stage)
+                return item
+            except queue.Empty:
+                continue
+        raise PipelineStopped(f"{stage} stage stopped")
+
+    def _scrape(self, site_config, batches):
+        """
+        Scraper stage for one site. A browser harvest hands its markets over
+        step by step, so they flow on while the page is still scrolling; the
+        api and http tiers return a whole page, which is batched once fetched.
+        """
+        site_name = site_config["name"]
+        url = f"{site_config['base_url']}{site_config['markets_endpoint']}"
+        count = 0
+        pending = []
+
+        def send(products):
+            nonlocal count
+            for product in products:
+                product["source_site"] = site_name
+            annotate_products(products)
+            self._put(batches, (site_name, products), "scrape")
+            count += len(products)
+
+        def stream(products):
+            # Runs between harvest steps; returning False stops the harvest
+            valid, result_data = GUARDRAILS["validate_scraped_data"]({"site": site_name, "products": products})
+            if valid:
+                pending.extend(result_data["products"])
+            try:
+                while len(pending) >= self.batch_size:
+                    send(pending[:self.batch_size])
+                    del pending[:self.batch_size]
+            except PipelineStopped:
+                return False
+            return not self._stop.is_set()
+
+        try:
+            with metrics.timer("crowdwisdom_site_scrape_seconds", site=site_name):
+                payload = tiered_fetcher.fetch(site_name, url, Config.MAX_PRODUCTS_PER_SITE, on_batch=stream)
+            if self._stop.is_set():
+                raise PipelineStopped(f"{site_name} scraper stopped")
+            if count or pending:
+                products = pending
+            else:
+                valid, result_data = GUARDRAILS["validate_scraped_data"](payload)
+                if not valid:
+                    raise ValueError(result_data.get("error"))
+                products = result_data["products"]
+            for start in range(0, len(products), self.batch_size):
+                send(products[start:start + self.batch_size])
+            self.site_results[site_name] = {"success": True, "products_count": count, "tier": payload.get("tier")}
+        except PipelineStopped:
+            return
+        except Exception as e:
+            logger.error(f"Error scraping {site_name}: {str(e)}")
+            metrics.inc("crowdwisdom_site_scrape_failures_total", site=site_name)
+            self.site_results[site_name] = {"success": False, "products_count": count, "error": str(e)}
+            self.errors.append({"site": site_name, "error": str(e), "phase": "data_collection"})
+        finally:
+            metrics.inc("crowdwisdom_site_markets_total", count, site=site_name)
+        try:
+            self._put(batches, (site_name, _DONE), "scrape")
+        except PipelineStopped:
+            pass
+
+    def _submit(self, executor, site_config, batches, timers):
+        """
+        Hands a site to a scraper worker once its host is free under the
+        politeness spacing, so the worker never sleeps through it
+        """
+        if self._stop.is_set():
+            return
+        url = f"{site_config['base_url']}{site_config['markets_endpoint']}"
+        delay = politeness_gate.claim(tiered_fetcher.first_url(site_config["name"], url, Config.MAX_PRODUCTS_PER_SITE))
+        if delay <= 0:
+            executor.submit(self._scrape, site_config, batches)
+            return
+        timer = threading.Timer(delay, self._submit, (executor, site_config, batches, timers))
+        timer.daemon = True
+        timer.start()
+        timers.append(timer)
+
+    def _match(self, batches, groups):
+        """
+        Matcher stage: runs until every site has sent its done marker or
+        the collection deadline passes
+        """
+        matcher = IncrementalMatcher([site["name"] for site in self.sites])
+        pending = set(matcher.sites)
+        deadline = time.monotonic() + Config.SITE_TIMEOUT * math.ceil(len(self.sites) / self.workers)
+        while pending:
+            try:
+                site_name, batch = self._get(batches, "match", deadline)
+            except TimeoutError:
+                for site_name in sorted(pending):
+                    error = f"Still streaming after {Config.SITE_TIMEOUT}s per scraper round"
+                    logger.error(f"Error scraping {site_name}: {error}")
+                    self.errors.append({"site": site_name, "error": error, "phase": "data_collection"})
+                break
+            if batch is _DONE:
+                pending.discard(site_name)
+                stable = matcher.finish_site(site_name)
+            else:
+                with metrics.timer("crowdwisdom_stream_match_seconds"):
+                    stable = matcher.add(batch)
+            if stable:
+                self._put(groups, stable, "match")
+        stable = matcher.flush()
+        if stable:
+            self._put(groups, stable, "match")
+        self._put(groups, _DONE, "match")
+        return matcher
+
+    def _rows(self, groups):
+        """
+        Board rows for each stable group as it arrives from the matcher
+        """
+        last_updated = datetime.now().isoformat()
+        while True:
+            stable = self._get(groups, "board")
+            if stable is _DONE:
+                return
+            self.scans.append(scan_groups(stable))
+            for group in stable:
+                if self._first_row is None:
+                    self._first_row = time.perf_counter() - self._started
+                    metrics.observe("crowdwisdom_stream_first_row_seconds", self._first_row)
+                    logger.info(f"First board row after {self._first_row:.2f}s")
+                yield board_row(group, last_updated)
+
+    def _write(self, groups, result):
+        try:
+            result["rows"] = write_rows(self._rows(groups), self.output_path)
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            result["error"] = e
+            self._stop.set()
+
+    def run(self):
+        """
+        Runs the pipeline to completion and returns its summary
+        """
+        self._started = time.perf_counter()
+        batches = queue.Queue(maxsize=self.queue_size)
+        groups = queue.Queue(maxsize=self.queue_size)
+        written = {}
+        writer = threading.Thread(target=self._write, args=(groups, written), name="stream-board", daemon=True)
+        writer.start()
+        logger.info(f"Streaming {len(self.sites)} sites with up to {self.workers} scrapers, batches of {self.batch_size}")
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="stream-scraper")
+        timers = []
+        matcher = None
+        try:
+            for site_config in self.sites:
+                self._submit(executor, site_config, batches, timers)
+            matcher = self._match(batches, groups)
+            writer.join()
+        except PipelineStopped:
+            pass
+        finally:
+            # Also releases scrapers of sites given up on, still waiting to put a batch
+            self._stop.set()
+            for timer in timers:
+                timer.cancel()
+            writer.join()
+            executor.shutdown(wait=False, cancel_futures=True)
+        if "error" in written:
+            raise written["error"]
+
+        if matcher.received == 0:
+            write_error_board(self.output_path)
+            success = False
+        else:
+            success = True
+        summary = self._summary(matcher, written.get("rows", 0), success)
+        logger.info(f"Streaming run finished: {summary}")
+        return summary
+
+    def _summary(self, matcher, rows_written, success):
+        opportunities = sorted(
+            (o for scan in self.scans for o in scan["opportunities"]),
+            key=lambda o: -o["arbitrage_margin"]
+        )[:Config.ARBITRAGE_TOP_K]
+        cross_site = sum(scan["summary"].get("cross_site_groups", 0) for scan in self.scans)
+        profitable = sum(scan["summary"].get("profitable_opportunities", 0) for scan in self.scans)
+        return {
+            "success": success,
+            "total_sites_scraped": len(self.sites),
+            "successful_scrapes": sum(1 for r in self.site_results.values() if r["success"]),
+            "total_products_collected": matcher.received,
+            "csv_file_path": str(self.output_path),
+            "csv_rows_generated": rows_written,
+            "cross_site_groups": cross_site,
+            "profitable_opportunities": profitable,
+            "top_arbitrage_opportunities": opportunities,
+            "peak_open_markets": matcher.peak_held,
+            "time_to_first_row_seconds": round(self._first_row, 3) if self._first_row is not None else None,
+            "wall_seconds": round(time.perf_counter() - self._started, 3),
+            "sites": self.site_results,
+            "errors": self.errors
+        }
+
+
+def run_streaming_pipeline(sites=None):
+    """
+    One streaming run; exports its metrics like a flow run. Snapshots,
+    price history and checkpoints are only kept by the flow.
+    """
+    mark = metrics.mark()
+    pipeline = StreamingPipeline(sites)
+    try:
+        summary = pipeline.run()
+    except Exception as e:
+        logger.error(f"Streaming run failed: {str(e)}")
+        summary = {"success": False, "errors": pipeline.errors + [{"phase": "streaming", "error": str(e)}]}
+    summary["metrics"] = metrics.since(mark)
+    metrics.export({
+        "flow_id": f"stream-{uuid.uuid4()}",
+        "success": summary["success"],
+        "products_collected": summary.get("total_products_collected", 0),
+        "metrics": summary["metrics"]
+    })
+    return summary
@@ -0,0 +1,80 @@
+"""
+Per-host request spacing for CrowdWisdomTrading AI Agent
+Keeps scrapers polite without putting fixed sleeps on every page load
+"""
+
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from config import Config
+
+
+class PolitenessGate:
+    """
+    Spaces requests to the same host by `min_delay` plus random jitter.
+
+    Each call reserves the host's next free slot, so the first request to a
+    host goes straight through and only back-to-back hits on one host wait.
+
+    Schedulers claim() a host's slot before handing a site to a worker and
+    hold the site back while the host is busy; the worker's wait() then uses
+    the claimed slot and goes straight through. A claim lapses when its slot
+    ends, so a site that fails or times out before its wait() leaves nothing
+    behind. wait() only sleeps when nothing scheduled around the slot: a tier
+    escalation to the same host within one fetch, the further pages of an
+    API read, or an agent's tool call.
+
+    Callers pass through the gate before acquiring a browser or connection
+    so a delayed request does not hold a pooled resource.
+    """
+    def __init__(self, min_delay=None, jitter=None):
+        self.min_delay = Config.POLITENESS_MIN_DELAY if min_delay is None else min_delay
+        self.jitter = Config.POLITENESS_JITTER if jitter is None else jitter
+        self._next_slot = {}
+        self._claimed = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host(url):
+        return urlparse(url).netloc or url
+
+    def claim(self, url):
+        """
+        For schedulers: books the host's slot and returns 0 if it is free now,
+        else returns the seconds until it is, booking nothing. A booked slot
+        goes to the next reserve()/wait() on that host until the slot ends.
+        """
+        host = self._host(url)
+        with self._lock:
+            now = time.monotonic()
+            free_at = self._next_slot.get(host, 0.0)
+            if free_at > now:
+                return free_at - now
+            self._next_slot[host] = now + self.min_delay + random.uniform(0, self.jitter)
+            # Claims only start on a free host, so there is at most one live claim per host
+            self._claimed[host] = self._next_slot[host]
+            return 0.0
+
+    def reserve(self, url):
+        """
+        Books the host's next slot and returns how many seconds away it is
+        """
+        host = self._host(url)
+        with self._lock:
+            now = time.monotonic()
+            if self._claimed.pop(host, 0.0) > now:
+                return 0.0
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_delay + random.uniform(0, self.jitter)
+        return slot - now
+
+    def wait(self, url):
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+politeness_gate = PolitenessGate()
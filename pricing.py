@@ -0,0 +1,148 @@
+"""
+Price normalization for CrowdWisdomTrading AI Agent
+Turns scraped price strings into implied YES/NO probabilities in one batched pass
+"""
+
+import numpy as np
+import pandas as pd
+
+from records import MarketColumns
+
+_NUM = r"(\d{1,3}(?:\.\d+)?)"
+_UNIT = r"\s*(¢|%|c\b)?"
+
+# Each pattern is applied once per distinct string; earlier patterns win. Card text
+# spans several lines, so the Yes/No pairs may cross lines and a decimal quote may
+# sit on any line of its own.
+_YES_NO = rf"(?s)\byes\b\D{{0,6}}?{_NUM}{_UNIT}.*?\bno\b\D{{0,6}}?{_NUM}{_UNIT}"
+_NO_YES = rf"(?s)\bno\b\D{{0,6}}?{_NUM}{_UNIT}.*?\byes\b\D{{0,6}}?{_NUM}{_UNIT}"
+_NO_ONLY = rf"^\W*no\b\D{{0,6}}?{_NUM}{_UNIT}"
+_CENTS = r"(?:(\d{1,3}(?:\.\d+)?)\s?(?:¢|c\b)|¢\s?(\d{1,3}(?:\.\d+)?))"
+_PERCENT = r"(\d{1,3}(?:\.\d+)?)\s?%"
+_DOLLARS = r"\$\s?(0?\.\d+)(?![\d.])"
+_AMERICAN = r"(?<![\w.$])([+-]\d{3,5})(?![\d.%¢])"
+_DECIMAL = r"(?m)^[ \t]*@?[ \t]*(\d{1,3}\.\d{1,3})[ \t]*x?[ \t]*$"
+
+
+def _fraction(values, units):
+    """
+    Quote numbers to 0-1: "%" and "¢" are out of 100, a bare number above 1
+    is read as cents
+    """
+    values = values.astype(float)
+    scaled = np.where(units.notna() | (values > 1), values / 100, values)
+    return np.where((scaled >= 0) & (scaled <= 1), scaled, np.nan)
+
+
+def _american(odds):
+    odds = odds.astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(odds > 0, 100 / (odds + 100), -odds / (-odds + 100))
+
+
+def _normalize_unique(texts):
+    """
+    (yes, no) float arrays for an array of distinct, lower-cased strings.
+    Each format only runs its regex on rows no earlier format parsed and
+    that contain its marker (a plain substring test), so most strings see
+    one or two cheap scans.
+    """
+    s = pd.Series(texts, dtype=object)
+    yes = np.full(len(s), np.nan)
+    no = np.full(len(s), np.nan)
+
+    def candidates(*markers):
+        rows = np.isnan(yes)
+        if markers:
+            present = np.zeros(len(s), dtype=bool)
+            for marker in markers:
+                present |= s.str.contains(marker, regex=False).to_numpy()
+            rows &= present
+        return np.flatnonzero(rows)
+
+    def extract(rows, pattern):
+        return s.iloc[rows].str.extract(pattern)
+
+    def fill(rows, found, yes_values, no_values):
+        rows, yes_values, no_values = rows[found], yes_values[found], no_values[found]
+        yes[rows] = yes_values
+        no[rows] = no_values
+
+    has_yes_no = candidates("yes")
+    has_yes_no = has_yes_no[s.iloc[has_yes_no].str.contains("no", regex=False).to_numpy()]
+    for pattern, yes_first in ((_YES_NO, True), (_NO_YES, False)):
+        rows = has_yes_no[np.isnan(yes[has_yes_no])]
+        pair = extract(rows, pattern)
+        first = _fraction(pair[0], pair[1])
+        second = _fraction(pair[2], pair[3])
+        found = pair[0].notna().to_numpy()
+        fill(rows, found, first if yes_first else second, second if yes_first else first)
+
+    rows = candidates("no")
+    only_no = extract(rows, _NO_ONLY)
+    value = _fraction(only_no[0], only_no[1])
+    fill(rows, only_no[0].notna().to_numpy(), 1 - value, value)
+
+    rows = candidates("¢", "c")
+    cents = extract(rows, _CENTS)
+    cents_value = pd.Series(np.where(cents[0].notna(), cents[0], cents[1]), index=cents.index)
+    value = _fraction(cents_value, pd.Series("¢", index=cents.index))
+    fill(rows, cents_value.notna().to_numpy(), value, 1 - value)
+
+    rows = candidates("%")
+    percent = extract(rows, _PERCENT)[0]
+    value = _fraction(percent, pd.Series("%", index=percent.index))
+    fill(rows, percent.notna().to_numpy(), value, 1 - value)
+
+    rows = candidates("$")
+    dollars = extract(rows, _DOLLARS)[0]
+    value = _fraction(dollars, pd.Series(None, index=dollars.index, dtype=object))
+    fill(rows, dollars.notna().to_numpy(), value, 1 - value)
+
+    rows = candidates("+", "-")
+    american = extract(rows, _AMERICAN)[0]
+    value = _american(american)
+    fill(rows, american.notna().to_numpy(), value, 1 - value)
+
+    rows = candidates(".")
+    decimal = extract(rows, _DECIMAL)[0].astype(float)
+    # A bare 0.xx is already a probability; 1.01 and up are decimal odds
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.where(decimal < 1, decimal, np.where(decimal > 1, 1 / decimal, np.nan))
+    fill(rows, decimal.notna().to_numpy(), value, 1 - value)
+
+    return yes, no
+
+
+def normalize_prices(prices):
+    """
+    Implied (yes, no) probabilities for a sequence of price strings, as two
+    float arrays with NaN where nothing parseable was found.
+
+    Strings are factorized first, so each distinct price is parsed once
+    however many products share it, and each format is one vectorized
+    str.extract over the distinct strings rather than a regex call per row.
+    Handles "62¢", "¢62", "62%", "$0.62", "Yes 62¢ / No 39¢", "No 39¢",
+    American odds ("+150", "-200") and decimal odds ("2.50"), also inside
+    multi-line card text ("Over 2.5 goals\\n1.85").
+    """
+    codes, uniques = pd.factorize(pd.Series(prices, dtype=object).fillna("").astype(str).str.lower())
+    yes_unique, no_unique = _normalize_unique(np.asarray(uniques, dtype=object))
+    yes_unique = np.round(yes_unique, 4)
+    no_unique = np.round(no_unique, 4)
+    return yes_unique[codes], no_unique[codes]
+
+
+def annotate_products(products):
+    """
+    Sets yes_price / no_price (floats, or None when unparseable) on every
+    product in one normalize_prices pass over the price column; returns
+    how many parsed
+    """
+    if not products:
+        return 0
+    columns = MarketColumns(products)
+    yes, no = normalize_prices(columns["price"])
+    columns.set_column("yes_price", [None if v != v else v for v in yes.tolist()])
+    columns.set_column("no_price", [None if v != v else v for v in no.tolist()])
+    return int(np.count_nonzero(~np.isnan(yes)))
@@ -0,0 +1,197 @@
+"""
+Market records for CrowdWisdomTrading AI Agent
+Compact slotted market records with interned site/category values, and a columnar view for batch stages
+"""
+
+import gc
+import sys
+from collections.abc import MutableMapping
+from copy import deepcopy
+
+FIELDS = (
+    "title", "price", "category", "volume", "url", "site", "confidence_score",
+    "source_site", "yes_price", "no_price"
+)
+_FIELD_SET = frozenset(FIELDS)
+# Values drawn from a small vocabulary: one shared string per distinct value
+_INTERNED = frozenset({"price", "category", "site", "source_site"})
+_UNSET = object()
+_ATOMIC = frozenset({str, int, float, bool, type(None)})
+
+
+class MarketRecord(MutableMapping):
+    """
+    One scraped market, with a slot per known field instead of a dict per
+    market. It reads and writes like the product dicts it replaces (get,
+    [], in, setdefault, dict(record), **record); a field that was never set
+    is missing, as a dict key would be, and keys without a slot go to a
+    small overflow dict. Site, category and price strings are interned so
+    every market quoting the same value shares one copy.
+    """
+    __slots__ = FIELDS + ("_extra",)
+
+    def __init__(self, title=_UNSET, price=_UNSET, category=_UNSET, volume=_UNSET, url=_UNSET, site=_UNSET,
+                 confidence_score=_UNSET, source_site=_UNSET, yes_price=_UNSET, no_price=_UNSET, **extra):
+        # Spelled out per field: this runs once per market, and a loop over _FIELD_SET is twice as slow
+        if title is not _UNSET:
+            self.title = title
+        if price is not _UNSET:
+            self.price = sys.intern(price) if type(price) is str else price
+        if category is not _UNSET:
+            self.category = sys.intern(category) if type(category) is str else category
+        if volume is not _UNSET:
+            self.volume = volume
+        if url is not _UNSET:
+            self.url = url
+        if site is not _UNSET:
+            self.site = sys.intern(site) if type(site) is str else site
+        if confidence_score is not _UNSET:
+            self.confidence_score = confidence_score
+        if source_site is not _UNSET:
+            self.source_site = sys.intern(source_site) if type(source_site) is str else source_site
+        if yes_price is not _UNSET:
+            self.yes_price = yes_price
+        if no_price is not _UNSET:
+            self.no_price = no_price
+        self._extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            setattr(self, key, sys.intern(value) if key in _INTERNED and type(value) is str else value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in _FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        for field in FIELDS:
+            if hasattr(self, field):
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        return default if self._extra is None else self._extra.get(key, default)
+
+    def copy(self):
+        return MarketRecord.from_dict(self)
+
+    def __deepcopy__(self, memo):
+        # Flow state is deep-copied for every step event; strings and numbers are shared, not copied
+        record = MarketRecord.__new__(MarketRecord)
+        for field in FIELDS:
+            value = getattr(self, field, _UNSET)
+            if value is not _UNSET:
+                setattr(record, field, value if type(value) in _ATOMIC else deepcopy(value, memo))
+        record._extra = deepcopy(self._extra, memo) if self._extra else None
+        memo[id(self)] = record
+        return record
+
+    def to_dict(self):
+        return dict(self)
+
+    def __repr__(self):
+        return f"MarketRecord({self.to_dict()!r})"
+
+
+def record_products(products):
+    """
+    MarketRecords for a list of product dicts (records pass through).
+
+    Records, unlike dicts of plain values, are tracked by the cyclic GC, and
+    allocating a few hundred thousand of them in a row sets off collections
+    that rescan every record built so far; none of them can be in a cycle
+    yet, so collection is paused while they are built.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return [p if type(p) is MarketRecord else MarketRecord.from_dict(p) for p in products]
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class MarketColumns:
+    """
+    Column-at-a-time view over a list of markets for batch stages: each
+    field is gathered into one list the first time it is asked for, and
+    set_column writes a computed column back to every market. Works on
+    MarketRecords (read straight from their slots) and on plain dicts.
+    """
+    def __init__(self, records):
+        self.records = records
+        self._records_only = all(type(r) is MarketRecord for r in records)
+        self._columns = {}
+        self._sites = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def column(self, field, default=None):
+        key = (field, default)
+        values = self._columns.get(key)
+        if values is None:
+            if self._records_only and field in _FIELD_SET:
+                values = [getattr(r, field, default) for r in self.records]
+            else:
+                values = [r.get(field, default) for r in self.records]
+            self._columns[key] = values
+        return values
+
+    __getitem__ = column
+
+    def sites(self):
+        """
+        Each market's site: source_site, else site, else "unknown"
+        """
+        if self._sites is None:
+            self._sites = [a or b or "unknown" for a, b in zip(self.column("source_site"), self.column("site"))]
+        return self._sites
+
+    def set_column(self, field, values):
+        if self._records_only and field in _FIELD_SET and field not in _INTERNED:
+            for record, value in zip(self.records, values):
+                setattr(record, field, value)
+        else:
+            for record, value in zip(self.records, values):
+                record[field] = value
+        for key in [k for k in self._columns if k[0] == field]:
+            del self._columns[key]
+        if field in ("site", "source_site"):
+            self._sites = None
@@ -2,12 +2,11 @@
 """
 CrowdWisdomTrading AI Agent - Main Execution Script
 """
+import argparse
 import sys
 import os
 from pathlib import Path
-from config import Config, logger, setup_logging
-from main_flow import run_crowdwisdom_flow
-from llm_integration import mistral_integration
+from config import Config, logger, bootstrap, startup_seconds
 
 def print_banner():
     print("CrowdWisdomTrading AI Agent\n")
@@ -19,6 +18,65 @@ def check_prerequisites():
         return False
     return True
 
+def warm_up():
+    """
+    Pays the one-off setup costs before the run: Mistral connection check,
+    agent construction and browser launch
+    """
+    from llm_integration import warm_up as warm_up_llm
+    from agents import get_crowd_wisdom_agents
+    from driver_pool import driver_pool
+    started = startup_seconds()
+    warm_up_llm()
+    get_crowd_wisdom_agents()
+    driver_pool.warm(1)
+    logger.info(f"Warm-up finished in {startup_seconds() - started:.2f}s")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="CrowdWisdomTrading AI Agent")
+    parser.add_argument("--warmup", action="store_true",
+                        help="Check the LLM connection, build agents and launch a browser before the run")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep running and refresh each site on its own interval (Ctrl+C to stop)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream markets from the scrapers through the matcher to the board as they arrive")
+    parser.add_argument("--resume", metavar="FLOW_ID",
+                        help="Continue a failed run from its last completed phase")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Start a new run even if a recent failed run could be resumed")
+    parser.add_argument("--list-checkpoints", action="store_true",
+                        help="Show saved run checkpoints with their age and size, then exit")
+    return parser.parse_args()
+
+def list_checkpoints():
+    from checkpoints import checkpoint_store, format_age, format_size, input_hash
+    checkpoints = checkpoint_store.all()
+    if not checkpoints:
+        print(f"No checkpoints in {checkpoint_store.root}")
+        return
+    current = input_hash()
+    print(f"Checkpoints in {checkpoint_store.root} (current inputs {current}):\n")
+    for checkpoint in checkpoints:
+        status = "completed" if checkpoint.completed else f"resumable after {checkpoint.last_phase}"
+        if checkpoint.input_hash != current:
+            status += ", different inputs"
+        print(f"{checkpoint.flow_id}  {status}")
+        for phase in checkpoint.phases:
+            print(f"    {phase:<18}{format_age(checkpoint.age(phase)):>8} old{format_size(checkpoint.size(phase)):>12}")
+
+def find_resume(flow_id):
+    from checkpoints import checkpoint_store, input_hash
+    checkpoint = checkpoint_store.find(flow_id)
+    if checkpoint is None:
+        print(f"No checkpoint for flow {flow_id}; see --list-checkpoints")
+        sys.exit(1)
+    if checkpoint.completed:
+        print(f"Flow {flow_id} already completed; nothing to resume")
+        sys.exit(0)
+    if checkpoint.input_hash != input_hash():
+        logger.warning(f"Settings changed since flow {flow_id} was checkpointed; resuming it as it was")
+    return checkpoint
+
 def display_results(final_state):
     print("\nExecution Results")
     if final_state.flow_success:
@@ -29,12 +87,47 @@ def display_results(final_state):
         for error in final_state.errors_encountered:
             print(f"- {error.get('phase', 'Unknown')}: {error.get('error', 'Unknown error')}")
 
+def display_stream_results(summary):
+    print("\nStreaming Results")
+    if summary["success"]:
+        print("✅ STATUS: SUCCESS")
+        print(f"- Markets: {summary['total_products_collected']} from {summary['successful_scrapes']}/{summary['total_sites_scraped']} sites")
+        print(f"- Board rows: {summary['csv_rows_generated']} ({summary['cross_site_groups']} cross-site)")
+        print(f"- First row after {summary['time_to_first_row_seconds']}s, done after {summary['wall_seconds']}s")
+        print(f"\nFiles:\n- CSV: {summary['csv_file_path']}\n- Log: {Config.OUTPUT_DIR / 'crowdwisdom_trading.log'}")
+    else:
+        print("⚠️ STATUS: ISSUES ENCOUNTERED")
+    for error in summary["errors"]:
+        print(f"- {error.get('site', error.get('phase', 'Unknown'))}: {error.get('error', 'Unknown error')}")
+
 def main():
+    args = parse_args()
     print_banner()
-    setup_logging()
+    if args.list_checkpoints:
+        list_checkpoints()
+        sys.exit(0)
     if not check_prerequisites():
         sys.exit(1)
-    final_state = run_crowdwisdom_flow()
+    resume = find_resume(args.resume) if args.resume else None
+    bootstrap()
+    if args.stream:
+        # No flow in streaming mode, so crewai is never imported
+        from pipeline import run_streaming_pipeline
+        summary = run_streaming_pipeline()
+        display_stream_results(summary)
+        sys.exit(0 if summary["success"] else 1)
+    from main_flow import run_crowdwisdom_flow
+    logger.info(f"Modules loaded {startup_seconds():.2f}s after start")
+    if args.warmup:
+        warm_up()
+    if args.daemon:
+        from daemon import RefreshDaemon
+        daemon = RefreshDaemon()
+        daemon.run()
+        sys.exit(0)
+    if args.fresh:
+        Config.CHECKPOINT_AUTO_RESUME = False
+    final_state = run_crowdwisdom_flow(resume=resume)
     display_results(final_state)
     sys.exit(0 if final_state.flow_success else 1)
 
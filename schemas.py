@@ -0,0 +1,93 @@
+"""
+Payload schemas for CrowdWisdomTrading AI Agent
+Compiled pydantic validators for scraper and matcher output, parsed once and checked as a batch
+"""
+
+from collections import Counter
+from functools import lru_cache
+from typing import Annotated, Any, Optional
+
+import pydantic_core
+from pydantic import ConfigDict, StringConstraints, TypeAdapter, ValidationError, with_config
+from typing_extensions import NotRequired, TypedDict
+
+from records import record_products
+
+PRODUCT_DEFAULTS = (("price", "Unknown"), ("category", "General"), ("confidence_score", 0.5))
+
+
+@with_config(ConfigDict(extra="allow", coerce_numbers_to_str=True))
+class MarketProduct(TypedDict):
+    """
+    One scraped market. Unknown keys (volume, url, tier data...) are kept;
+    numeric titles and prices are read as strings. A null price, category
+    or confidence score is accepted and given its default.
+    """
+    title: Annotated[str, StringConstraints(min_length=1)]
+    price: NotRequired[Optional[str]]
+    category: NotRequired[Optional[str]]
+    site: NotRequired[str]
+    confidence_score: NotRequired[Optional[float]]
+
+
+@with_config(ConfigDict(extra="allow"))
+class MatchGroup(TypedDict):
+    """
+    One matched group; its products were validated when they were scraped
+    """
+    unified_title: str
+    products: list[Any]
+    match_confidence: NotRequired[float]
+    sites: NotRequired[list[str]]
+
+
+# Built once at import; each validate_python call runs in pydantic-core
+PRODUCTS = TypeAdapter(list[MarketProduct])
+MATCH_GROUPS = TypeAdapter(list[MatchGroup])
+
+
+@lru_cache(maxsize=32)
+def parse_json(raw):
+    """
+    Decodes agent or tool output with pydantic-core's JSON parser. Cached,
+    so a guardrail and the flow reading the same output parse it once;
+    callers must treat the result as read-only.
+    """
+    return pydantic_core.from_json(raw)
+
+
+def validate_batch(adapter, items):
+    """
+    Validates a whole list in one call. Items that fail are dropped rather
+    than failing the batch; returns (valid items, Counter of rejections per
+    field, number of items rejected).
+    """
+    try:
+        return adapter.validate_python(items), Counter(), 0
+    except ValidationError as e:
+        rejections = Counter()
+        rejected = set()
+        for error in e.errors(include_url=False, include_context=False, include_input=False):
+            loc = error["loc"]
+            rejected.add(loc[0])
+            rejections[str(loc[1]) if len(loc) > 1 else "<item>"] += 1
+        kept = [item for i, item in enumerate(items) if i not in rejected]
+        return adapter.validate_python(kept), rejections, len(rejected)
+
+
+def validate_products(products, site=None):
+    """
+    MarketProduct-validated copies of `products` as MarketRecords, with
+    defaults filled in for missing or null fields (site falls back to the
+    payload's site). Nulls are mapped here rather than in a per-field
+    validator, which would call back into Python for every product.
+    """
+    valid, rejections, rejected = validate_batch(PRODUCTS, products)
+    site = str(site or "unknown")
+    for product in valid:
+        for field, default in PRODUCT_DEFAULTS:
+            if product.get(field) is None:
+                product[field] = default
+        if "site" not in product:
+            product["site"] = site
+    return record_products(valid), rejections, rejected
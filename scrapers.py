@@ -0,0 +1,368 @@
+"""
+Scraping backends for CrowdWisdomTrading AI Agent
+Plain classes with no CrewAI dependency, wrapped by the agent tools in tools.py
+"""
+
+import json
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup
+
+from config import logger, startup_seconds
+from http_session import http_pool
+from page_parser import parse_in_worker
+from politeness import politeness_gate
+
+_first_scrape_lock = threading.Lock()
+_first_scrape_logged = False
+
+
+def note_first_scrape():
+    """
+    Logs how long the process took to reach its first scrape
+    """
+    global _first_scrape_logged
+    with _first_scrape_lock:
+        if _first_scrape_logged:
+            return
+        _first_scrape_logged = True
+    logger.info(f"First scrape started {startup_seconds():.3f}s after startup")
+
+
+class BrowserMarketScraper:
+    """
+    Scrapes JavaScript-rendered market pages with a pooled Chrome session
+    """
+    def scrape(self, url, site_name, max_products=50, on_batch=None):
+        """
+        `on_batch`, if given, receives the products of each harvest step
+        while the page is still being scrolled (see harvest_cards)
+        """
+        # Selenium is only loaded once a fetch reaches the browser tier
+        from driver_pool import driver_pool
+        from page_waits import wait_for_markets
+        try:
+            logger.info(f"Starting scraping for {site_name} at {url}")
+            note_first_scrape()
+
+            politeness_gate.wait(url)
+            with driver_pool.session() as driver:
+                driver.get(url)
+                wait_for_markets(driver, site_name)
+                products = []
+                if site_name.lower() == "polymarket":
+                    products = self._scrape_polymarket(driver, max_products, on_batch)
+                elif site_name.lower() == "kalshi":
+                    products = self._scrape_kalshi(driver, max_products, on_batch)
+                else:
+                    products = self._scrape_generic(driver, max_products)
+                logger.info(f"Successfully scraped {len(products)} products from {site_name}")
+                logger.debug(f"Driver pool stats: {driver_pool.stats()}")
+                return json.dumps({
+                    "site": site_name,
+                    "url": url,
+                    "products_count": len(products),
+                    "products": products,
+                    "timestamp": time.time()
+                }, indent=2)
+        except Exception as e:
+            logger.error(f"Error scraping {site_name}: {str(e)}")
+            return json.dumps({
+                "site": site_name,
+                "url": url,
+                "error": str(e),
+                "products": [],
+                "products_count": 0
+            })
+
+    @staticmethod
+    def _harvest(driver, site_name, max_products, to_product, products, on_batch):
+        """
+        Harvests a site's cards into `products`, handing each step's
+        products to `on_batch` as they are built
+        """
+        from extractors import harvest_cards
+
+        def add(cards):
+            batch = [to_product(len(products) + k, card) for k, card in enumerate(cards)]
+            products.extend(batch)
+            return on_batch(batch) if on_batch is not None else True
+
+        harvest_cards(driver, site_name, max_products, on_batch=add)
+
+    def _scrape_polymarket(self, driver, max_products, on_batch=None):
+        products = []
+
+        def to_product(i, card):
+            title = card.get("title")
+            price_text = card.get("price")
+            return {
+                "title": title or f"Market {i+1}",
+                "price": price_text,
+                "category": card.get("category"),
+                "volume": card.get("volume", ""),
+                "url": card.get("url", ""),
+                "site": "polymarket",
+                "confidence_score": 0.8 if title and price_text else 0.5
+            }
+        try:
+            self._harvest(driver, "polymarket", max_products, to_product, products, on_batch)
+        except Exception as e:
+            logger.error(f"Error scraping Polymarket: {str(e)}")
+        return products
+
+    def _scrape_kalshi(self, driver, max_products, on_batch=None):
+        products = []
+
+        def to_product(i, card):
+            title = card.get("title")
+            return {
+                "title": title or f"Kalshi Market {i+1}",
+                "price": card.get("price"),
+                "category": card.get("category"),
+                "volume": card.get("volume", ""),
+                "url": card.get("url", ""),
+                "site": "kalshi",
+                "confidence_score": 0.7 if title else 0.4
+            }
+        try:
+            self._harvest(driver, "kalshi", max_products, to_product, products, on_batch)
+        except Exception as e:
+            logger.error(f"Error scraping Kalshi: {str(e)}")
+        return products
+
+    def _scrape_generic(self, driver, max_products):
+        products = []
+        try:
+            candidates = parse_in_worker(driver.page_source, max_products, base_url=driver.current_url)
+            for candidate in candidates:
+                product = {
+                    "title": candidate["title"],
+                    "price": "Unknown",
+                    "category": "General",
+                    "volume": "",
+                    "url": candidate["url"],
+                    "site": "generic",
+                    "confidence_score": 0.3
+                }
+                products.append(product)
+        except Exception as e:
+            logger.error(f"Error in generic scraping: {str(e)}")
+        return products
+
+
+class HttpMarketScraper:
+    """
+    Scrapes static market pages with requests and BeautifulSoup
+    """
+    def scrape(self, url, site_name, max_products=50):
+        try:
+            note_first_scrape()
+            politeness_gate.wait(url)
+            parser = f"headings:{site_name}:{max_products}"
+            response = http_pool.get(url, parser=parser)
+            if response.parsed is not None:
+                products = response.parsed
+            else:
+                products = self._parse_headings(response.content, url, site_name, max_products)
+                http_pool.remember_parsed(url, parser, products)
+            logger.info(f"Fallback scraping found {len(products)} products from {site_name}")
+            return json.dumps({
+                "site": site_name,
+                "url": url,
+                "products_count": len(products),
+                "products": products,
+                "method": "fallback_requests",
+                "not_modified": response.not_modified,
+                "timestamp": time.time()
+            }, indent=2)
+        except Exception as e:
+            logger.error(f"Fallback scraping failed for {site_name}: {str(e)}")
+            return json.dumps({
+                "site": site_name,
+                "url": url,
+                "error": str(e),
+                "products": [],
+                "products_count": 0,
+                "method": "fallback_requests"
+            })
+
+    def _parse_headings(self, content, url, site_name, max_products):
+        soup = BeautifulSoup(content, 'html.parser')
+        products = []
+        headings = soup.find_all(['h1', 'h2', 'h3', 'h4'])
+        for i, heading in enumerate(headings[:max_products]):
+            title = heading.get_text(strip=True)
+            if len(title) > 5:
+                product = {
+                    "title": title,
+                    "price": "Unknown",
+                    "category": "Market",
+                    "volume": "",
+                    "url": url,
+                    "site": site_name,
+                    "confidence_score": 0.4
+                }
+                products.append(product)
+        return products
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _polymarket_api_products(payload):
+    products = []
+    for market in payload if isinstance(payload, list) else payload.get("data", []):
+        prices = market.get("outcomePrices")
+        if isinstance(prices, str):
+            try:
+                prices = json.loads(prices)
+            except ValueError:
+                prices = None
+        yes = _float(prices[0]) if prices else None
+        slug = market.get("slug") or ""
+        products.append({
+            "title": market.get("question") or "",
+            "price": f"{yes * 100:.0f}%" if yes is not None else "Unknown",
+            "category": market.get("category") or "General",
+            "volume": f"${_float(market.get('volume')) or 0:,.0f} Vol.",
+            "url": f"https://polymarket.com/market/{slug}" if slug else "",
+            "site": "polymarket",
+            "confidence_score": 0.9 if yes is not None else 0.6
+        })
+    return products
+
+
+def _kalshi_api_products(payload):
+    products = []
+    for market in payload.get("markets", []):
+        yes = market.get("yes_ask") or market.get("last_price")
+        event = market.get("event_ticker") or ""
+        products.append({
+            "title": market.get("title") or "",
+            "price": f"{yes}¢" if yes else "Unknown",
+            "category": market.get("category") or "General",
+            "volume": f"{market.get('volume', 0):,} contracts" if market.get("volume") is not None else "",
+            "url": f"https://kalshi.com/markets/{event.lower()}" if event else "",
+            "site": "kalshi",
+            "confidence_score": 0.9 if yes else 0.6
+        })
+    return products
+
+
+API_PARSERS = {
+    "polymarket": _polymarket_api_products,
+    "kalshi": _kalshi_api_products
+}
+
+# Markets asked for per API request; further pages are read until the
+# site's target (MAX_PRODUCTS_PER_SITE) is reached
+API_PAGE_SIZE = 500
+
+
+def _with_query(url, **params):
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query.update({key: str(value) for key, value in params.items()})
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _polymarket_next_page(url, payload):
+    """
+    The gamma API pages by offset; a short page is the last one
+    """
+    query = dict(parse_qsl(urlsplit(url).query))
+    markets = payload if isinstance(payload, list) else payload.get("data", [])
+    if not markets or len(markets) < int(query.get("limit", 0)):
+        return None
+    return _with_query(url, offset=int(query.get("offset", 0)) + len(markets))
+
+
+def _kalshi_next_page(url, payload):
+    """
+    Kalshi hands back a cursor for the next page, empty on the last one
+    """
+    cursor = payload.get("cursor")
+    if not cursor or not payload.get("markets"):
+        return None
+    return _with_query(url, cursor=cursor)
+
+
+API_PAGERS = {
+    "polymarket": _polymarket_next_page,
+    "kalshi": _kalshi_next_page
+}
+
+
+class ApiMarketScraper:
+    """
+    Reads markets from a site's public JSON API (TARGET_SITES api_endpoint),
+    a page of up to API_PAGE_SIZE at a time until `max_products` are in
+    """
+    def supports(self, site_name):
+        return site_name.lower() in API_PARSERS
+
+    def _page(self, url, site):
+        """
+        One page of markets and the URL of the next (None on the last);
+        both are kept with the page's validators so a 304 skips the parse
+        """
+        politeness_gate.wait(url)
+        parser = f"api:{site}:page"
+        response = http_pool.get(url, headers={"Accept": "application/json"}, parser=parser)
+        if response.parsed is None:
+            payload = json.loads(response.content)
+            page = {
+                "products": [p for p in API_PARSERS[site](payload) if p["title"]],
+                "next": API_PAGERS[site](url, payload)
+            }
+            http_pool.remember_parsed(url, parser, page)
+            return page, response.not_modified
+        return response.parsed, response.not_modified
+
+    def scrape(self, url, site_name, max_products=50):
+        try:
+            note_first_scrape()
+            site = site_name.lower()
+            products, pages, not_modified = [], 0, True
+            page_url, seen = _with_query(url, limit=min(max_products, API_PAGE_SIZE)), set()
+            while page_url and page_url not in seen and len(products) < max_products:
+                seen.add(page_url)
+                page, page_not_modified = self._page(page_url, site)
+                products.extend(page["products"])
+                not_modified = not_modified and page_not_modified
+                pages += 1
+                page_url = page["next"]
+            products = products[:max_products]
+            logger.info(f"API scraping found {len(products)} products from {site_name} in {pages} page(s)")
+            return json.dumps({
+                "site": site_name,
+                "url": url,
+                "products_count": len(products),
+                "products": products,
+                "method": "api",
+                "pages": pages,
+                "not_modified": not_modified,
+                "timestamp": time.time()
+            }, indent=2)
+        except Exception as e:
+            logger.error(f"API scraping failed for {site_name}: {str(e)}")
+            return json.dumps({
+                "site": site_name,
+                "url": url,
+                "error": str(e),
+                "products": [],
+                "products_count": 0,
+                "method": "api"
+            })
+
+
+browser_scraper = BrowserMarketScraper()
+http_scraper = HttpMarketScraper()
+api_scraper = ApiMarketScraper()
@@ -0,0 +1,229 @@
+"""
+Market snapshot store for CrowdWisdomTrading AI Agent
+Remembers every market seen on the last run so the next run only reprocesses what changed
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from config import Config, logger
+from matching import normalize_title, product_site
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS markets (
+    site TEXT NOT NULL,
+    market_key TEXT NOT NULL,
+    title TEXT NOT NULL,
+    price TEXT,
+    volume TEXT,
+    url TEXT,
+    fingerprint TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (site, market_key)
+);
+CREATE TABLE IF NOT EXISTS match_groups (
+    members TEXT NOT NULL,
+    confidence REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS board (
+    fingerprint TEXT NOT NULL
+);
+"""
+
+
+def _text(value):
+    return "" if value is None else str(value)
+
+
+def board_fingerprint(path):
+    """
+    Path, mtime and size of the board file, or None when there is none.
+    Any other writer of the file (the error board, a --stream run) changes it.
+    """
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return f"{path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def market_keys(products):
+    """
+    Stable (site, key) per product: the site's market id when there is one,
+    else the market URL if it is unique within the site's listing, else the
+    normalized title. Repeats within a listing get an ordinal suffix.
+    """
+    url_counts = {}
+    for product in products:
+        url = _text(product.get("url")).strip()
+        if url:
+            site_url = (product_site(product), url)
+            url_counts[site_url] = url_counts.get(site_url, 0) + 1
+
+    keys, seen = [], {}
+    for product in products:
+        site = product_site(product)
+        url = _text(product.get("url")).strip()
+        market_id = product.get("market_id") or product.get("id")
+        if market_id:
+            key = f"id:{market_id}"
+        elif url and url_counts[(site, url)] == 1:
+            parts = urlsplit(url)
+            key = f"url:{parts.netloc.lower()}{parts.path.rstrip('/')}"
+        else:
+            key = f"title:{normalize_title(product.get('title'))}"
+        seen[(site, key)] = seen.get((site, key), 0) + 1
+        if seen[(site, key)] > 1:
+            key = f"{key}#{seen[(site, key)]}"
+        keys.append((site, key))
+    return keys
+
+
+class MarketDelta:
+    """
+    What changed since the last committed run. `retitled` holds markets
+    whose key is stable (id or URL) but whose title moved; together with
+    `new` they are the markets whose matches may have changed.
+    """
+    def __init__(self, keys, new, changed, retitled, removed, previous_count):
+        self.keys = keys
+        self.new = new
+        self.changed = changed
+        self.retitled = retitled
+        self.removed = removed
+        self.previous_count = previous_count
+
+    @property
+    def unchanged_count(self):
+        return len(self.keys) - len(self.new) - len(self.changed)
+
+    @property
+    def is_empty(self):
+        return self.previous_count > 0 and not (self.new or self.changed or self.removed)
+
+    def summary(self):
+        return {
+            "markets": len(self.keys),
+            "new": len(self.new),
+            "changed": len(self.changed),
+            "retitled": len(self.retitled),
+            "removed": len(self.removed),
+            "unchanged": self.unchanged_count
+        }
+
+
+class SnapshotStore:
+    """
+    Last seen title/price/volume per (site, market key), the match groups
+    of the last run and the fingerprint of the board it wrote, in SQLite
+    next to the board
+    """
+    def __init__(self, path=None):
+        self.path = Path(path or Config.SNAPSHOT_PATH)
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def fingerprint(product):
+        return "\x1f".join(_text(product.get(field)) for field in ("title", "price", "volume"))
+
+    def diff(self, products):
+        """
+        Compares `products` with the stored snapshot. Markets of sites that
+        returned nothing this run are not reported as removed.
+        """
+        keys = market_keys(products)
+        sites = sorted({site for site, _ in keys})
+        previous = {}
+        for site, key, title, fingerprint in self._connection().execute(
+            "SELECT site, market_key, title, fingerprint FROM markets"
+        ):
+            previous[(site, key)] = (title, fingerprint)
+
+        new, changed, retitled = set(), set(), set()
+        for product, market in zip(products, keys):
+            old = previous.get(market)
+            if old is None:
+                new.add(market)
+            elif old[1] != self.fingerprint(product):
+                changed.add(market)
+                if old[0] != _text(product.get("title")):
+                    retitled.add(market)
+        current = set(keys)
+        removed = {m for m in previous if m[0] in sites and m not in current}
+        delta = MarketDelta(keys, new, changed, retitled, removed, len(previous))
+        logger.info(f"Snapshot delta: {delta.summary()}")
+        return delta
+
+    def load_groups(self):
+        """
+        Match groups of the last run as (set of (site, key), confidence)
+        """
+        groups = []
+        for members, confidence in self._connection().execute("SELECT members, confidence FROM match_groups"):
+            groups.append(({tuple(m) for m in json.loads(members)}, confidence))
+        return groups
+
+    def board_current(self, path):
+        """
+        True when the file at `path` is still the board the last committed
+        run wrote
+        """
+        row = self._connection().execute("SELECT fingerprint FROM board").fetchone()
+        return row is not None and row[0] == board_fingerprint(path)
+
+    def commit(self, products, delta, groups, board=None):
+        """
+        Records this run's markets and match groups (lists of (site, key)
+        with a confidence) as the new snapshot, in one transaction, along
+        with the fingerprint of the board written from them
+        """
+        now = time.time()
+        conn = self._connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO markets(site, market_key, title, price, volume, url, fingerprint, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(site, market_key) DO UPDATE SET title = excluded.title, price = excluded.price, "
+                "volume = excluded.volume, url = excluded.url, fingerprint = excluded.fingerprint, "
+                "last_seen = excluded.last_seen",
+                [
+                    (site, key, _text(p.get("title")), _text(p.get("price")), _text(p.get("volume")),
+                     _text(p.get("url")), self.fingerprint(p), now, now)
+                    for p, (site, key) in zip(products, delta.keys)
+                ]
+            )
+            conn.executemany("DELETE FROM markets WHERE site = ? AND market_key = ?", list(delta.removed))
+            conn.execute("DELETE FROM match_groups")
+            conn.executemany(
+                "INSERT INTO match_groups(members, confidence) VALUES (?, ?)",
+                [(json.dumps(sorted(members)), confidence) for members, confidence in groups]
+            )
+            conn.execute("DELETE FROM board")
+            if board is not None:
+                conn.execute("INSERT INTO board(fingerprint) VALUES (?)", (board,))
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.warning(f"Snapshot commit failed: {str(e)}")
+
+
+snapshot_store = SnapshotStore()
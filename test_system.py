@@ -4,19 +4,21 @@ Test Script for CrowdWisdomTrading AI Agent
 Tests basic functionality and configuration
 """
 import sys
-from config import Config, logger
-from llm_integration import mistral_integration
+from config import Config, bootstrap
+from llm_integration import get_mistral_integration
 from tools import SCRAPING_TOOLS
-from agents import crowd_wisdom_agents
+from agents import get_crowd_wisdom_agents
 from guardrails import GUARDRAILS
 from main_flow import CrowdWisdomTradingFlow
 
 def main():
     print("System Test")
+    bootstrap()
     assert Config.MISTRAL_API_KEY, "Missing Mistral API key"
     assert Config.OUTPUT_DIR.exists(), "Missing output directory"
     assert SCRAPING_TOOLS, "No scraping tools found"
-    assert crowd_wisdom_agents.data_collector_agent(), "Data collector missing"
+    assert get_mistral_integration(), "Mistral integration missing"
+    assert get_crowd_wisdom_agents().data_collector_agent(), "Data collector missing"
     assert GUARDRAILS['validate_scraped_data'], "Guardrails missing"
     assert CrowdWisdomTradingFlow(), "Flow creation failed"
     print("All tests passed.")
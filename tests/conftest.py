@@ -0,0 +1,62 @@
+"""
+Shared pytest setup for CrowdWisdomTrading AI Agent
+Puts the project modules on the import path; tests run without bootstrap(), so nothing is logged to files
+"""
+
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("CREWAI_TELEMETRY_ENABLED", "false")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+SITES = [
+    {"name": "polymarket", "base_url": "https://polymarket.example", "markets_endpoint": "/markets"},
+    {"name": "kalshi", "base_url": "https://kalshi.example", "markets_endpoint": "/markets"}
+]
+
+
+@pytest.fixture
+def offline_flow(tmp_path, monkeypatch):
+    """
+    main_flow set up to run offline under tmp_path: direct collection from
+    `listings` ({site: [titles]}, editable between runs), local matching,
+    no LLM, history or metrics. `fetches` records every site fetched.
+    """
+    import main_flow
+    from checkpoints import checkpoint_store
+    from config import Config
+    from snapshot_store import SnapshotStore
+
+    monkeypatch.setattr(Config, "TARGET_SITES", SITES)
+    monkeypatch.setattr(Config, "CSV_OUTPUT_PATH", tmp_path / "unified_products.csv")
+    monkeypatch.setattr(Config, "CHECKPOINT_DIR", tmp_path / "checkpoints")
+    monkeypatch.setattr(checkpoint_store, "root", tmp_path / "checkpoints")
+    monkeypatch.setattr(main_flow, "snapshot_store", SnapshotStore(tmp_path / "snapshots.sqlite"))
+    monkeypatch.setattr(Config, "COLLECTION_MODE", "direct")
+    monkeypatch.setattr(Config, "MATCHING_MODE", "local")
+    monkeypatch.setattr(Config, "MISTRAL_API_KEY", "")
+    for setting in ("CHECKPOINTS_ENABLED", "INCREMENTAL_RUNS", "HISTORY_ENABLED", "BOARD_NARRATIVE"):
+        monkeypatch.setattr(Config, setting, False)
+    monkeypatch.setattr(main_flow.metrics, "enabled", False)
+    monkeypatch.setattr(main_flow.politeness_gate, "min_delay", 0)
+    monkeypatch.setattr(main_flow.politeness_gate, "jitter", 0)
+
+    stub = SimpleNamespace(flow=main_flow, fetches=[], listings={
+        "polymarket": ["Will Donald Trump win the 2024 presidential election?", "Will the Fed cut rates in March 2025?"],
+        "kalshi": ["Trump wins 2024 Presidential Election", "Fed rate cut in March 2025?"]
+    })
+
+    def fetch(site_name, url, max_products=50):
+        stub.fetches.append(site_name)
+        products = [
+            {"title": title, "price": "50%", "url": f"{url}/{k}"} for k, title in enumerate(stub.listings[site_name])
+        ]
+        return {"site": site_name, "url": url, "tier": "api", "products": products, "products_count": len(products)}
+
+    monkeypatch.setattr(main_flow.tiered_fetcher, "fetch", fetch)
+    return stub
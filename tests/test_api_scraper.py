@@ -0,0 +1,79 @@
+"""
+Tests for paging the API tier with a stub HTTP pool
+"""
+
+import json
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+
+import scrapers
+from http_session import FetchResult
+from scrapers import api_scraper
+
+POLYMARKET = [{"question": f"Will team {k} win the cup?", "outcomePrices": '["0.40", "0.60"]'} for k in range(120)]
+KALSHI = [{"title": f"Will team {k} win the cup?", "yes_ask": 40} for k in range(120)]
+
+
+class StubPool:
+    """
+    Answers gamma by ?offset= and Kalshi by ?cursor= from the lists above
+    """
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url, headers=None, parser=None):
+        self.urls.append(url)
+        query = dict(parse_qsl(urlsplit(url).query))
+        limit = int(query["limit"])
+        if "kalshi" in url:
+            start = int(query.get("cursor", 0))
+            cursor = str(start + limit) if start + limit < len(KALSHI) else ""
+            payload = {"markets": KALSHI[start:start + limit], "cursor": cursor}
+        else:
+            start = int(query.get("offset", 0))
+            payload = POLYMARKET[start:start + limit]
+        return FetchResult(url, 200, json.dumps(payload).encode(), {})
+
+    def remember_parsed(self, url, parser, parsed):
+        pass
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = StubPool()
+    monkeypatch.setattr(scrapers, "http_pool", pool)
+    monkeypatch.setattr(scrapers, "API_PAGE_SIZE", 50)
+    monkeypatch.setattr(scrapers.politeness_gate, "min_delay", 0)
+    monkeypatch.setattr(scrapers.politeness_gate, "jitter", 0)
+    return pool
+
+
+def scrape(site_name, url, max_products):
+    return json.loads(api_scraper.scrape(url, site_name, max_products=max_products))
+
+
+def test_gamma_is_paged_by_offset_up_to_the_target(pool):
+    result = scrape("polymarket", "https://gamma.example/markets?active=true&limit=100", 110)
+    assert result["products_count"] == 110
+    assert result["pages"] == 3
+    assert [dict(parse_qsl(urlsplit(url).query)).get("offset") for url in pool.urls] == [None, "50", "100"]
+    assert result["products"][-1]["title"] == "Will team 109 win the cup?"
+
+
+def test_gamma_stops_on_a_short_page(pool):
+    result = scrape("polymarket", "https://gamma.example/markets?limit=50", 500)
+    assert result["products_count"] == 120
+    assert len(pool.urls) == 3
+
+
+def test_kalshi_follows_the_cursor_until_it_runs_out(pool):
+    result = scrape("kalshi", "https://kalshi.example/markets?status=open&limit=50", 500)
+    assert result["products_count"] == 120
+    assert [dict(parse_qsl(urlsplit(url).query)).get("cursor") for url in pool.urls] == [None, "50", "100"]
+
+
+def test_a_small_target_takes_one_page(pool):
+    result = scrape("kalshi", "https://kalshi.example/markets?limit=5", 5)
+    assert result["products_count"] == 5
+    assert len(pool.urls) == 1
@@ -0,0 +1,69 @@
+"""
+Tests for the spread and arbitrage scanner
+"""
+
+import pytest
+
+from arbitrage import scan_groups
+from config import Config
+
+
+def group(title, **quotes):
+    return {
+        "unified_title": title,
+        "products": [
+            {"source_site": site, "yes_price": yes, "no_price": no}
+            for site, (yes, no) in quotes.items()
+        ]
+    }
+
+
+@pytest.fixture(autouse=True)
+def fees(monkeypatch):
+    monkeypatch.setattr(Config, "VENUE_FEES", {"polymarket": 0.0, "kalshi": 0.02, "default": 0.02})
+
+
+@pytest.fixture
+def groups():
+    return [
+        # YES on polymarket 0.40 + NO on kalshi 0.45 * 1.02 = 0.859
+        group("wide", polymarket=(0.40, 0.60), kalshi=(0.55, 0.45)),
+        # YES on kalshi 0.58 * 1.02 + NO on polymarket 0.42 = 1.0116
+        group("overround", polymarket=(0.60, 0.42), kalshi=(0.58, 0.44)),
+        # YES on polymarket 0.45 + NO on kalshi 0.50 * 1.02 = 0.96
+        group("narrow", polymarket=(0.45, 0.55), kalshi=(0.50, 0.50)),
+        group("one site", polymarket=(0.30, 0.70))
+    ]
+
+
+def test_fee_adjusted_margins(groups):
+    result = scan_groups(groups, top_k=10)
+    wide, overround, narrow, single = groups
+    assert wide["arbitrage_margin"] == pytest.approx(0.141)
+    assert wide["spread"] == pytest.approx(0.15)
+    assert overround["arbitrage_margin"] == pytest.approx(-0.0116)
+    assert overround["spread"] == pytest.approx(0.02)
+    assert narrow["arbitrage_margin"] == pytest.approx(0.04)
+    assert "arbitrage_margin" not in single and "spread" not in single
+
+    best = result["opportunities"][0]
+    assert (best["buy_yes"], best["yes_price"], best["buy_no"], best["no_price"]) == ("polymarket", 0.40, "kalshi", 0.45)
+    worst = result["opportunities"][-1]
+    assert (worst["unified_title"], worst["buy_yes"], worst["buy_no"]) == ("overround", "kalshi", "polymarket")
+    assert result["summary"]["cross_site_groups"] == 3
+    assert result["summary"]["profitable_opportunities"] == 2
+
+
+def test_opportunities_are_the_top_k_by_margin(groups):
+    titles = [o["unified_title"] for o in scan_groups(groups, top_k=10)["opportunities"]]
+    assert titles == ["wide", "narrow", "overround"]
+    titles = [o["unified_title"] for o in scan_groups(groups, top_k=2)["opportunities"]]
+    assert titles == ["wide", "narrow"]
+    assert scan_groups(groups, top_k=0)["opportunities"] == []
+
+
+def test_unquoted_groups():
+    groups = [{"unified_title": "no quotes", "products": [{"source_site": "kalshi", "yes_price": None}]}]
+    result = scan_groups(groups)
+    assert result["opportunities"] == []
+    assert result["summary"] == {"groups": 1, "quoted_groups": 0}
@@ -0,0 +1,55 @@
+"""
+Tests for flow checkpoints and resuming a failed run
+"""
+
+import pytest
+
+from checkpoints import checkpoint_store, input_hash
+from config import Config
+
+
+@pytest.fixture
+def stub(offline_flow, monkeypatch):
+    monkeypatch.setattr(Config, "CHECKPOINTS_ENABLED", True)
+    monkeypatch.setattr(Config, "CHECKPOINT_AUTO_RESUME", True)
+    return offline_flow
+
+
+def kill_after_matching(stub, monkeypatch):
+    def crash(groups, top_k=None):
+        raise KeyboardInterrupt("killed")
+    monkeypatch.setattr(stub.flow, "scan_groups", crash)
+
+
+def test_run_killed_after_matching_resumes_without_scraping(stub, monkeypatch):
+    with monkeypatch.context() as patch:
+        kill_after_matching(stub, patch)
+        with pytest.raises(KeyboardInterrupt):
+            stub.flow.run_crowdwisdom_flow()
+    assert sorted(stub.fetches) == ["kalshi", "polymarket"]
+    killed = checkpoint_store.latest_resumable()
+    assert killed is not None and killed.phases == ["scraped_data", "matched_products"]
+
+    state = stub.flow.run_crowdwisdom_flow()
+    assert sorted(stub.fetches) == ["kalshi", "polymarket"]
+    assert state.flow_success and str(state.id) == killed.flow_id
+    assert state.unique_products_count == 2
+    assert Config.CSV_OUTPUT_PATH.exists()
+    assert checkpoint_store.find(killed.flow_id).completed
+    assert checkpoint_store.latest_resumable() is None
+
+
+def test_changed_inputs_block_the_resume(stub, monkeypatch):
+    with monkeypatch.context() as patch:
+        kill_after_matching(stub, patch)
+        with pytest.raises(KeyboardInterrupt):
+            stub.flow.run_crowdwisdom_flow()
+    killed = checkpoint_store.latest_resumable()
+    assert killed is not None
+
+    monkeypatch.setattr(Config, "MATCH_THRESHOLD", Config.MATCH_THRESHOLD + 0.05)
+    assert input_hash() != killed.input_hash
+    assert checkpoint_store.latest_resumable() is None
+    state = stub.flow.run_crowdwisdom_flow()
+    assert state.flow_success and str(state.id) != killed.flow_id
+    assert sorted(stub.fetches) == ["kalshi", "kalshi", "polymarket", "polymarket"]
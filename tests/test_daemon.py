@@ -0,0 +1,48 @@
+"""
+Tests for the refresh daemon's per-site slot bookkeeping
+"""
+
+import pytest
+
+from config import logger
+from daemon import SiteSchedule
+
+SITE = {"name": "kalshi", "base_url": "https://kalshi.example", "markets_endpoint": "/markets", "refresh_interval": 10}
+
+
+@pytest.fixture
+def messages():
+    lines = []
+    sink = logger.add(lambda message: lines.append(message.record["message"]), level="INFO")
+    yield lines
+    logger.remove(sink)
+
+
+def test_on_time_slot_skips_nothing(messages):
+    schedule = SiteSchedule(SITE, start_at=100)
+    schedule.advance(100)
+    assert (schedule.next_due, schedule.skipped) == (110, 0)
+    assert messages == []
+
+
+def test_slot_due_while_running_is_skipped(messages):
+    schedule = SiteSchedule(SITE, start_at=100)
+    schedule.advance(101, busy=True)
+    assert (schedule.next_due, schedule.skipped) == (110, 1)
+    assert messages == ["kalshi: skipped 1 refresh slot(s) while a refresh was running"]
+
+
+def test_slots_passed_under_a_politeness_hold_name_the_hold(messages):
+    schedule = SiteSchedule(SITE, start_at=100)
+    schedule.held = True
+    schedule.advance(125)
+    assert (schedule.next_due, schedule.skipped) == (130, 2)
+    assert messages == ["kalshi: skipped 2 refresh slot(s) while politeness spacing held it back"]
+    assert not schedule.held
+
+
+def test_slots_passed_on_a_late_tick_name_the_tick(messages):
+    schedule = SiteSchedule(SITE, start_at=100)
+    schedule.advance(112)
+    assert (schedule.next_due, schedule.skipped) == (120, 1)
+    assert messages == ["kalshi: skipped 1 refresh slot(s) because the scheduler ticked late"]
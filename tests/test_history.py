@@ -0,0 +1,72 @@
+"""
+Tests for the Parquet market history and its spread queries
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from history_store import HistoryStore, group_key
+
+DAY_ONE = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+DAY_TWO = datetime(2025, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+
+def cycle(trump_poly, trump_kalshi, fed_poly):
+    """
+    One cycle's match groups: Trump listed on both sites, the Fed market on
+    Polymarket only. Returns (matched_products, keys_by_product).
+    """
+    poly = {"title": "Will Trump win?", "price": f"{trump_poly:.0%}", "yes_price": trump_poly, "source_site": "polymarket"}
+    kalshi = {"title": "Trump wins", "price": f"{trump_kalshi:.0%}", "yes_price": trump_kalshi, "source_site": "kalshi"}
+    fed = {"title": "Fed cut in March?", "price": f"{fed_poly:.0%}", "yes_price": fed_poly, "source_site": "polymarket"}
+    groups = [
+        {"unified_title": "Will Trump win?", "products": [poly, kalshi]},
+        {"unified_title": "Fed cut in March?", "products": [fed]}
+    ]
+    keys = {id(poly): ("polymarket", "trump"), id(kalshi): ("kalshi", "trump"), id(fed): ("polymarket", "fed")}
+    return groups, keys
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(tmp_path / "history")
+    assert store.append(*cycle(0.62, 0.55, 0.30), run_id="one", ts=DAY_ONE) == 3
+    assert store.append(*cycle(0.60, 0.58, 0.35), run_id="two", ts=DAY_TWO) == 3
+    return store
+
+
+def test_append_writes_one_part_per_site_and_date(store):
+    parts = sorted(str(path.relative_to(store.root).parent) for path in store.root.rglob("*.parquet"))
+    assert parts == [
+        "site=kalshi/date=2025-03-01", "site=kalshi/date=2025-03-02",
+        "site=polymarket/date=2025-03-01", "site=polymarket/date=2025-03-02"
+    ]
+    assert not list(store.root.rglob(".*"))
+
+
+def test_price_series_reads_one_market_in_order(store):
+    series = store.price_series(market_key="trump", site="polymarket")
+    assert list(series["probability"]) == [0.62, 0.60]
+    assert list(series["title"]) == ["Will Trump win?"] * 2
+    assert set(series["site"]) == {"polymarket"}
+
+
+def test_price_series_honours_the_date_range(store):
+    series = store.price_series(market_key="fed", start=DAY_TWO)
+    assert list(series["probability"]) == [0.35]
+
+
+def test_spread_history_keeps_cross_site_groups(store):
+    spreads = store.spread_history()
+    trump = group_key([("polymarket", "trump"), ("kalshi", "trump")])
+    assert list(spreads["group_key"]) == [trump, trump]
+    assert list(spreads["sites"]) == [2, 2]
+    assert list(spreads["spread"]) == pytest.approx([0.07, 0.02])
+
+
+def test_spread_history_can_include_single_site_groups(store):
+    spreads = store.spread_history(end=DAY_ONE, min_sites=1)
+    assert sorted(zip(spreads["unified_title"], spreads["spread"])) == [
+        ("Fed cut in March?", 0.0), ("Will Trump win?", pytest.approx(0.07))
+    ]
@@ -0,0 +1,108 @@
+"""
+Tests for the pooled HTTP client against a local server
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_session import HttpSessionPool, ValidatorCache
+
+ETAG = '"v1"'
+BODY = b'{"markets": []}'
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    /page revalidates against ETAG; /stuck answers 304 to everything
+    """
+    def do_GET(self):
+        self.server.seen.append(dict(self.headers))
+        if self.path == "/stuck" or self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.seen = []
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = HttpSessionPool(max_hosts=4, cache=ValidatorCache(tmp_path / "http.sqlite", max_entries=10, enabled=True))
+    yield pool
+    pool.close()
+
+
+def url(server, path="/page"):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def test_304_hit_returns_the_cached_body_and_parse(server, pool):
+    first = pool.get(url(server), parser="api")
+    pool.remember_parsed(url(server), "api", {"products": [1]})
+    second = pool.get(url(server), parser="api")
+    assert (first.status_code, first.not_modified) == (200, False)
+    assert server.seen[1]["If-None-Match"] == ETAG
+    assert (second.status_code, second.not_modified, second.content) == (304, True, BODY)
+    assert second.parsed == {"products": [1]}
+    assert pool.get(url(server), parser="other").parsed is None
+
+
+def test_304_miss_is_fetched_again_unconditionally(server, pool):
+    result = pool.get(url(server), headers={"If-None-Match": ETAG})
+    assert (result.status_code, result.content, result.not_modified) == (200, BODY, False)
+    assert "If-None-Match" not in server.seen[1]
+    assert pool.stats()["requests"] == 2
+
+
+def test_304_miss_that_stays_304_raises(server, pool):
+    with pytest.raises(requests.HTTPError):
+        pool.get(url(server, "/stuck"))
+
+
+def test_cache_drops_the_least_recently_used_page(tmp_path):
+    cache = ValidatorCache(tmp_path / "http.sqlite", max_entries=2, enabled=True)
+    cache.store("a", ETAG, None, b"a")
+    time.sleep(0.01)
+    cache.store("b", ETAG, None, b"b")
+    time.sleep(0.01)
+    cache.touch("a")
+    time.sleep(0.01)
+    cache.store("c", ETAG, None, b"c")
+    assert [cache.get(key) is not None for key in ("a", "b", "c")] == [True, False, True]
+
+
+def test_evicted_session_is_closed_once_its_request_returns(pool, monkeypatch):
+    pool.max_hosts = 1
+    closed = []
+    with pool._lease("http://one.example/markets") as one:
+        monkeypatch.setattr(one, "close", lambda: closed.append("one"))
+        with pool._lease("http://two.example/markets") as two:
+            monkeypatch.setattr(two, "close", lambda: closed.append("two"))
+            assert pool.stats()["open_sessions"] == 1
+            assert closed == []
+        assert closed == []
+    assert closed == ["one"]
+    with pool._lease("http://three.example/markets"):
+        pass
+    assert closed == ["one", "two"]
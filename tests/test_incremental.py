@@ -0,0 +1,136 @@
+"""
+Tests for incremental runs: snapshot deltas, reused match groups and the kept board
+"""
+
+import pytest
+
+from config import Config
+from matching import MarketMatcher
+
+
+@pytest.fixture
+def stub(offline_flow, monkeypatch):
+    monkeypatch.setattr(Config, "INCREMENTAL_RUNS", True)
+    return offline_flow
+
+
+def board_text():
+    return Config.CSV_OUTPUT_PATH.read_text(encoding="utf-8")
+
+
+def test_unchanged_run_keeps_its_own_board(stub, monkeypatch):
+    first = stub.flow.run_crowdwisdom_flow()
+    written = board_text()
+    writes = []
+    monkeypatch.setattr(stub.flow, "write_board", lambda *args: writes.append(args))
+
+    second = stub.flow.run_crowdwisdom_flow()
+    assert first.flow_success and second.flow_success
+    assert second.market_changes["unchanged"] == 4
+    assert writes == []
+    assert board_text() == written
+
+
+def test_board_overwritten_by_the_error_board_is_rewritten(stub):
+    listings = dict(stub.listings)
+    assert stub.flow.run_crowdwisdom_flow().flow_success
+    good = board_text()
+
+    stub.listings = {site: [] for site in listings}
+    failed = stub.flow.run_crowdwisdom_flow()
+    assert not failed.flow_success
+    assert "No data collected" in board_text()
+
+    stub.listings = listings
+    state = stub.flow.run_crowdwisdom_flow()
+    assert state.flow_success
+    assert state.market_changes["new"] == 0 and state.market_changes["changed"] == 0
+    assert "No data collected" not in board_text()
+    assert len(board_text().splitlines()) == len(good.splitlines())
+    assert state.final_summary["csv_rows_generated"] == 2
+
+
+def test_board_overwritten_outside_the_flow_is_rewritten(stub):
+    assert stub.flow.run_crowdwisdom_flow().flow_success
+    good = board_text()
+    stub.flow.write_error_board(Config.CSV_OUTPUT_PATH)
+
+    assert stub.flow.run_crowdwisdom_flow().flow_success
+    assert "No data collected" not in board_text()
+    assert len(board_text().splitlines()) == len(good.splitlines())
+
+
+def market(site, key, title):
+    return (site, key), {"title": title, "price": "50%", "source_site": site}
+
+
+@pytest.fixture
+def listing():
+    keyed = [
+        market("polymarket", "trump", "Will Donald Trump win the 2024 presidential election?"),
+        market("kalshi", "trump", "Trump wins 2024 Presidential Election"),
+        market("polymarket", "fed", "Will the Fed cut rates in March 2025?"),
+        market("kalshi", "fed", "Fed rate cut in March 2025?"),
+        market("polymarket", "btc", "Will Bitcoin close above $100k in 2025?")
+    ]
+    keys, products = zip(*keyed)
+    previous = [({keys[0], keys[1]}, 0.9), ({keys[2], keys[3]}, 0.85)]
+    return list(products), list(keys), previous
+
+
+def settled(kept):
+    # Previous groups are key sets, so member order within a group is arbitrary
+    return [(sorted(indexes), confidence) for indexes, confidence in kept]
+
+
+@pytest.fixture
+def matcher():
+    return MarketMatcher(threshold=0.78, ambiguous_margin=0.1, max_block_size=500)
+
+
+def test_plan_reuses_groups_untouched_by_a_new_market(matcher, listing):
+    products, keys, previous = listing
+    kept, rematch = matcher.plan_incremental(products, keys, previous, {("polymarket", "btc")})
+    assert settled(kept) == [([0, 1], 0.9), ([2, 3], 0.85)]
+    assert rematch == [4]
+
+
+def test_plan_rematches_a_group_with_a_retitled_member(matcher, listing):
+    products, keys, previous = listing
+    kept, rematch = matcher.plan_incremental(products, keys, previous, {("kalshi", "fed")})
+    assert settled(kept) == [([0, 1], 0.9)]
+    assert rematch == [2, 3, 4]
+
+
+def test_plan_drops_a_group_whose_member_is_gone(matcher, listing):
+    products, keys, previous = listing
+    previous = [({keys[0], ("kalshi", "delisted")}, 0.9), previous[1]]
+    kept, rematch = matcher.plan_incremental(products, keys, previous, set())
+    assert settled(kept) == [([2, 3], 0.85)]
+    assert rematch == [0, 1, 4]
+
+
+def test_plan_reopens_a_group_a_new_market_could_join(matcher, listing):
+    products, keys, previous = listing
+    products.append({"title": "Donald Trump wins the 2024 presidential election", "source_site": "generic"})
+    keys.append(("generic", "trump"))
+    kept, rematch = matcher.plan_incremental(products, keys, previous, {("generic", "trump")})
+    assert settled(kept) == [([2, 3], 0.85)]
+    assert rematch == [0, 1, 4, 5]
+
+
+def test_combine_adds_reused_groups_to_the_rematched_ones(matcher, listing):
+    products, keys, previous = listing
+    kept, rematch = matcher.plan_incremental(products, keys, previous, {("kalshi", "fed")})
+    combined = matcher.combine(products, kept, matcher.match([products[i] for i in rematch]))
+
+    groups = combined["matched_products"]
+    assert combined["total_unique_products"] == 3
+    assert [sorted(p["title"] for p in g["products"]) for g in groups[:2]] == [
+        ["Trump wins 2024 Presidential Election", "Will Donald Trump win the 2024 presidential election?"],
+        ["Fed rate cut in March 2025?", "Will the Fed cut rates in March 2025?"]
+    ]
+    assert groups[0]["match_confidence"] == 0.9
+    assert any(product is products[0] for product in groups[0]["products"])
+    assert groups[2]["sites"] == ["polymarket"]
+    assert "(1 groups reused from the last run)" in combined["analysis_summary"]
@@ -0,0 +1,93 @@
+"""
+Tests for LLM response cache expiry and eviction
+"""
+
+import pytest
+
+import llm_cache
+from llm_cache import LLMResponseCache
+
+
+class Clock:
+    """
+    Stand-in for the time module that only moves when told to
+    """
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache, "time", clock)
+    return clock
+
+
+def make_cache(tmp_path, **limits):
+    options = {"ttl": 60, "max_entries": 100, "max_bytes": 1024}
+    options.update(limits)
+    return LLMResponseCache(tmp_path / "llm.sqlite", enabled=True, **options)
+
+
+def fill(cache, clock, *keys):
+    for key in keys:
+        cache.set(key, "mistral", key * 4)
+        clock.advance(1)
+
+
+def test_entry_expires_after_its_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    fill(cache, clock, "a")
+    clock.advance(58)
+    assert cache.get("a") == "aaaa"
+    clock.advance(2)
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_reading_an_entry_does_not_extend_its_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    fill(cache, clock, "a")
+    clock.advance(30)
+    cache.get("a")
+    clock.advance(30)
+    assert cache.get("a") is None
+
+
+def test_writes_drop_expired_entries(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    fill(cache, clock, "a", "b")
+    clock.advance(59)
+    fill(cache, clock, "c")
+    assert cache.stats()["entries"] == 2
+    clock.advance(1)
+    fill(cache, clock, "d")
+    assert cache.stats()["entries"] == 2
+    assert [cache.get(key) is not None for key in "cd"] == [True, True]
+
+
+def test_least_recently_used_entry_goes_past_max_entries(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=2)
+    fill(cache, clock, "a", "b")
+    cache.get("a")
+    clock.advance(1)
+    fill(cache, clock, "c")
+    assert [cache.get(key) is not None for key in "abc"] == [True, False, True]
+
+
+def test_least_recently_used_entries_go_past_max_bytes(tmp_path, clock):
+    # Each response is 4 bytes, so 10 bytes hold two of them
+    cache = make_cache(tmp_path, max_bytes=10)
+    fill(cache, clock, "a", "b")
+    cache.get("a")
+    clock.advance(1)
+    fill(cache, clock, "c")
+    assert cache.stats()["bytes"] == 8
+    assert [cache.get(key) is not None for key in "abc"] == [True, False, True]
@@ -0,0 +1,88 @@
+"""
+Tests for the local market matcher
+"""
+
+import pytest
+
+from config import Config
+from matching import MarketMatcher, UnionFind
+from snapshot_store import SnapshotStore
+
+
+def market(site, title, url=""):
+    return {"title": title, "price": "50%", "volume": "$1k", "url": url, "source_site": site}
+
+
+@pytest.fixture
+def matcher():
+    return MarketMatcher(threshold=0.78, ambiguous_margin=0.1, max_block_size=500)
+
+
+def test_union_find_refuses_two_markets_from_one_site():
+    groups = UnionFind(3, ["polymarket", "kalshi", "polymarket"])
+    assert groups.union(0, 1)
+    assert not groups.union(1, 2)
+    assert groups.find(0) == groups.find(1) != groups.find(2)
+
+
+def test_same_market_under_different_titles_is_grouped(matcher):
+    products = [
+        market("polymarket", "Will Donald Trump win the 2024 presidential election?"),
+        market("kalshi", "Trump wins 2024 Presidential Election"),
+        market("polymarket", "Will the Fed cut rates in March 2025?"),
+        market("kalshi", "Fed rate cut in March 2025?")
+    ]
+    groups = matcher.match(products)["matched_products"]
+    assert sorted(sorted(p["title"] for p in g["products"]) for g in groups) == [
+        ["Fed rate cut in March 2025?", "Will the Fed cut rates in March 2025?"],
+        ["Trump wins 2024 Presidential Election", "Will Donald Trump win the 2024 presidential election?"]
+    ]
+    assert all(g["sites"] == ["kalshi", "polymarket"] for g in groups)
+
+
+@pytest.mark.parametrize("title_a, title_b", [
+    ("Will Bitcoin reach $100k by December 31, 2025?", "Will Bitcoin reach $150k by December 31, 2025?"),
+    ("Will the Fed cut rates in March 2025?", "Will the Fed cut rates in June 2025?")
+])
+def test_lookalike_markets_are_not_grouped(matcher, title_a, title_b):
+    products = [market("polymarket", title_a), market("kalshi", title_b)]
+    result = matcher.match(products)
+    assert result["total_unique_products"] == 2
+    assert all(len(g["products"]) == 1 for g in result["matched_products"])
+
+
+def test_ambiguous_pairs_sent_to_the_adjudicator_are_capped(matcher, monkeypatch):
+    monkeypatch.setattr(Config, "MATCH_MAX_LLM_PAIRS", 3)
+    products = []
+    for day in range(1, 9):
+        products.append(market("polymarket", f"Will Bitcoin reach $100k by December {day}, 2025?"))
+        products.append(market("kalshi", f"Bitcoin above $100k on Dec {day} 2025?"))
+    asked = []
+
+    def adjudicator(pairs):
+        asked.append(len(pairs))
+        return [0]
+
+    result = matcher.match(products, adjudicator=adjudicator)
+    assert asked == [3]
+    assert sum(1 for g in result["matched_products"] if len(g["products"]) > 1) == 1
+
+
+def test_unchanged_snapshot_gives_an_empty_delta(matcher, tmp_path):
+    products = [
+        market("polymarket", "Will Donald Trump win the 2024 presidential election?", "https://polymarket.com/event/trump"),
+        market("kalshi", "Trump wins 2024 Presidential Election", "https://kalshi.com/markets/pres24"),
+        market("kalshi", "Fed rate cut in March 2025?", "https://kalshi.com/markets/fed-mar25")
+    ]
+    store = SnapshotStore(tmp_path / "snapshots.sqlite")
+    delta = store.diff(products)
+    groups = matcher.match(products)["matched_products"]
+    key_of = {id(p): key for p, key in zip(products, delta.keys)}
+    store.commit(products, delta, [([key_of[id(p)] for p in g["products"]], g["match_confidence"]) for g in groups])
+
+    delta = store.diff([dict(p) for p in products])
+    assert delta.is_empty
+    assert delta.summary()["unchanged"] == len(products)
+    kept, rematch = matcher.plan_incremental(products, delta.keys, store.load_groups(), delta.new | delta.retitled)
+    assert rematch == []
+    assert sorted(sorted(indexes) for indexes, _ in kept) == [[0, 1], [2]]
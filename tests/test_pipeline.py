@@ -0,0 +1,125 @@
+"""
+Tests for the streaming pipeline with stub fetchers
+"""
+
+import threading
+import time
+
+import pytest
+
+import pipeline
+from config import Config
+from pipeline import StreamingPipeline
+
+SITES = [
+    {"name": "polymarket", "base_url": "https://polymarket.example", "markets_endpoint": "/markets"},
+    {"name": "kalshi", "base_url": "https://kalshi.example", "markets_endpoint": "/markets"}
+]
+
+
+def listing(site_name, count, start=0):
+    return [{"title": f"Will team {k} win the {site_name} cup?", "price": "50%"} for k in range(start, start + count)]
+
+
+def payload(site_name, products):
+    return {"site": site_name, "tier": "api", "products": products, "products_count": len(products)}
+
+
+@pytest.fixture(autouse=True)
+def settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "TARGET_SITES", SITES)
+    monkeypatch.setattr(Config, "COLLECTION_CONCURRENCY", 2)
+    monkeypatch.setattr(Config, "MAX_PRODUCTS_PER_SITE", 1000)
+    monkeypatch.setattr(pipeline.tiered_fetcher, "first_url", lambda site_name, url=None, max_products=50: url)
+    monkeypatch.setattr(pipeline.politeness_gate, "min_delay", 0)
+    monkeypatch.setattr(pipeline.politeness_gate, "jitter", 0)
+
+
+def run(tmp_path, fetch, monkeypatch, sites=None, **options):
+    monkeypatch.setattr(pipeline.tiered_fetcher, "fetch", fetch)
+    return StreamingPipeline(sites, output_path=tmp_path / "board.csv", **options)
+
+
+def test_writes_every_market(tmp_path, monkeypatch):
+    def fetch(site_name, url=None, max_products=50, on_batch=None):
+        return payload(site_name, listing(site_name, 25))
+
+    summary = run(tmp_path, fetch, monkeypatch, batch_size=10).run()
+    assert summary["success"] and summary["errors"] == []
+    assert summary["total_products_collected"] == 50
+    assert summary["csv_rows_generated"] == 50
+    assert (tmp_path / "board.csv").exists()
+
+
+def test_harvested_batches_flow_before_the_fetch_returns(tmp_path, monkeypatch):
+    received = []
+    matched_during_fetch = threading.Event()
+
+    def fetch(site_name, url=None, max_products=50, on_batch=None):
+        products = listing(site_name, 12)
+        for start in range(0, len(products), 4):
+            assert on_batch(products[start:start + 4]) is not False
+        if site_name == "polymarket":
+            # The first full batch is with the matcher while the "page" is still open
+            deadline = time.monotonic() + 5
+            while not received and time.monotonic() < deadline:
+                time.sleep(0.01)
+            if received:
+                matched_during_fetch.set()
+        return payload(site_name, products)
+
+    pipe = run(tmp_path, fetch, monkeypatch, batch_size=8)
+    add = pipeline.IncrementalMatcher.add
+
+    def spy(matcher, products):
+        received.append(len(products))
+        return add(matcher, products)
+
+    monkeypatch.setattr(pipeline.IncrementalMatcher, "add", spy)
+    summary = pipe.run()
+    assert matched_during_fetch.is_set()
+    assert summary["total_products_collected"] == 24
+    assert sorted(received) == [4, 4, 8, 8]
+
+
+def test_writer_failure_stops_the_scrapers(tmp_path, monkeypatch):
+    stopped = threading.Event()
+
+    def fetch(site_name, url=None, max_products=50, on_batch=None):
+        for start in range(0, 10_000, 2):
+            if on_batch(listing(site_name, 2, start)) is False:
+                stopped.set()
+                break
+        return payload(site_name, [])
+
+    def write_rows(rows, output_path):
+        next(iter(rows))
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pipeline, "write_rows", write_rows)
+    # With one site every market is stable at once, so rows reach the writer while it still scrapes
+    pipe = run(tmp_path, fetch, monkeypatch, sites=SITES[:1], batch_size=2, queue_size=2)
+    started = time.monotonic()
+    with pytest.raises(OSError, match="disk full"):
+        pipe.run()
+    assert time.monotonic() - started < 5
+    assert stopped.wait(5)
+
+
+def test_site_missing_the_deadline_is_reported(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "SITE_TIMEOUT", 1)
+    release = threading.Event()
+
+    def fetch(site_name, url=None, max_products=50, on_batch=None):
+        if site_name == "kalshi":
+            release.wait(10)
+        return payload(site_name, listing(site_name, 5))
+
+    try:
+        summary = run(tmp_path, fetch, monkeypatch, batch_size=10).run()
+    finally:
+        release.set()
+    assert summary["success"]
+    assert summary["total_products_collected"] == 5
+    assert [(e["site"], e["phase"]) for e in summary["errors"]] == [("kalshi", "data_collection")]
+    assert summary["sites"]["polymarket"]["success"] and "kalshi" not in summary["sites"]
@@ -0,0 +1,36 @@
+"""
+Tests for PolitenessGate claims and slot spacing
+"""
+
+import time
+
+from politeness import PolitenessGate
+
+URL = "https://kalshi.example/markets"
+
+
+def test_claimed_slot_lets_the_worker_straight_through():
+    gate = PolitenessGate(min_delay=5, jitter=0)
+    assert gate.claim(URL) == 0
+    assert gate.claim(URL) > 4
+    assert gate.wait(URL) == 0
+    assert gate.reserve(URL) > 4
+
+
+def test_unused_claim_lapses_with_its_slot():
+    gate = PolitenessGate(min_delay=0.05, jitter=0)
+    assert gate.claim(URL) == 0
+    # The claimed site failed before its wait(); once the slot is over the
+    # next two requests are spaced as if it had never been claimed
+    time.sleep(0.06)
+    assert gate.reserve(URL) == 0
+    assert gate.reserve(URL) > 0.04
+
+
+def test_unused_claim_is_not_carried_into_the_next_claim():
+    gate = PolitenessGate(min_delay=0.05, jitter=0)
+    gate.claim(URL)
+    time.sleep(0.06)
+    gate.claim(URL)
+    assert gate.wait(URL) == 0
+    assert gate.reserve(URL) > 0.04
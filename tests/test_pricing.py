@@ -0,0 +1,65 @@
+"""
+Tests for price normalization
+"""
+
+import math
+
+import pytest
+
+from pricing import annotate_products, normalize_prices
+
+NAN = float("nan")
+
+CASES = [
+    ("62¢", 0.62, 0.38),
+    ("¢62", 0.62, 0.38),
+    ("62c", 0.62, 0.38),
+    ("62%", 0.62, 0.38),
+    ("62.5 %", 0.625, 0.375),
+    ("$0.62", 0.62, 0.38),
+    ("$.62", 0.62, 0.38),
+    ("+150", 0.4, 0.6),
+    ("-200", 0.6667, 0.3333),
+    # The -5.5 handicap is not an odds figure; +110 is the price of the spread bet
+    ("Lakers -5.5 +110", 0.4762, 0.5238),
+    ("2.50", 0.4, 0.6),
+    ("@1.85", 0.5405, 0.4595),
+    ("0.62", 0.62, 0.38),
+    ("Yes 62¢ / No 39¢", 0.62, 0.39),
+    ("No 40¢ Yes 61¢", 0.61, 0.4),
+    ("Yes 62%", 0.62, 0.38),
+    ("No 39¢", 0.61, 0.39),
+    ("Yes\n62¢\nNo\n39¢", 0.62, 0.39),
+    ("Trump\n62%\nchance", 0.62, 0.38),
+    ("Over 2.5 goals\n1.85", 0.5405, 0.4595),
+    ("Bitcoin above $100k?\n$1.2m vol\n$0.35", 0.35, 0.65),
+    ("250%", NAN, NAN),
+    ("Over 2.5 goals", NAN, NAN),
+    ("N/A", NAN, NAN),
+    ("", NAN, NAN)
+]
+
+
+def same(a, b):
+    return (math.isnan(a) and math.isnan(b)) or a == pytest.approx(b, abs=1e-4)
+
+
+@pytest.mark.parametrize("price, yes, no", CASES, ids=[repr(c[0]) for c in CASES])
+def test_normalize_prices(price, yes, no):
+    yes_values, no_values = normalize_prices([price])
+    assert same(yes_values[0], yes) and same(no_values[0], no)
+
+
+def test_batch_matches_one_at_a_time():
+    prices = [case[0] for case in CASES] * 3 + [None]
+    yes_values, no_values = normalize_prices(prices)
+    for price, yes, no in zip(prices, yes_values, no_values):
+        expected = normalize_prices([price])
+        assert same(yes, expected[0][0]) and same(no, expected[1][0])
+
+
+def test_annotate_products_sets_none_when_unparseable():
+    products = [{"price": "62¢"}, {"price": "N/A"}]
+    assert annotate_products(products) == 1
+    assert products[0]["yes_price"] == 0.62 and products[0]["no_price"] == 0.38
+    assert products[1]["yes_price"] is None and products[1]["no_price"] is None
@@ -0,0 +1,92 @@
+"""
+Tests for MarketRecord and MarketColumns
+"""
+
+import copy
+import pickle
+
+import pytest
+
+from records import MarketColumns, MarketRecord, record_products
+
+
+@pytest.fixture
+def record():
+    return MarketRecord.from_dict({"title": "Fed cuts in March", "price": "62%", "source_site": "kalshi", "ticker": "FED-MAR"})
+
+
+def test_reads_like_a_dict(record):
+    assert record["title"] == "Fed cuts in March"
+    assert record.get("price") == "62%"
+    assert record.get("volume") is None and record.get("volume", "N/A") == "N/A"
+    assert record.get("ticker") == "FED-MAR"
+    with pytest.raises(KeyError):
+        record["volume"]
+    assert dict(record) == {"title": "Fed cuts in March", "price": "62%", "source_site": "kalshi", "ticker": "FED-MAR"}
+    assert len(record) == 4
+    assert {**record, "price": "63%"}["price"] == "63%"
+
+
+def test_contains_only_fields_that_were_set(record):
+    assert "title" in record and "ticker" in record
+    assert "volume" not in record and "yes_price" not in record
+    assert "unknown" not in record
+    record["yes_price"] = None
+    assert "yes_price" in record
+
+
+def test_setdefault(record):
+    assert record.setdefault("price", "Unknown") == "62%"
+    assert record.setdefault("category", "General") == "General"
+    assert record["category"] == "General"
+    assert record.setdefault("tier", "api") == "api"
+    assert record["tier"] == "api"
+
+
+def test_unknown_keys_go_to_the_overflow(record):
+    record["rank"] = 3
+    assert record["rank"] == 3 and "rank" in record
+    del record["rank"]
+    assert "rank" not in record
+    for key in ("rank", "volume"):
+        with pytest.raises(KeyError):
+            del record[key]
+    with pytest.raises(AttributeError):
+        record.rank = 3
+
+
+def test_interns_shared_values():
+    a, b = record_products([{"title": "a", "site": "".join(["kal", "shi"])}, {"title": "b", "site": "kalshi"}])
+    assert a["site"] is b["site"]
+
+
+@pytest.mark.parametrize("clone", [
+    lambda r: pickle.loads(pickle.dumps(r)),
+    lambda r: pickle.loads(pickle.dumps(r, protocol=2)),
+    copy.deepcopy,
+    lambda r: r.copy()
+])
+def test_copies_and_pickles(record, clone):
+    record["tags"] = ["fed"]
+    other = clone(record)
+    assert type(other) is MarketRecord
+    assert dict(other) == dict(record)
+    assert "volume" not in other
+
+
+def test_columns_read_and_write_records_and_dicts():
+    markets = [
+        MarketRecord(title="a", price="62%", source_site="kalshi"),
+        MarketRecord(title="b", site="polymarket"),
+        MarketRecord(title="c")
+    ]
+    for records in (markets, [dict(m) for m in markets]):
+        columns = MarketColumns(records)
+        assert columns["title"] == ["a", "b", "c"]
+        assert columns.column("price", "Unknown") == ["62%", "Unknown", "Unknown"]
+        assert columns.sites() == ["kalshi", "polymarket", "unknown"]
+        columns.set_column("yes_price", [0.62, None, None])
+        assert columns["yes_price"] == [0.62, None, None]
+        assert records[0]["yes_price"] == 0.62
+        columns.set_column("source_site", ["kalshi", "kalshi", "kalshi"])
+        assert columns.sites() == ["kalshi"] * 3
@@ -0,0 +1,97 @@
+"""
+Tests for the payload schemas and the guardrails built on them
+"""
+
+import json
+
+import pytest
+
+from guardrails import validate_product_matching, validate_scraped_data
+from schemas import MATCH_GROUPS, PRODUCTS, parse_json, validate_batch, validate_products
+
+
+class TaskOutput:
+    def __init__(self, raw):
+        self.raw = raw
+
+
+def test_parse_json_rejects_malformed_text():
+    assert parse_json('{"site": "kalshi", "products": []}') == {"site": "kalshi", "products": []}
+    assert parse_json(b'[1, 2]') == [1, 2]
+    for raw in ("not json{", '{"site": "kalshi",', ""):
+        with pytest.raises(ValueError):
+            parse_json(raw)
+
+
+def test_validate_batch_drops_only_the_bad_items():
+    items = [
+        {"title": "Fed cuts in March", "price": 62},
+        {"title": ""},
+        {"price": "50%"},
+        "not a product",
+        {"title": "Trump wins", "volume": "$1m"}
+    ]
+    valid, rejections, rejected = validate_batch(PRODUCTS, items)
+    assert [item["title"] for item in valid] == ["Fed cuts in March", "Trump wins"]
+    assert valid[0]["price"] == "62" and valid[1]["volume"] == "$1m"
+    assert rejected == 3
+    assert rejections == {"title": 2, "<item>": 1}
+
+    valid, rejections, rejected = validate_batch(MATCH_GROUPS, [{"unified_title": "x", "products": []}, {"products": []}])
+    assert len(valid) == 1 and rejected == 1 and rejections == {"unified_title": 1}
+
+
+# (agent output, the error dict the guardrails returned before the schemas replaced their hand checks)
+SCRAPED_ERRORS = [
+    ("not json{", {"error": "Invalid JSON format in scraped data", "code": "JSON_PARSE_ERROR", "raw_data": "not json{"}),
+    (TaskOutput("{'site': 1}"), {"error": "Invalid JSON format in scraped data", "code": "JSON_PARSE_ERROR", "raw_data": "{'site': 1}"}),
+    ("[1, 2]", {"error": "Scraped data must be a dictionary"}),
+    (json.dumps({"site": "kalshi"}), {"error": "Missing fields: ['products']", "data": {"site": "kalshi"}}),
+    (json.dumps({"site": "kalshi", "products": []}), {"error": "No products found", "site": "kalshi"}),
+    (json.dumps({"site": "kalshi", "products": "62%"}), {"error": "No products found", "site": "kalshi"}),
+    (json.dumps({"site": "kalshi", "products": [{"title": ""}, {"price": "62%"}, 7]}), {"error": "No valid products after validation"})
+]
+
+MATCHING_ERRORS = [
+    ("not json{", {"error": "Product matching result is not valid JSON"}),
+    ("[]", {"error": "Must be dictionary"}),
+    (json.dumps({"matched_products": []}), {"error": "Missing fields in product matching: ['total_unique_products']"}),
+    (json.dumps({"matched_products": {}, "total_unique_products": 0}), {"error": "matched_products must be a list"}),
+    (json.dumps({"matched_products": [{"products": []}, "x"], "total_unique_products": 2}), {"error": "No valid product matches found"})
+]
+
+
+@pytest.mark.parametrize("payload, error", SCRAPED_ERRORS)
+def test_malformed_scraped_data_is_rejected(payload, error):
+    assert validate_scraped_data(payload) == (False, error)
+
+
+@pytest.mark.parametrize("payload, error", MATCHING_ERRORS)
+def test_malformed_matching_is_rejected(payload, error):
+    assert validate_product_matching(payload) == (False, error)
+
+
+def test_direct_path_dicts_get_the_same_errors():
+    for payload, error in SCRAPED_ERRORS[3:]:
+        assert validate_scraped_data(json.loads(payload)) == (False, error)
+    for payload, error in MATCHING_ERRORS[2:]:
+        assert validate_product_matching(json.loads(payload)) == (False, error)
+
+
+def test_null_fields_read_as_their_defaults():
+    products = [{"title": "Fed cuts in March", "price": None, "category": None, "confidence_score": None}]
+    valid, rejections, rejected = validate_products(products, "kalshi")
+    assert rejected == 0 and not rejections
+    assert (valid[0]["price"], valid[0]["category"], valid[0]["confidence_score"]) == ("Unknown", "General", 0.5)
+
+    ok, data = validate_scraped_data({"site": "kalshi", "products": [{"title": "Trump wins", "price": None}]})
+    assert ok and data["products_count"] == 1 and data["products"][0]["price"] == "Unknown"
+
+
+def test_scraped_data_keeps_valid_products_with_defaults():
+    raw = json.dumps({"site": "kalshi", "products": [{"title": "Fed cuts in March"}, {"title": ""}]})
+    ok, data = validate_scraped_data(TaskOutput(raw))
+    assert ok and data["products_count"] == 1 and data["rejected_products"] == 1
+    product = data["products"][0]
+    assert (product["price"], product["category"], product["site"], product["confidence_score"]) == \
+        ("Unknown", "General", "kalshi", 0.5)